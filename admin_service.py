@@ -1,43 +1,164 @@
+import threading
 import uuid
+import numpy as np
 import pandas as pd
 from datetime import datetime, date, timedelta
-from typing import List
+from typing import List, Optional
 from model import Food, DiscountCode, Order
 from database import Database
 from food_service import FoodService
+from persian_text import normalize, tokenize
 
 class AdminService:
     def __init__(self):
         self.db = Database()
         # Use FoodService for displaying and searching foods
         self.food_service = FoodService()
+        # last filtered and last sorted orders views as (key, frame): the
+        # pages of one order table reuse them until a filter, the sort or
+        # the orders/users tables change
+        self._views_lock = threading.Lock()
+        self._filtered_view = (None, None)
+        self._sorted_view = (None, None)
 
     # -------------------------------------------------------
     # Order Management
     # -------------------------------------------------------
-    def get_all_orders(self) -> List[dict]:
-        """Retrieve the list of all orders in the system"""
-        orders_df = pd.read_csv(self.db.orders_file)
-        orders_list = []
-        
-        for _, row in orders_df.iterrows():
-            # Find the related customer (optional, for displaying name)
-            user_df = self.db.load_users()
-            cust = user_df[user_df['user_id'] == row['customer_id']]
-            cust_name = (
-                f"{cust.iloc[0]['first_name']} {cust.iloc[0]['last_name']}"
-                if not cust.empty else row['customer_id']
-            )
+    # get_all_orders sort keys -> columns of the joined orders view
+    ORDER_SORT_COLUMNS = {
+        'date': 'order_date',
+        'status': 'status',
+        'total_amount': 'total_amount',
+        'customer_name': 'customer_name',
+        'order_id': 'order_id',
+        'payment_method': 'payment_method'
+    }
+
+    def _orders_version(self):
+        """Version of the tables behind the orders view, None if unknown"""
+        backend = self.db.backend
+        tokens = (backend.version_token('orders'), backend.version_token('users'))
+        if None in tokens:
+            return None
+        return (backend.table_path('orders'),) + tokens
+
+    def _filtered_orders(self, status: Optional[str] = None, start_date: Optional[date] = None,
+                         end_date: Optional[date] = None, customer_id: Optional[str] = None,
+                         search: Optional[str] = None) -> pd.DataFrame:
+        """
+        Orders joined with customer names and filtered, in stored order.
+        Users are read once and turned into a user_id -> name map.
+        search keeps the orders whose id or customer name contains every
+        word of it (Persian-normalized). The result is reused while the
+        filters and the tables' version tokens are unchanged.
+        """
+        # read before loading: a change made meanwhile is seen next time
+        version = self._orders_version()
+        key = (status, start_date, end_date, customer_id, search, version)
+        with self._views_lock:
+            if version is not None and self._filtered_view[0] == key:
+                return self._filtered_view[1]
+
+        orders_df = self.db.load_orders()
+
+        mask = pd.Series(True, index=orders_df.index)
+        if status is not None:
+            mask &= orders_df['status'] == status
+        if customer_id is not None:
+            mask &= orders_df['customer_id'] == customer_id
+        if start_date is not None or end_date is not None:
+            order_dates = pd.to_datetime(orders_df['order_date'])
+            if start_date is not None:
+                mask &= order_dates >= pd.Timestamp(start_date)
+            if end_date is not None:
+                mask &= order_dates < pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        orders_df = orders_df[mask]
+
+        # Customer names (orders of unknown customers show the customer_id)
+        users_df = self.db.load_users()
+        names = pd.Series(
+            (users_df['first_name'].astype(str) + " " + users_df['last_name'].astype(str)).to_numpy(),
+            index=users_df['user_id']
+        )
+        names = names[~names.index.duplicated()]
+        orders_df = orders_df.assign(
+            customer_name=orders_df['customer_id'].map(names).fillna(orders_df['customer_id'])
+        )
+
+        terms = tokenize(search) if search else []
+        if terms:
+            text = (orders_df['order_id'].astype(str) + " "
+                    + orders_df['customer_name'].astype(str)).map(normalize)
+            found = pd.Series(True, index=orders_df.index)
+            for term in terms:
+                found &= text.str.contains(term, regex=False)
+            orders_df = orders_df[found]
+
+        with self._views_lock:
+            self._filtered_view = (key, orders_df)
+        return orders_df
 
-            orders_list.append({
+    def _orders_view(self, status: Optional[str] = None, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None, customer_id: Optional[str] = None,
+                     sort_by: Optional[str] = None, descending: bool = False,
+                     search: Optional[str] = None) -> pd.DataFrame:
+        """
+        The filtered orders sorted as a whole frame, reused (like the
+        filtered frame) while nothing changes, so that paging through
+        them sorts once.
+        """
+        if sort_by is not None and sort_by not in self.ORDER_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort orders by {sort_by}")
+        version = self._orders_version()
+        orders_df = self._filtered_orders(status, start_date, end_date, customer_id, search)
+        if sort_by is None:
+            return orders_df
+
+        key = (status, start_date, end_date, customer_id, search, version, sort_by, descending)
+        with self._views_lock:
+            if version is not None and self._sorted_view[0] == key:
+                return self._sorted_view[1]
+        orders_df = orders_df.sort_values(
+            self.ORDER_SORT_COLUMNS[sort_by], ascending=not descending, kind='stable'
+        )
+        with self._views_lock:
+            self._sorted_view = (key, orders_df)
+        return orders_df
+
+    def get_all_orders(self, status: Optional[str] = None, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None, customer_id: Optional[str] = None,
+                       sort_by: Optional[str] = None, descending: bool = False,
+                       limit: Optional[int] = None, offset: int = 0,
+                       search: Optional[str] = None) -> List[dict]:
+        """
+        Retrieve the list of all orders in the system.
+        Optionally filtered by status, order date range (inclusive),
+        customer and a search text, sorted by one of ORDER_SORT_COLUMNS
+        and paged with limit/offset. Without arguments the stored order
+        is kept.
+        """
+        orders_df = self._orders_view(status, start_date, end_date, customer_id,
+                                      sort_by, descending, search)
+        end = None if limit is None else offset + limit
+        orders_df = orders_df.iloc[offset:end]
+
+        return [
+            {
                 'order_id': row['order_id'],
-                'customer_name': cust_name,
+                'customer_name': row['customer_name'],
                 'date': row['order_date'],
                 'status': row['status'],
                 'total_amount': float(row['total_amount']),
                 'payment_method': row['payment_method']
-            })
-        return orders_list
+            }
+            for row in orders_df.to_dict('records')
+        ]
+
+    def count_orders(self, status: Optional[str] = None, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None, customer_id: Optional[str] = None,
+                     search: Optional[str] = None) -> int:
+        """Number of orders matching the get_all_orders filters (for paging)"""
+        return len(self._filtered_orders(status, start_date, end_date, customer_id, search))
 
     def update_order_status(self, order_id: str, new_status: str):
         """Update order status by admin"""
@@ -87,92 +208,159 @@ class AdminService:
     def update_food_info(self, food_id: str, **kwargs):
         """
         Update food information (price, stock, description, etc.).
-        This is a simple implementation (since pandas does not easily update rows in place).
-        A more professional approach would be:
-        load → update in memory → save the entire DataFrame.
+        Only the given fields of this food are written; the storage
+        backend decides whether that is a row update or a file rewrite.
         """
-        df = self.db.load_foods()
-        index = df[df['food_id'] == food_id].index
-        
-        if len(index) == 0:
-            raise ValueError("Food not found")
-            
-        # Update provided fields
-        for key, value in kwargs.items():
-            if key in df.columns:
-                # available_dates must be formatted properly
-                if key == 'available_dates':
-                    df.at[index[0], key] = self.db._format_dates(value)
-                else:
-                    df.at[index[0], key] = value
-        
-        # Save the entire DataFrame again
-        df.to_csv(self.db.foods_file, index=False)
+        # available_dates is formatted by the database layer
+        self.db.update_food(food_id, kwargs)
 
     def delete_food(self, food_id: str):
         """Remove a food item from the menu"""
-        df = self.db.load_foods()
-        df = df[df['food_id'] != food_id]
-        df.to_csv(self.db.foods_file, index=False)
+        self.db.delete_food(food_id)
 
     # -------------------------------------------------------
     # Financial & Sales Reports
     # -------------------------------------------------------
-    def get_sales_report(self, start_date: date, end_date: date) -> dict:
+    # dimensions get_sales_report can break totals down by
+    REPORT_BREAKDOWNS = ('day', 'restaurant', 'category', 'food')
+
+    def get_sales_report(self, start_date: date, end_date: date,
+                         breakdowns=REPORT_BREAKDOWNS) -> dict:
         """
         Generate sales and profit report for a given time range.
         Sales calculation: sum of sold prices
         Profit calculation: sum of (selling price - cost price) * quantity
+        Items are aligned with their orders and foods once, as arrays;
+        every requested breakdown is then a grouped sum over those arrays,
+        returned under "by_<dimension>" as a list of dicts sorted by key.
         """
-        orders_df = pd.read_csv(self.db.orders_file)
-        items_df = pd.read_csv(self.db.order_items_file)
+        orders_df = self.db.load_orders()
+        items_df = self.db.load_order_items()
         foods_df = self.db.load_foods()
 
         # Filter orders based on order_date
-        # Convert order_date column to datetime
-        orders_df['order_date_parsed'] = pd.to_datetime(orders_df['order_date'])
-        
+        order_dates = pd.to_datetime(orders_df['order_date'])
         mask = (
-            (orders_df['order_date_parsed'].dt.date >= start_date) &
-            (orders_df['order_date_parsed'].dt.date <= end_date)
+            (order_dates >= pd.Timestamp(start_date)) &
+            (order_dates < pd.Timestamp(end_date) + pd.Timedelta(days=1))
         )
-        
         filtered_orders = orders_df[mask]
-        
-        if filtered_orders.empty:
-            return {"total_sales": 0, "total_profit": 0, "order_count": 0}
 
-        relevant_order_ids = filtered_orders['order_id'].tolist()
-        
-        # Find items related to these orders
-        filtered_items = items_df[items_df['order_id'].isin(relevant_order_ids)]
-        
-        total_sales = 0.0
-        total_profit = 0.0
-        
-        for _, item_row in filtered_items.iterrows():
-            fid = str(item_row['food_id'])
-            qty = item_row['quantity']
-            unit_price = float(item_row['unit_price'])  # Selling price at order time
-            
-            total_sales += (unit_price * qty)
-            
-            # Profit calculation:
-            # Should we use cost price at order time or current cost price?
-            # Typically, profit reports use current or average cost prices.
-            # Here, we use the current cost price from the database.
-            food_row = foods_df[foods_df['food_id'].astype(str) == fid] 
-            if not food_row.empty:
-                cost_price = float(food_row.iloc[0]['cost_price'])
-                total_profit += (unit_price - cost_price) * qty
-
-        return {
+        report = {
             "start_date": start_date.strftime("%Y-%m-%d"),
             "end_date": end_date.strftime("%Y-%m-%d"),
             "order_count": len(filtered_orders),
-            "total_sales": total_sales,
-            "total_profit": total_profit
+            "total_sales": 0.0,
+            "total_profit": 0.0
         }
+        for breakdown in breakdowns:
+            report[f"by_{breakdown}"] = []
+        if filtered_orders.empty:
+            return report
+
+        # Join: position of each item's order among the filtered orders
+        # (-1 for orders outside the range) and of its food in foods_df
+        unique_orders = ~filtered_orders['order_id'].duplicated()
+        orders = filtered_orders[unique_orders]
+        order_pos = pd.Index(orders['order_id']).get_indexer(items_df['order_id'])
+        in_range = order_pos >= 0
+        order_pos = order_pos[in_range]
+        items = items_df[in_range]
+        if items.empty:
+            return report
+
+        foods = foods_df.drop_duplicates('food_id')
+        # factorize once: the codes serve both the food join and the food breakdown
+        food_codes, food_ids = pd.factorize(items['food_id'].astype(str), sort=True)
+        food_pos = pd.Index(foods['food_id']).get_indexer(food_ids)[food_codes]
+        known_food = food_pos >= 0
+        # unknown foods (-1) read row 0 and are masked out; an empty foods
+        # table (every food deleted) has no row to read at all
+        safe_pos = np.where(known_food, food_pos, 0) if len(foods) else None
+
+        quantity = pd.to_numeric(items['quantity']).to_numpy(dtype=float)
+        unit_price = pd.to_numeric(items['unit_price']).to_numpy(dtype=float)
+        sales = unit_price * quantity
+        # Profit uses the current cost price from the database;
+        # items of deleted foods count towards sales but not profit
+        if safe_pos is None:
+            cost_price = np.zeros(len(food_pos))
+        else:
+            cost_price = foods['cost_price'].to_numpy(dtype=float)[safe_pos]
+        profit = np.where(known_food, (unit_price - cost_price) * quantity, 0.0)
+
+        report["total_sales"] = float(sales.sum())
+        report["total_profit"] = float(profit.sum())
+
+        # orders that have items, for per-order group counts
+        order_has_items = np.bincount(order_pos, minlength=len(orders)) > 0
+
+        for breakdown in breakdowns:
+            names = None
+            order_codes = None
+            if breakdown == 'day':
+                order_codes, labels = pd.factorize(
+                    order_dates[mask][unique_orders].dt.normalize(), sort=True
+                )
+                labels = labels.strftime("%Y-%m-%d")
+            elif breakdown == 'restaurant' and 'restaurant_id' in orders.columns:
+                order_codes, labels = pd.factorize(orders['restaurant_id'], sort=True)
+            elif breakdown in ('restaurant', 'category'):
+                column = 'restaurant_id' if breakdown == 'restaurant' else 'category'
+                group_codes, labels = pd.factorize(foods[column], sort=True)
+                if safe_pos is None:
+                    codes = np.full(len(food_pos), -1)
+                else:
+                    codes = np.where(known_food, group_codes[safe_pos], -1)
+            elif breakdown == 'food':
+                codes, labels = food_codes, food_ids
+                names = pd.Series(foods['name'].to_numpy(), index=foods['food_id'])
+            else:
+                raise ValueError(f"Unknown report breakdown: {breakdown}")
+
+            if order_codes is not None:
+                # the group is a property of the order itself
+                codes = order_codes[order_pos]
+                grouped_orders = order_codes[order_has_items & (order_codes >= 0)]
+                order_count = np.bincount(grouped_orders, minlength=len(labels))
+            else:
+                # distinct (group, order) pairs give the number of orders per group
+                valid = codes >= 0
+                pairs = pd.unique(codes[valid].astype(np.int64) * len(orders) + order_pos[valid])
+                order_count = np.bincount(pairs // len(orders), minlength=len(labels))
+
+            report[f"by_{breakdown}"] = self._group_totals(
+                breakdown, codes, labels, order_count, sales, profit, quantity, names
+            )
+
+        return report
+
+    @staticmethod
+    def _group_totals(key: str, codes: np.ndarray, labels, order_count: np.ndarray,
+                      sales: np.ndarray, profit: np.ndarray, quantity: np.ndarray,
+                      names: pd.Series = None) -> List[dict]:
+        """Per-group sums of one breakdown; code -1 marks items without a group"""
+        valid = codes >= 0
+        codes = codes[valid]
+        n = len(labels)
+        item_count = np.bincount(codes, minlength=n)
+        group_sales = np.bincount(codes, weights=sales[valid], minlength=n)
+        group_profit = np.bincount(codes, weights=profit[valid], minlength=n)
+        group_quantity = np.bincount(codes, weights=quantity[valid], minlength=n)
+
+        rows = []
+        for i in np.flatnonzero(item_count):
+            row = {
+                key: labels[i],
+                'sales': float(group_sales[i]),
+                'profit': float(group_profit[i]),
+                'quantity': int(group_quantity[i]),
+                'order_count': int(order_count[i])
+            }
+            if names is not None:
+                row['name'] = names.get(labels[i])
+            rows.append(row)
+        return rows
 
     # -------------------------------------------------------
     # Discount Code Management (Admin-issued)
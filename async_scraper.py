@@ -0,0 +1,366 @@
+"""
+asyncio scraping engine for menus served over plain HTTP.
+
+ThreadedRestaurantScraper needs an OS thread (and a browser) per page in
+flight. Scrapers that can read a menu without a browser (see the HTTP
+fetch mode of SnappFoodScraper) only wait on sockets, so one event loop
+can keep thousands of pages in flight:
+
+    scraper = AsyncRestaurantScraper(SnappFoodScraper, concurrency=500)
+    df = scraper.scrape_all(urls, progress_callback)
+
+A fixed pool of `concurrency` worker coroutines takes the URLs one at a
+time over one aiohttp session, whose connections are kept alive and
+reused. Requests are spaced per host, transient failures (connection
+errors, timeouts, 429 and 5xx) are retried with exponential backoff,
+and results are handed out as each URL completes (stream()). HTML
+parsing runs on a small thread pool and scrape cache I/O on worker
+threads, so neither stalls the loop. Requires aiohttp.
+"""
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Type
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # AsyncHttpClient explains how to install it
+    aiohttp = None
+
+from http_fetch import DEFAULT_HEADERS
+from scrape_cache import ScrapeCache
+from threaded_scraper import ThreadedRestaurantScraper
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# failures worth retrying besides RETRY_STATUSES: lost connections and timeouts
+TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError) + (
+    (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) if aiohttp else ()
+)
+
+
+class HttpError(Exception):
+    """Non-2xx response"""
+
+    def __init__(self, status: int, url: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} for url: {url}")
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after
+
+
+class HttpResponse:
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        content_type = self.headers.get('content-type', '')
+        charset = 'utf-8'
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=')[-1].split(';')[0].strip() or charset
+        return self.body.decode(charset, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseTooLarge(Exception):
+    """Response body over the client's max_body_size"""
+
+
+class AsyncHttpClient:
+    """
+    GET client on one aiohttp session: a keep-alive connection pool shared
+    by every request of a run (limit connections in all, limit_per_host
+    to one host; HostRateLimiter does the per-host pacing). aiohttp follows redirects and decodes chunked and
+    gzip/deflate bodies; bodies over max_body_size are refused.
+    Requires aiohttp.
+    """
+
+    def __init__(self, timeout: float = 15, headers: Optional[Dict[str, str]] = None,
+                 max_redirects: int = 5, limit: int = 100, limit_per_host: int = 0,
+                 max_body_size: int = 10 * 1024 * 1024):
+        """
+        Args:
+            timeout: Seconds allowed for one request (connect to last byte)
+            headers: Headers sent with every request (on top of DEFAULT_HEADERS)
+            max_redirects: Redirects followed before giving up
+            limit: Open connections in the pool
+            limit_per_host: Open connections to one host (0: only limit applies)
+            max_body_size: Largest accepted response body, in bytes
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncHttpClient requires aiohttp (pip install aiohttp)")
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.max_redirects = max_redirects
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.max_body_size = max_body_size
+        self.bytes_received = 0
+        self._session = None
+
+    def _get_session(self):
+        # created lazily: a session belongs to the event loop it was made on
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit,
+                                               limit_per_host=self.limit_per_host),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        session = self._get_session()
+        async with session.get(url, headers=headers, max_redirects=self.max_redirects) as response:
+            final_url = str(response.url)
+            if response.status >= 400:
+                raise HttpError(response.status, final_url, _retry_after(response.headers))
+            if (response.content_length or 0) > self.max_body_size:
+                raise ResponseTooLarge(f"{final_url}: {response.content_length} bytes")
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                body += chunk
+                if len(body) > self.max_body_size:
+                    raise ResponseTooLarge(f"{final_url}: over {self.max_body_size} bytes")
+            self.bytes_received += len(body)
+            response_headers = {name.lower(): value for name, value in response.headers.items()}
+            return HttpResponse(final_url, response.status, response_headers, bytes(body))
+
+    async def close(self):
+        """Close the pooled connections (a later get() opens a new pool)"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    try:
+        return float(headers['retry-after'])
+    except (KeyError, ValueError):
+        return None
+
+
+class HostRateLimiter:
+    """Spaces request starts to the same host at least 1/rate seconds apart"""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next: Dict[str, float] = {}
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # reserve the next slot; the loop is single-threaded, no lock needed
+        slot = max(now, self._next.get(host, now))
+        self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return error.status in RETRY_STATUSES
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class AsyncRestaurantScraper(ThreadedRestaurantScraper):
+    """
+    Scrapes many restaurants concurrently on one event loop.
+    scraper_class must read menus over HTTP: menu_json_url(url),
+    items_from_json(data) and items_from_page(html), as SnappFoodScraper.
+    Same scrape_all/get_statistics interface as ThreadedRestaurantScraper.
+    """
+
+    def __init__(
+        self,
+        scraper_class: Type,
+        concurrency: int = 200,
+        per_host_rate: Optional[float] = 20.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 15.0,
+        output_file: Optional[str] = None,
+        verbose: bool = True,
+        parse_workers: int = 4,
+        client: Optional[AsyncHttpClient] = None,
+        scrape_cache: Optional[ScrapeCache] = None
+    ):
+        """
+        Args:
+            scraper_class: Scraper class with HTTP fetch support
+            concurrency: Maximum number of requests in flight
+            per_host_rate: Maximum request starts per second to one host (None: unlimited)
+            retries: Retries of a request after a transient failure
+            backoff: First retry delay in seconds, doubled on each retry
+            timeout: Seconds allowed for one request
+            output_file: Optional CSV filename to save results
+            verbose: Whether to print detailed logs
+            parse_workers: Threads parsing HTML pages
+            client: HTTP client to use (a new AsyncHttpClient by default)
+            scrape_cache: ScrapeCache given to scrapers that support one
+        """
+        for method in ('menu_json_url', 'items_from_json', 'items_from_page'):
+            if not hasattr(scraper_class, method):
+                raise TypeError(f"{scraper_class.__name__} does not support HTTP fetching")
+        super().__init__(scraper_class, max_workers=concurrency, output_file=output_file,
+                         verbose=verbose, use_pool=False, scrape_cache=scrape_cache)
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.parse_workers = parse_workers
+        self.client = client
+
+    def iter_results(self, urls: List[str]) -> Iterator[Dict]:
+        """
+        Results of urls as they complete, for synchronous callers.
+        Requests only progress while the caller waits for the next result;
+        cancel() drops the requests still in flight.
+        """
+        loop = asyncio.new_event_loop()
+        results = self.stream(urls)
+        try:
+            while not self._cancel.is_set():
+                try:
+                    result = loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield result
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.close()
+            self._cancel.clear()
+
+    async def stream(self, urls: List[str]) -> AsyncIterator[Dict]:
+        """
+        Results of urls in completion order, as dicts with the keys of
+        ThreadedRestaurantScraper results. Closing the iterator early
+        cancels the remaining requests.
+
+        concurrency workers take the URLs one at a time and hand their
+        results over a queue of the same size, so memory does not grow
+        with the number of URLs.
+        """
+        limiter = HostRateLimiter(self.per_host_rate)
+        client = self.client or AsyncHttpClient(timeout=self.timeout, limit=self.concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+        done: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        # shared by the workers; next() never yields to the loop, so no lock
+        pending = iter(urls)
+
+        async def worker():
+            for url in pending:
+                await done.put(await self._scrape_single(url, client, limiter, executor))
+
+        workers = [asyncio.create_task(worker())
+                   for _ in range(min(self.concurrency, len(urls)))]
+        try:
+            for _ in urls:
+                yield await done.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            executor.shutdown(wait=False)
+            # the pool belongs to this event loop
+            await client.close()
+
+    async def _scrape_single(self, url: str, client: AsyncHttpClient,
+                             limiter: HostRateLimiter, executor: ThreadPoolExecutor) -> Dict:
+        start_time = time.perf_counter()
+        timings = {'fetch': 0.0, 'parse': 0.0}
+        try:
+            scraper = self._create_scraper()
+            items = []
+
+            cache = getattr(scraper, 'scrape_cache', None)
+            if cache is not None:
+                # the cache is SQLite: its I/O stays off the event loop
+                cached = await asyncio.to_thread(cache.fresh_items, url)
+                if cached is not None:
+                    return self._result(url, cached, start_time, timings, changed=False)
+
+            json_url = scraper.menu_json_url(url)
+            if json_url:
+                try:
+                    fetch_start = time.perf_counter()
+                    response = await self._fetch(client, limiter, json_url, {'Accept': 'application/json'})
+                    timings['fetch'] += time.perf_counter() - fetch_start
+                    # stores the menu in the scrape cache
+                    items = await asyncio.to_thread(scraper.items_from_json, response.json(), url)
+                except (HttpError, ResponseTooLarge, ValueError) + TRANSIENT_ERRORS as e:
+                    if self.verbose:
+                        print(f"Menu endpoint error: {e}")
+
+            if not items:
+                fetch_start = time.perf_counter()
+                response = await self._fetch(client, limiter, url)
+                timings['fetch'] += time.perf_counter() - fetch_start
+                parse_start = time.perf_counter()
+                items = await asyncio.get_running_loop().run_in_executor(
+                    executor, scraper.items_from_page, response.text, url
+                )
+                timings['parse'] = time.perf_counter() - parse_start
+
+            return self._result(url, items, start_time, timings,
+                                getattr(scraper, 'menu_changed', True),
+                                getattr(scraper, 'menu_delta', []))
+
+        except Exception as e:
+            error_msg = f"{type(e).__name__}: {e}"
+            if self.verbose:
+                print(f"❌ {url}: FAILED - {error_msg}")
+            return {
+                'url': url,
+                'items': [],
+                'success': False,
+                'error': error_msg,
+                'count': 0,
+                'elapsed_time': 0,
+                'timings': {}
+            }
+
+    def _result(self, url: str, items: List[Dict], start_time: float, timings: Dict[str, float],
+                changed: bool = True, delta: Optional[List[Dict]] = None) -> Dict:
+        elapsed = time.perf_counter() - start_time
+        if self.verbose:
+            print(f"✅ {url}: {len(items)} items in {elapsed:.2f}s")
+        return {
+            'url': url,
+            'items': items,
+            'success': True,
+            'error': None,
+            'count': len(items),
+            'elapsed_time': elapsed,
+            'timings': timings,
+            'changed': changed,
+            'delta': list(delta or [])
+        }
+
+    async def _fetch(self, client: AsyncHttpClient, limiter: HostRateLimiter,
+                     url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """GET with per-host spacing and retries with exponential backoff"""
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            await limiter.wait(host)
+            try:
+                return await client.get(url, headers)
+            except Exception as e:
+                if attempt == self.retries or not _retryable(e):
+                    raise
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+                if isinstance(e, HttpError) and e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                await asyncio.sleep(delay)
@@ -0,0 +1,98 @@
+"""
+Scrape a local fake-restaurant server with the threaded and the asyncio engine.
+
+Usage:
+    python benchmarks/bench_async_scraper.py [--restaurants 1000] [--latency 0.2]
+                                             [--workers 8] [--concurrency 500]
+
+The server answers every vendor menu request after --latency seconds,
+like a remote site would, so the timing is dominated by how many
+requests each engine keeps in flight.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_scraper import AsyncRestaurantScraper  # noqa: E402
+from http_fetch import HttpMenuFetcher, create_session  # noqa: E402
+from restaurant_scrapers import SnappFoodScraper  # noqa: E402
+from threaded_scraper import ThreadedRestaurantScraper  # noqa: E402
+
+MENU = json.dumps({"data": {"menus": [{"products": [
+    {"title": f"غذا {i}", "price": 100000 + i * 1000, "discountRatio": 0, "stock": 10}
+    for i in range(40)
+]}]}}).encode('utf-8')
+
+
+class FakeRestaurantHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(MENU)))
+        self.end_headers()
+        self.wfile.write(MENU)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeRestaurantServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class BenchSnappFoodScraper(SnappFoodScraper):
+    """SnappFoodScraper reading the fake server over one shared session"""
+    menu_endpoint = None
+    fetcher = None
+
+    def __init__(self):
+        super().__init__(fetch_mode='http', http_fetcher=BenchSnappFoodScraper.fetcher)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    parser.add_argument("--workers", type=int, default=8, help="threads of the threaded engine")
+    parser.add_argument("--concurrency", type=int, default=500, help="requests in flight (asyncio)")
+    args = parser.parse_args()
+
+    server = FakeRestaurantServer(('127.0.0.1', 0), FakeRestaurantHandler)
+    server.latency = args.latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    BenchSnappFoodScraper.menu_endpoint = base + "/menu/{vendor_code}"
+    BenchSnappFoodScraper.fetcher = HttpMenuFetcher(session=create_session(pool_size=args.workers))
+    urls = [f"{base}/restaurant/menu/fake-r-{i:06d}/" for i in range(args.restaurants)]
+
+    try:
+        engines = [
+            (f"threaded ({args.workers} workers)", ThreadedRestaurantScraper(
+                BenchSnappFoodScraper, max_workers=args.workers, verbose=False, use_pool=False)),
+            (f"asyncio ({args.concurrency} in flight)", AsyncRestaurantScraper(
+                BenchSnappFoodScraper, concurrency=args.concurrency, per_host_rate=None, verbose=False)),
+        ]
+        for label, engine in engines:
+            start = time.perf_counter()
+            df = engine.scrape_all(urls)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<28} {len(urls):,} restaurants, {len(df):,} items, "
+                  f"{len(engine.errors)} errors: {elapsed:.2f}s "
+                  f"({len(urls) / elapsed:.0f} restaurants/s)")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
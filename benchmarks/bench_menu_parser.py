@@ -0,0 +1,97 @@
+"""
+Cards parsed per second by SnappFoodScraper with BeautifulSoup and with lxml.
+
+Usage:
+    python benchmarks/bench_menu_parser.py [--cards 300] [--html snappfood_debug.html]
+
+Without --html a menu page with --cards food cards in Snappfood's markup
+is generated. Both engines parse the same page (per-card logging is
+silenced) and must return the same items.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from restaurant_scrapers import SnappFoodScraper  # noqa: E402
+
+CARD = """
+<div data-testid="ProductCard-{i}" class="sc-card">
+  <div class="sc-media"><img src="/img/{i}.jpg" alt=""><span class="badge">{discount}٪</span></div>
+  <div class="sc-body">
+    <h3 class="sc-title">غذای شماره {i}</h3>
+    <p class="sc-description">توضیحات غذا با مواد اولیه تازه، سس مخصوص و نان {i}</p>
+    <!-- price block -->
+    <div class="sc-footer">
+      <div class="sc-prices">
+        <s class="old">{original:,}</s>
+        <span class="price">{price:,}</span><span class="unit">تومان</span>
+      </div>
+      <div class="sc-stock">{stock}</div>
+      <button><svg viewBox="0 0 24 24"><path d="M12 5v14M5 12h14"/></svg></button>
+    </div>
+  </div>
+</div>
+"""
+
+
+def build_page(n_cards: int) -> str:
+    cards = []
+    for i in range(n_cards):
+        price = 100000 + i * 1500
+        discount = (i % 4) * 5
+        cards.append(CARD.format(
+            i=i,
+            price=price * (100 - discount) // 100,
+            original=price,
+            discount=discount,
+            stock="ناموجود" if i % 10 == 0 else f"موجودی {i % 7 + 1}"
+        ))
+    return ("<html><head><script>window.x = 1;</script></head><body><main>"
+            + "".join(cards) + "</main></body></html>")
+
+
+def time_parser(html: str, engine: str, repeat: int):
+    scraper = SnappFoodScraper(fetch_mode='browser')
+    scraper.html_parser = engine
+    best = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            items = scraper.parse_menu_html(html, fallback=False)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return items, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=300, help="cards of the generated page")
+    parser.add_argument("--html", help="saved menu page to parse instead")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.html:
+        with open(args.html, encoding='utf-8') as f:
+            html = f.read()
+    else:
+        html = build_page(args.cards)
+
+    results = {}
+    for engine in ('bs4', 'lxml'):
+        items, best = time_parser(html, engine, args.repeat)
+        results[engine] = items
+        print(f"{engine:<5} {len(items):,} cards in {best * 1000:.1f} ms "
+              f"({len(items) / best:,.0f} cards/s)")
+
+    strip = [{k: v for k, v in item.items() if k != 'scraped_at'} for item in results['bs4']]
+    same = strip == [{k: v for k, v in item.items() if k != 'scraped_at'} for item in results['lxml']]
+    print(f"same items: {same}")
+
+
+if __name__ == "__main__":
+    main()
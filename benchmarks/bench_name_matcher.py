@@ -0,0 +1,93 @@
+"""
+Match our foods against a scraped catalog with NameMatcher and tfidf_merge.
+
+Usage:
+    python benchmarks/bench_name_matcher.py [--ours 10000] [--catalog 100000] [--check 300]
+
+Names are two to four words drawn from a Zipf-distributed vocabulary, so
+a few words ("پیتزا", "ویژه") appear in a large share of the catalog as
+on real menus. The first --check foods are also matched by the pairwise
+scan compare_prices used to do, and both must agree. tfidf_merge then
+matches the same names by character n-grams (--no-tfidf skips it).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_matcher import MIN_SIMILARITY, NameMatcher, jaccard, tfidf_merge, word_set  # noqa: E402
+
+COMMON_WORDS = ["پیتزا", "ویژه", "برگر", "مخصوص", "سالاد", "کباب", "مرغ", "گوشت",
+                "پنیر", "دوبل", "خانواده", "سوخاری", "فیله", "ساندویچ", "پاستا"]
+LETTERS = list("ابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی")
+
+
+def build_names(rng, n: int, vocabulary: list) -> list:
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    sizes = rng.integers(2, 5, n)
+    words = rng.choice(len(vocabulary), size=(n, 4), p=weights)
+    return [" ".join(vocabulary[w] for w in row[:size]) for row, size in zip(words, sizes)]
+
+
+def scan_match(name, catalog_sets):
+    """The pairwise loop of compare_prices"""
+    words = word_set(name)
+    best, best_similarity = None, 0
+    for position, other in enumerate(catalog_sets):
+        similarity = jaccard(words, other)
+        if similarity > best_similarity and similarity > MIN_SIMILARITY:
+            best_similarity, best = similarity, position
+    return None if best is None else (best, best_similarity)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ours", type=int, default=10_000)
+    parser.add_argument("--catalog", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=5_000)
+    parser.add_argument("--check", type=int, default=300, help="foods also matched pairwise")
+    parser.add_argument("--no-tfidf", action="store_true", help="skip tfidf_merge")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = COMMON_WORDS + ["".join(rng.choice(LETTERS, rng.integers(3, 8)))
+                                 for _ in range(args.vocabulary - len(COMMON_WORDS))]
+    ours = build_names(rng, args.ours, vocabulary)
+    catalog = build_names(rng, args.catalog, vocabulary)
+
+    start = time.perf_counter()
+    matcher = NameMatcher(catalog)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = matcher.match_all(ours)
+    matched = time.perf_counter() - start
+    found = sum(match is not None for match in matches)
+    print(f"index {len(catalog):,} names in {built:.2f}s, "
+          f"match {len(ours):,} foods in {matched:.2f}s ({found:,} matched)")
+
+    catalog_sets = [word_set(name) for name in catalog]
+    start = time.perf_counter()
+    expected = [scan_match(name, catalog_sets) for name in ours[:args.check]]
+    scanned = time.perf_counter() - start
+    per_food = scanned / max(args.check, 1)
+    print(f"pairwise scan: {per_food * 1000:.1f} ms per food "
+          f"(~{per_food * len(ours):,.0f}s for all {len(ours):,})")
+    print(f"same matches: {expected == matches[:args.check]}")
+
+    if not args.no_tfidf:
+        start = time.perf_counter()
+        merged = tfidf_merge(pd.DataFrame({'name': ours}), pd.DataFrame({'name': catalog}))
+        merged_in = time.perf_counter() - start
+        print(f"tfidf_merge: {len(merged):,} matches in {merged_in:.2f}s "
+              f"({(merged['score'] == 1.0).sum():,} identical names)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput of the persian_text normalization on food names and card text.
+
+Usage:
+    python benchmarks/bench_persian_text.py [--names 200000] [--distinct 5000]
+
+--names food names are drawn from --distinct different ones (Arabic and
+Persian letter variants, ZWNJ, Persian digits), as in a day of searches
+and price comparisons. Each function runs once with a cold cache and
+once warm; parse_int is compared with a per-digit regex substitution.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import persian_text  # noqa: E402
+
+WORDS = ["پيتزا", "پیتزا", "كباب", "کباب", "سیب‌زمینی", "مرغ", "ویژه", "مخصوص",
+         "ساندويچ", "دوبل", "سالاد", "سزار", "فیله", "سوخاری", "پنیر", "گوشت"]
+_PERSIAN_DIGIT_RE = re.compile('[۰-۹]')
+
+
+def regex_parse_int(text: str) -> int:
+    """Digits converted one regex match at a time"""
+    text = _PERSIAN_DIGIT_RE.sub(lambda m: str(ord(m.group()) - ord('۰')), text)
+    digits = ''.join(re.findall(r'\d+', text))
+    return int(digits) if digits else 0
+
+
+def build_names(rng, n_distinct: int) -> list:
+    names = []
+    for i in range(n_distinct):
+        words = rng.choice(WORDS, rng.integers(2, 5))
+        digits = "".join("۰۱۲۳۴۵۶۷۸۹"[int(d)] for d in str(i % 10 + 1))
+        names.append(" ".join(words) + f" {digits} نفره")
+    return names
+
+
+def timed(label: str, function, values, clear=None):
+    """One pass from an empty cache and one warm pass (one pass if uncached)"""
+    for state in ("cold", "warm") if clear else ("",):
+        if state == "cold":
+            clear()
+        start = time.perf_counter()
+        for value in values:
+            function(value)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {state:<4} {len(values) / elapsed:>12,.0f} strings/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    distinct = build_names(rng, args.distinct)
+    names = [distinct[i] for i in rng.integers(0, len(distinct), args.names)]
+    prices = [f"{'۱۲۳۴۵۶۷۸۹'[i % 9]}۲۰٬۰۰۰ تومان" for i in range(args.names)]
+
+    timed("normalize", persian_text.normalize, names, persian_text._normalize_cached.cache_clear)
+    timed("tokenize", persian_text.tokenize, names, persian_text._tokens_cached.cache_clear)
+    timed("word_set", persian_text.word_set, names, persian_text._word_set_cached.cache_clear)
+    timed("normalize, no cache", persian_text._normalize, names)
+    timed("lower().split()", lambda name: frozenset(name.lower().split()), names)
+    timed("parse_int", persian_text.parse_int, prices)
+    timed("regex digits", regex_parse_int, prices)
+    assert all(persian_text.parse_int(p) == regex_parse_int(p) for p in prices[:1000])
+
+    text = " ".join(names[:2000])
+    start = time.perf_counter()
+    for _ in range(20):
+        persian_text.normalize(text)
+    elapsed = time.perf_counter() - start
+    print(f"normalize long text: {20 * len(text.encode('utf-8')) / elapsed / 1e6:,.0f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
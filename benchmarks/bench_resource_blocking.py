@@ -0,0 +1,113 @@
+"""
+Page load time and bandwidth of headless Chrome per resource blocking profile.
+
+Usage:
+    python benchmarks/bench_resource_blocking.py [--cards 120] [--latency 0.03]
+
+A local server plays a Snappfood menu page: --cards food cards, each
+with a photo, two web fonts, a video and an analytics script (served
+under a googletagmanager.com path so the tracker patterns match). Every
+asset is answered after --latency seconds. Each profile scrapes the
+page with SnappFoodScraper in browser mode and must find every card.
+Needs Chrome and a ChromeDriver.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from driver_pool import RESOURCE_BLOCKING_PROFILES  # noqa: E402
+from restaurant_scrapers import SnappFoodScraper  # noqa: E402
+
+ASSETS = {
+    '.jpg': ('image/jpeg', 60 * 1024),
+    '.woff2': ('font/woff2', 120 * 1024),
+    '.mp4': ('video/mp4', 512 * 1024),
+    '.js': ('application/javascript', 200 * 1024),
+}
+
+
+def build_page(n_cards: int) -> str:
+    cards = "".join(
+        f'<div data-testid="ProductCard-{i}"><img src="/img/{i}.jpg" width="80">'
+        f'<h3>غذای {i}</h3><p class="description">توضیح {i}</p>'
+        f'<div><span>{100000 + i * 1000:,}</span></div></div>'
+        for i in range(n_cards)
+    )
+    return f"""<html><head><meta charset="utf-8">
+<style>
+@font-face {{ font-family: Vazir; src: url(/fonts/vazir.woff2); }}
+@font-face {{ font-family: VazirBold; src: url(/fonts/vazir-bold.woff2); }}
+body {{ font-family: Vazir; }} h3 {{ font-family: VazirBold; }}
+</style>
+<script async src="/googletagmanager.com/gtm.js"></script>
+</head><body><video src="/media/promo.mp4" autoplay muted></video>{cards}</body></html>"""
+
+
+class FakeMenuHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        path = self.path.split('?')[0]
+        if path == '/menu':
+            body = self.server.page.encode('utf-8')
+            content_type = 'text/html; charset=utf-8'
+        else:
+            ext = os.path.splitext(path)[1]
+            if ext not in ASSETS:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            content_type, size = ASSETS[ext]
+            body = b'/*' + b'0' * (size - 4) + b'*/' if ext == '.js' else b'\0' * size
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeMenuServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.03, help="seconds per response")
+    args = parser.parse_args()
+
+    server = FakeMenuServer(('127.0.0.1', 0), FakeMenuHandler)
+    server.latency = args.latency
+    server.page = build_page(args.cards)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/menu"
+
+    try:
+        for profile in RESOURCE_BLOCKING_PROFILES:
+            scraper = SnappFoodScraper(fetch_mode='browser', resource_blocking=profile)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                items = scraper.scrape_menu(url)
+            elapsed = time.perf_counter() - start
+            metrics = scraper.page_metrics
+            print(f"{profile:<6} {len(items)}/{args.cards} cards, "
+                  f"{metrics.get('transfer_kb', 0):,.0f} kB in {metrics.get('resources', 0)} resources, "
+                  f"load {metrics.get('load_s', 0):.2f}s, scrape {elapsed:.2f}s")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
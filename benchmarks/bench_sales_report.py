@@ -0,0 +1,91 @@
+"""
+Time AdminService.get_sales_report on a synthetic year of orders.
+
+Usage:
+    python benchmarks/bench_sales_report.py [--items 1000000]
+
+The tables are written to a temporary directory and loaded once, so the
+timing covers the report itself (join, filter and breakdowns).
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin_service import AdminService  # noqa: E402
+from database import Database  # noqa: E402
+from storage import CSVBackend  # noqa: E402
+
+
+def build_tables(db: Database, n_items: int, n_foods: int = 500, items_per_order: int = 4):
+    rng = np.random.default_rng(0)
+    food_ids = [f"food-{i}" for i in range(n_foods)]
+    db.save_foods(pd.DataFrame({
+        'food_id': food_ids,
+        'restaurant_id': [f"rest-{i % 20}" for i in range(n_foods)],
+        'name': [f"food {i}" for i in range(n_foods)],
+        'category': [f"cat-{i % 8}" for i in range(n_foods)],
+        'selling_price': rng.integers(10, 100, n_foods) * 1000,
+        'cost_price': rng.integers(5, 50, n_foods) * 1000,
+        'ingredients': "",
+        'description': "",
+        'stock': 100,
+        'available_dates': "[]"
+    }))
+
+    n_orders = n_items // items_per_order
+    order_ids = [f"order-{i}" for i in range(n_orders)]
+    seconds = rng.integers(0, 365 * 24 * 3600, n_orders)
+    order_dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(seconds, unit='s')
+    db.backend.write_table('orders', pd.DataFrame({
+        'order_id': order_ids,
+        'restaurant_id': [f"rest-{i % 20}" for i in range(n_orders)],
+        'customer_id': [f"cust-{i % 5000}" for i in range(n_orders)],
+        'order_date': order_dates.strftime("%Y-%m-%d %H:%M:%S"),
+        'delivery_date': order_dates.strftime("%Y-%m-%d"),
+        'status': "Paid",
+        'total_amount': 0.0,
+        'discount_amount': 0.0,
+        'payment_method': "Online",
+        'discount_code': ""
+    }))
+    db.backend.write_table('order_items', pd.DataFrame({
+        'order_id': np.repeat(order_ids, items_per_order),
+        'food_id': rng.choice(food_ids, n_orders * items_per_order),
+        'quantity': rng.integers(1, 5, n_orders * items_per_order),
+        'unit_price': rng.integers(10, 100, n_orders * items_per_order) * 1000.0
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=1_000_000, help="number of order items")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        admin = AdminService()
+        admin.db = Database(backend=CSVBackend(tmp_dir))
+        build_tables(admin.db, args.items)
+        # warm the table cache, the report itself is what we time
+        admin.db.load_orders(), admin.db.load_order_items(), admin.db.load_foods()
+
+        for _ in range(3):
+            start = time.perf_counter()
+            report = admin.get_sales_report(date(2025, 1, 1), date(2025, 12, 31))
+            elapsed = time.perf_counter() - start
+            print(f"{args.items:,} items, {report['order_count']:,} orders: {elapsed:.3f}s")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
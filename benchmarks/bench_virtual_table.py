@@ -0,0 +1,85 @@
+"""
+Time what the order management table loads: every order, or one page.
+
+Usage:
+    python benchmarks/bench_virtual_table.py [--orders 200000] [--page-size 100]
+
+The old table called get_all_orders() and inserted every row into the
+Treeview; VirtualTable asks for count_orders() and the page on screen,
+sorted and filtered by the admin service, which keeps the sorted view
+for the next pages. Both run on a warm table cache.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin_service import AdminService  # noqa: E402
+from database import Database  # noqa: E402
+from storage import CSVBackend  # noqa: E402
+
+
+def build_orders(db: Database, n_orders: int):
+    rng = np.random.default_rng(0)
+    seconds = rng.integers(0, 365 * 24 * 3600, n_orders)
+    order_dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(seconds, unit='s')
+    db.backend.write_table('orders', pd.DataFrame({
+        'order_id': [f"order-{i}" for i in range(n_orders)],
+        'restaurant_id': [f"rest-{i % 20}" for i in range(n_orders)],
+        'customer_id': [f"cust-{i % 5000}" for i in range(n_orders)],
+        'order_date': order_dates.strftime("%Y-%m-%d %H:%M:%S"),
+        'delivery_date': order_dates.strftime("%Y-%m-%d"),
+        'status': rng.choice(["Pending", "Paid", "Sent", "Cancelled"], n_orders),
+        'total_amount': rng.integers(10, 1000, n_orders) * 1000.0,
+        'discount_amount': 0.0,
+        'payment_method': "Online",
+        'discount_code': ""
+    }))
+
+
+def timed(label: str, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<40} {time.perf_counter() - start:>8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        admin = AdminService()
+        admin.db = Database(backend=CSVBackend(tmp_dir))
+        build_orders(admin.db, args.orders)
+        admin.db.load_orders(), admin.db.load_users()
+
+        orders = timed("get_all_orders() (every row)", admin.get_all_orders)
+        timed("count_orders()", admin.count_orders)
+        timed(f"page of {args.page_size}, newest first",
+              lambda: admin.get_all_orders(sort_by='date', descending=True,
+                                           limit=args.page_size, offset=args.orders // 2))
+        timed("next page, same sort (scrolling)",
+              lambda: admin.get_all_orders(sort_by='date', descending=True,
+                                           limit=args.page_size,
+                                           offset=args.orders // 2 + args.page_size))
+        timed(f"page of {args.page_size}, status + search",
+              lambda: admin.get_all_orders(status="Paid", search="cust-42",
+                                           limit=args.page_size))
+        print(f"rows per screen: {args.page_size:,} instead of {len(orders):,}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 from model import Review, DiscountCode
 from database import Database
 
@@ -12,29 +12,37 @@ class CustomerService:
     # -------------------------------------------------------
     # Order History
     # -------------------------------------------------------
-    def get_order_history(self, customer_id: str) -> List[dict]:
-        """Retrieve customer's order history with full details"""
+    def get_order_history(self, customer_id: str, limit: Optional[int] = None,
+                          offset: int = 0) -> List[dict]:
+        """
+        Retrieve customer's order history with full details, newest first.
+        limit/offset select a page; the items of that page and their food
+        names are fetched with one lookup each and joined in memory.
+        """
         orders_df = self.db.get_customer_orders(customer_id)
-        foods_df = self.db.load_foods()
-        history = []
-
-        for _, order_row in orders_df.iterrows():
-            # Get order items
-            items_df = self.db.get_order_items(order_row['order_id'])
-
-            # Build item details list
-            items_details = []
-            for _, item_row in items_df.iterrows():
-                food = foods_df[foods_df['food_id'] == item_row['food_id']]
-                food_name = food.iloc[0]['name'] if not food.empty else item_row['food_id']
-
-                items_details.append({
-                    'food_name': food_name,
-                    'quantity': int(item_row['quantity']),
-                    'unit_price': float(item_row['unit_price']),
-                    'total': int(item_row['quantity']) * float(item_row['unit_price'])
-                })
+        end = None if limit is None else offset + limit
+        orders_df = orders_df.iloc[offset:end]
+        if orders_df.empty:
+            return []
+
+        items_df = self.db.get_items_for_orders(orders_df['order_id'])
+        foods_df = self.db.find_foods_by_ids(items_df['food_id'].astype(str))
+        food_names = dict(zip(foods_df['food_id'], foods_df['name']))
+
+        # Build item details lists, grouped by order
+        items_by_order = {}
+        for item_row in items_df.to_dict('records'):
+            quantity = int(item_row['quantity'])
+            unit_price = float(item_row['unit_price'])
+            items_by_order.setdefault(item_row['order_id'], []).append({
+                'food_name': food_names.get(str(item_row['food_id']), item_row['food_id']),
+                'quantity': quantity,
+                'unit_price': unit_price,
+                'total': quantity * unit_price
+            })
 
+        history = []
+        for order_row in orders_df.to_dict('records'):
             history.append({
                 'order_id': order_row['order_id'],
                 'date': order_row['order_date'],
@@ -43,11 +51,15 @@ class CustomerService:
                 'total_amount': float(order_row['total_amount']) + float(order_row['discount_amount']),
                 # final_amount: amount actually paid by customer
                 'final_amount': float(order_row['total_amount']),
-                'items': items_details
+                'items': items_by_order.get(order_row['order_id'], [])
             })
 
         return history
 
+    def count_orders(self, customer_id: str) -> int:
+        """Number of orders of the customer (for paging the history)"""
+        return len(self.db.get_customer_orders(customer_id))
+
     # -------------------------------------------------------
     # Reviews
     # -------------------------------------------------------
@@ -1,83 +1,252 @@
 import pandas as pd
-import os
+import functools
 import json
+import random
+import time
+from contextlib import nullcontext
 from model import User, Food
 from datetime import datetime, date
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from storage import StorageBackend, TABLE_SCHEMAS, create_backend
+from table_cache import TableCache
+from search_index import SearchIndexCache
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_list(date_str: str) -> tuple:
+    """JSON list of dates -> tuple of date objects, memoized per distinct string"""
+    try:
+        dates = json.loads(date_str)
+        return tuple(datetime.strptime(d, "%Y-%m-%d").date() for d in dates)
+    except Exception:
+        return ()
 
 
 class Database:
-    def __init__(self):
-        self.users_file = "users.csv"
-        self.foods_file = "foods.csv"
-        self.orders_file = "orders.csv"
-        self.order_items_file = "order_items.csv"
-        self.reviews_file = "reviews.csv"
-        self.discount_codes_file = "discount_codes.csv"
+    # parsed tables shared by every Database instance in the process
+    cache = TableCache()
+    # full-text indexes of the foods table, see search_index
+    search_indexes = SearchIndexCache()
+
+    # optimistic read-modify-write: conflicts retried before falling back to
+    # computing the update with the table lock held
+    max_retries = 5
+    retry_delay = 0.01
+
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        # CSV files by default, see storage.create_backend for SQLite
+        self.backend = backend or create_backend()
+        self.users_file = self.backend.table_path('users')
+        self.foods_file = self.backend.table_path('foods')
+        self.orders_file = self.backend.table_path('orders')
+        self.order_items_file = self.backend.table_path('order_items')
+        self.reviews_file = self.backend.table_path('reviews')
+        self.discount_codes_file = self.backend.table_path('discount_codes')
         self._init_files()
 
     def _init_files(self):
-        # Users table
-        if not os.path.exists(self.users_file):
-            cols = [
-                'user_id', 'role', 'first_name', 'last_name', 'email', 'password',
-                'phone', 'national_code', 'address', 'personnel_id',
-                'loyalty_points', 'failed_attempts', 'is_locked'
-            ]
-            pd.DataFrame(columns=cols).to_csv(self.users_file, index=False)
-
-        # Foods table
-        if not os.path.exists(self.foods_file):
-            cols = [
-            'food_id', 'restaurant_id', 'name', 'category', 'selling_price', 'cost_price',
-            'ingredients', 'description', 'stock', 'available_dates'
-            ]
-            pd.DataFrame(columns=cols).to_csv(self.foods_file, index=False)
-
-        # Orders table
-        if not os.path.exists(self.orders_file):
-            cols = [
-                'order_id', 'customer_id', 'order_date', 'delivery_date',
-                'status', 'total_amount', 'discount_amount',
-                'payment_method', 'discount_code'
-            ]
-            pd.DataFrame(columns=cols).to_csv(self.orders_file, index=False)
-
-        # Order items table
-        if not os.path.exists(self.order_items_file):
-            cols = ['order_id', 'food_id', 'quantity', 'unit_price']
-            pd.DataFrame(columns=cols).to_csv(self.order_items_file, index=False)
-
-        # Reviews table (Phase 5)
-        if not os.path.exists(self.reviews_file):
-            cols = [
-                'review_id', 'customer_id', 'order_id',
-                'rating', 'comment', 'review_date'
-            ]
-            pd.DataFrame(columns=cols).to_csv(self.reviews_file, index=False)
-
-        # Discount codes table (Phase 5)
-        if not os.path.exists(self.discount_codes_file):
-            cols = [
-                'code', 'discount_percentage', 'expiry_date',
-                'is_used', 'customer_id'
-            ]
-            pd.DataFrame(columns=cols).to_csv(self.discount_codes_file, index=False)
+        # users, foods, orders, order_items, reviews (Phase 5), discount_codes (Phase 5)
+        for table in TABLE_SCHEMAS:
+            self.backend.ensure_table(table)
+
+    # -------------------------------------------------------
+    # Cached reads & writes
+    # -------------------------------------------------------
+    # cached variants of a table: 'raw' as stored, 'foods' with parsed types
+    def _variants(self, table: str) -> tuple:
+        return ('raw', 'foods') if table == 'foods' else ('raw',)
+
+    def _key(self, table: str, variant: str = 'raw') -> tuple:
+        return (self.backend.table_path(table), table, variant)
+
+    def _loader(self, table: str, variant: str):
+        if variant == 'foods':
+            return lambda: self._prepare_foods(self.backend.read_table('foods', dtype=str))
+        return lambda: self.backend.read_table(table)
+
+    def _load(self, table: str, variant: str = 'raw', copy: bool = True) -> pd.DataFrame:
+        """Read a table through the shared cache"""
+        return self.cache.get(
+            self._key(table, variant),
+            self.backend.version_token(table),
+            self._loader(table, variant),
+            copy=copy
+        )
+
+    def _find(self, table: str, column: str, value, variant: str = 'raw') -> pd.DataFrame:
+        """Rows where column == value, from SQL indexes or an in-memory hash index"""
+        if self.backend.supports_point_lookups:
+            df = self.backend.find_rows(table, column, value, dtype=str if variant == 'foods' else None)
+            return self._prepare_foods(df) if variant == 'foods' else df
+        return self.cache.lookup(
+            self._key(table, variant),
+            self.backend.version_token(table),
+            self._loader(table, variant),
+            column,
+            value
+        )
+
+    def _find_many(self, table: str, column: str, values, variant: str = 'raw') -> pd.DataFrame:
+        """Rows where column is one of values, in one query or index lookup"""
+        values = list(values)
+        if self.backend.supports_point_lookups:
+            df = self.backend.find_rows_in(table, column, values,
+                                           dtype=str if variant == 'foods' else None)
+            return self._prepare_foods(df) if variant == 'foods' else df
+        return self.cache.lookup_many(
+            self._key(table, variant),
+            self.backend.version_token(table),
+            self._loader(table, variant),
+            column,
+            list(dict.fromkeys(values))
+        )
+
+    def _invalidate(self, table: str):
+        self.cache.invalidate(self.backend.table_path(table), table)
+        if table == 'foods':
+            self.search_indexes.invalidate(self.backend.table_path(table))
+
+    def _patch_search_index(self, table: str, column: str, old_token, new_token, change):
+        if table != 'foods':
+            return
+        if column != 'food_id':
+            self.search_indexes.invalidate(self.backend.table_path(table))
+            return
+        self.search_indexes.apply(self.backend.table_path(table), old_token, new_token, change)
+
+    def _append(self, table: str, rows: List[dict]):
+        # tokens are taken under the lock so no other writer slips in between
+        with self.backend.lock(table):
+            old_token = self.backend.version_token(table)
+            self.backend.append_rows(table, rows)
+            new_token = self.backend.version_token(table)
+        # patch cached frames and their indexes instead of reloading the table
+        for variant in self._variants(table):
+            key = self._key(table, variant)
+            if key in self.cache:
+                if variant == 'foods':
+                    new_rows = self._prepare_foods(self.backend.parse_rows(table, rows, dtype=str))
+                else:
+                    new_rows = self.backend.parse_rows(table, rows)
+                self.cache.apply_append(key, old_token, new_token, new_rows)
+
+        def add_rows(index):
+            for row in rows:
+                index.add(row['food_id'], row)
+        self._patch_search_index(table, 'food_id', old_token, new_token, add_rows)
+
+    def _update(self, table: str, column: str, value, fields: dict) -> int:
+        with self.backend.lock(table):
+            old_token = self.backend.version_token(table)
+            updated = self.backend.update_rows(table, column, value, fields)
+            if updated == 0:
+                return 0
+            new_token = self.backend.version_token(table)
+        for variant in self._variants(table):
+            variant_fields = fields
+            if variant == 'foods' and 'available_dates' in fields:
+                variant_fields = dict(fields)
+                variant_fields['available_dates'] = self._parse_dates(fields['available_dates'])
+            self.cache.apply_update(
+                self._key(table, variant), old_token, new_token, column, value, variant_fields
+            )
+        self._patch_search_index(table, column, old_token, new_token,
+                                 lambda index: index.update(value, fields))
+        return updated
+
+    def _update_many(self, table: str, column: str, updates: dict) -> int:
+        with self.backend.lock(table):
+            old_token = self.backend.version_token(table)
+            updated = self.backend.update_many(table, column, updates)
+            if updated == 0:
+                return 0
+            new_token = self.backend.version_token(table)
+        for variant in self._variants(table):
+            self.cache.apply_updates(self._key(table, variant), old_token, new_token, column, updates)
+
+        def update_rows(index):
+            for value, fields in updates.items():
+                index.update(value, fields)
+        self._patch_search_index(table, column, old_token, new_token, update_rows)
+        return updated
+
+    def _row_versions(self, table: str, column: str, keys: Iterable) -> Tuple[dict, dict]:
+        """Current rows {key: row or None} and their versions (the stored values)"""
+        rows, versions = {}, {}
+        for key in keys:
+            found = self._find(table, column, key)
+            rows[key] = None if found.empty else found.iloc[0]
+            versions[key] = None if found.empty else tuple(str(v) for v in found.iloc[0].tolist())
+        return rows, versions
+
+    def _modify_rows(self, table: str, column: str, keys: Iterable,
+                     compute: Callable[[dict], Tuple[dict, object]]):
+        """
+        Optimistic read-modify-write of the rows where column is one of keys.
+        compute(rows) gets {key: row or None} and returns ({key: fields}, result).
+        The rows are read and compute runs without the lock; the lock is only
+        held to check that no row changed meanwhile and to write. On a
+        conflict the whole step is retried, the last attempt holding the lock
+        throughout. A ValueError from compute is raised only once the rows it
+        saw are confirmed current.
+        """
+        keys = list(keys)
+        for attempt in range(self.max_retries + 1):
+            exclusive = attempt == self.max_retries
+            with self.backend.lock(table) if exclusive else nullcontext():
+                rows, versions = self._row_versions(table, column, keys)
+                error, updates, result = None, {}, None
+                try:
+                    updates, result = compute(rows)
+                except ValueError as e:
+                    error = e
+
+                with self.backend.lock(table):
+                    if exclusive or self._row_versions(table, column, keys)[1] == versions:
+                        if error is not None:
+                            raise error
+                        if updates:
+                            self._update_many(table, column, updates)
+                        return result
+            time.sleep(self.retry_delay * (2 ** attempt) * random.random())
+
+    def _delete(self, table: str, column: str, value) -> int:
+        with self.backend.lock(table):
+            old_token = self.backend.version_token(table)
+            deleted = self.backend.delete_rows(table, column, value)
+            new_token = self.backend.version_token(table)
+        # row positions shift, indexes are rebuilt on the next load
+        self.cache.invalidate(self.backend.table_path(table), table)
+        self._patch_search_index(table, column, old_token, new_token,
+                                 lambda index: index.remove(value))
+        return deleted
+
+    def _write(self, table: str, df: pd.DataFrame):
+        self.backend.write_table(table, df)
+        self._invalidate(table)
+
+    def compact(self):
+        """Fold journaled updates of the append-only tables back into their files"""
+        for table in TABLE_SCHEMAS:
+            self.backend.compact(table)
+            self._invalidate(table)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss/reload counters of the shared table cache"""
+        return self.cache.get_stats()
 
     # -------------------------------------------------------
     # Users
     # -------------------------------------------------------
     def load_users(self) -> pd.DataFrame:
-        return pd.read_csv(self.users_file)
+        return self._load('users')
 
     def save_user(self, user: User):
-        df = self.load_users()
-
         if hasattr(user, 'national_code') and user.national_code:
-            if not df[df['national_code'] == user.national_code].empty:
+            if not self._find('users', 'national_code', user.national_code).empty:
                 raise ValueError("National code already exists")
 
-        if not df[df['email'] == user.email].empty:
+        if not self._find('users', 'email', user.email).empty:
             raise ValueError("Email already exists")
 
         user_data = {
@@ -96,22 +265,16 @@ class Database:
             'is_locked': False
         }
 
-        pd.concat(
-            [df, pd.DataFrame([user_data])],
-            ignore_index=True
-        ).to_csv(self.users_file, index=False)
+        self._append('users', [user_data])
 
     def update_user_login_state(self, email: str, failed_attempts: int, is_locked: bool):
-        df = self.load_users()
-        index = df[df['email'] == email].index
-        if len(index) > 0:
-            df.at[index[0], 'failed_attempts'] = failed_attempts
-            df.at[index[0], 'is_locked'] = is_locked
-            df.to_csv(self.users_file, index=False)
+        self._update('users', 'email', email, {
+            'failed_attempts': failed_attempts,
+            'is_locked': is_locked
+        })
 
     def find_user_by_email(self, email: str) -> Optional[pd.Series]:
-        df = self.load_users()
-        user = df[df['email'] == email]
+        user = self._find('users', 'email', email)
         return None if user.empty else user.iloc[0]
 
     def find_admin_by_personnel(self, personnel_id: str) -> Optional[pd.Series]:
@@ -123,14 +286,8 @@ class Database:
         return None if admin.empty else admin.iloc[0]
 
     def update_user_profile(self, email: str, updated_fields: dict):
-        df = self.load_users()
-        index = df[df['email'] == email].index
-        if len(index) > 0:
-            for field, value in updated_fields.items():
-                if field in df.columns:
-                    df.at[index[0], field] = value
-            df.to_csv(self.users_file, index=False)
-        else:
+        updated = self._update('users', 'email', email, updated_fields)
+        if updated == 0:
             raise ValueError("User not found")
 
     # -------------------------------------------------------
@@ -139,37 +296,118 @@ class Database:
     def _parse_dates(self, date_str: str) -> List[date]:
         if pd.isna(date_str) or date_str == "":
             return []
-        try:
-            dates = json.loads(date_str)
-            return [datetime.strptime(d, "%Y-%m-%d").date() for d in dates]
-        except Exception:
-            return []
+        # most foods share a handful of date lists, parse each one once
+        return list(_parse_date_list(date_str))
 
     def _format_dates(self, dates_list: List[date]) -> str:
         return json.dumps([d.strftime("%Y-%m-%d") for d in dates_list])
 
-    def load_foods(self) -> pd.DataFrame:
-        df = pd.read_csv(self.foods_file, dtype=str)
+    def _prepare_foods(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert raw text columns of the foods table into proper types"""
         df['available_dates'] = df['available_dates'].apply(self._parse_dates)
         df['selling_price'] = pd.to_numeric(df['selling_price'])
         df['cost_price'] = pd.to_numeric(df['cost_price'])
         df['stock'] = pd.to_numeric(df['stock'])
         return df
 
+    def load_foods(self) -> pd.DataFrame:
+        return self._load('foods', variant='foods')
+
+    def save_foods(self, df: pd.DataFrame):
+        """Replace the whole foods table (available_dates may be lists or JSON)"""
+        df = df.copy()
+        df['available_dates'] = df['available_dates'].apply(
+            lambda v: self._format_dates(v) if isinstance(v, list) else v
+        )
+        self._write('foods', df)
+
+    def _lookup_foods(self, column: str, value) -> pd.DataFrame:
+        """Foods where column == value (or contains it), from the cached table"""
+        return self.cache.lookup(
+            self._key('foods', 'foods'),
+            self.backend.version_token('foods'),
+            self._loader('foods', 'foods'),
+            column,
+            value
+        )
+
+    def find_foods_by_date(self, day: date) -> pd.DataFrame:
+        """
+        Foods available on day, answered from the date -> foods inverted
+        index of the cached foods table (kept up to date by save_food and
+        update_food), so the cost follows the number of matching foods.
+        """
+        return self._lookup_foods('available_dates', day)
+
+    def search_foods(self, query: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Foods whose name, ingredients or description contain every word of
+        query (as a word or word prefix, Persian-normalized), best first.
+        """
+        index = self.search_indexes.get(
+            self.backend.table_path('foods'),
+            self.backend.version_token('foods'),
+            lambda: self._load('foods', variant='foods', copy=False)
+        )
+        return self.cache.lookup_many(
+            self._key('foods', 'foods'),
+            self.backend.version_token('foods'),
+            self._loader('foods', 'foods'),
+            'food_id',
+            index.search(query, limit)
+        )
+
     def find_food_by_id(self, food_id: str) -> Optional[pd.Series]:
-        df = self.load_foods()
-        food = df[df['food_id'] == food_id]
+        food = self._find('foods', 'food_id', food_id, variant='foods')
         return None if food.empty else food.iloc[0]
 
+    def find_foods_by_ids(self, food_ids) -> pd.DataFrame:
+        return self._find_many('foods', 'food_id', food_ids, variant='foods')
+
     def update_food_stock(self, food_id: str, new_stock: int):
-        df = self.load_foods()
-        index = df[df['food_id'] == food_id].index
-        if len(index) > 0:
-            df.at[index[0], 'stock'] = new_stock
-            df.to_csv(self.foods_file, index=False)
+        self._update('foods', 'food_id', food_id, {'stock': new_stock})
+
+    def reserve_stock(self, quantities: Dict[str, int]) -> Dict[str, int]:
+        """
+        Take quantities {food_id: quantity} out of stock in one write.
+        All foods are checked first; if any is missing or short,
+        nothing is changed. Returns the new stock of each food.
+        """
+        return self._adjust_stock({fid: -qty for fid, qty in quantities.items()}, strict=True)
+
+    def release_stock(self, quantities: Dict[str, int]) -> Dict[str, int]:
+        """Put quantities back into stock in one write (unknown foods are skipped)"""
+        return self._adjust_stock(dict(quantities), strict=False)
+
+    def _adjust_stock(self, deltas: Dict[str, int], strict: bool) -> Dict[str, int]:
+        def compute(rows):
+            new_stock = {}
+            for food_id, delta in deltas.items():
+                food = rows[food_id]
+                if food is None:
+                    if strict:
+                        raise ValueError(f"Food with ID {food_id} not found")
+                    continue
+                current = int(float(food['stock']))
+                if current + delta < 0:
+                    raise ValueError(f"Insufficient stock for {food['name']}")
+                new_stock[food_id] = current + delta
+            return {food_id: {'stock': stock} for food_id, stock in new_stock.items()}, new_stock
+
+        return self._modify_rows('foods', 'food_id', deltas, compute)
+
+    def update_food(self, food_id: str, fields: dict):
+        """Update some columns of a food, raise if the food does not exist"""
+        if 'available_dates' in fields:
+            fields = dict(fields)
+            fields['available_dates'] = self._format_dates(fields['available_dates'])
+        if self._update('foods', 'food_id', food_id, fields) == 0:
+            raise ValueError("Food not found")
+
+    def delete_food(self, food_id: str):
+        self._delete('foods', 'food_id', food_id)
 
     def save_food(self, food: Food):
-        df = self.load_foods()
         food_data = {
             'food_id': str(food.food_id),
             'restaurant_id': str(food.restaurant_id),
@@ -183,24 +421,18 @@ class Database:
             'available_dates': self._format_dates(food.available_dates)
         }
 
-        pd.concat(
-            [df, pd.DataFrame([food_data])],
-            ignore_index=True
-        ).to_csv(self.foods_file, index=False)
+        self._append('foods', [food_data])
 
     # -------------------------------------------------------
     # Orders
     # -------------------------------------------------------
-    def save_order(self, order):
-        if os.path.exists(self.orders_file) and os.path.getsize(self.orders_file) > 0:
-            df = pd.read_csv(self.orders_file)
-        else:
-            df = pd.DataFrame(columns=[
-                    'order_id', 'restaurant_id', 'customer_id', 'order_date', 'delivery_date',
-                    'status', 'total_amount', 'discount_amount',
-                    'payment_method', 'discount_code'
-            ])
+    def load_orders(self) -> pd.DataFrame:
+        return self._load('orders')
 
+    def load_order_items(self) -> pd.DataFrame:
+        return self._load('order_items')
+
+    def save_order(self, order):
         order_data = {
             'order_id': order.order_id,
             'restaurant_id': order.restaurant_id, 
@@ -214,17 +446,9 @@ class Database:
             'discount_code': order.discount_code
         }
 
-        pd.concat(
-            [df, pd.DataFrame([order_data])],
-            ignore_index=True
-        ).to_csv(self.orders_file, index=False)
+        self._append('orders', [order_data])
 
     def save_order_items(self, order_id: str, items):
-        if os.path.exists(self.order_items_file) and os.path.getsize(self.order_items_file) > 0:
-            df = pd.read_csv(self.order_items_file)
-        else:
-            df = pd.DataFrame(columns=['order_id', 'food_id', 'quantity', 'unit_price'])
-
         items_data = [
             {
                 'order_id': order_id,
@@ -235,40 +459,35 @@ class Database:
         ]
 
         if items_data:
-            pd.concat(
-                [df, pd.DataFrame(items_data)],
-                ignore_index=True
-            ).to_csv(self.order_items_file, index=False)
+            self._append('order_items', items_data)
 
     def update_order_status(self, order_id: str, new_status: str):
-        df = pd.read_csv(self.orders_file)
-        index = df[df['order_id'] == order_id].index
-        if len(index) > 0:
-            df.at[index[0], 'status'] = new_status
-            df.to_csv(self.orders_file, index=False)
+        self._update('orders', 'order_id', order_id, {'status': new_status})
 
     def get_order_items(self, order_id: str) -> pd.DataFrame:
-        df = pd.read_csv(self.order_items_file)
-        return df[df['order_id'] == order_id]
+        return self._find('order_items', 'order_id', order_id)
+
+    def get_items_for_orders(self, order_ids) -> pd.DataFrame:
+        """Items of several orders at once"""
+        return self._find_many('order_items', 'order_id', order_ids)
 
     def get_customer_orders(self, customer_id: str) -> pd.DataFrame:
-        df = pd.read_csv(self.orders_file)
-        return df[df['customer_id'] == customer_id].sort_values(
-            "order_date", ascending=False
-        )
+        df = self._find('orders', 'customer_id', customer_id)
+        return df.sort_values("order_date", ascending=False)
 
     def get_order_by_id(self, order_id: str) -> Optional[pd.Series]:
         """Retrieve a specific order by its ID"""
-        df = pd.read_csv(self.orders_file)
-        order = df[df['order_id'] == order_id]
+        order = self._find('orders', 'order_id', order_id)
         return None if order.empty else order.iloc[0]
 
     # -------------------------------------------------------
     # Reviews & Loyalty
     # -------------------------------------------------------
+    def load_reviews(self) -> pd.DataFrame:
+        return self._load('reviews')
+
     def save_review(self, review):
         """Save a customer's review"""
-        df = pd.read_csv(self.reviews_file)
         review_data = {
             'review_id': review.review_id,
             'customer_id': review.customer_id,
@@ -278,37 +497,37 @@ class Database:
             'review_date': review.review_date.strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        pd.concat(
-            [df, pd.DataFrame([review_data])],
-            ignore_index=True
-        ).to_csv(self.reviews_file, index=False)
+        self._append('reviews', [review_data])
 
     def add_loyalty_points(self, customer_id: str, points: int):
         """Add loyalty points to a customer"""
-        df = self.load_users()
-        index = df[df['user_id'] == customer_id].index
-        if len(index) > 0:
-            current_points = int(df.at[index[0], 'loyalty_points'])
-            df.at[index[0], 'loyalty_points'] = current_points + points
-            df.to_csv(self.users_file, index=False)
+        def compute(rows):
+            user = rows[customer_id]
+            if user is None:
+                return {}, None
+            current_points = int(user['loyalty_points'])
+            return {customer_id: {'loyalty_points': current_points + points}}, None
+
+        self._modify_rows('users', 'user_id', [customer_id], compute)
 
     def deduct_loyalty_points(self, customer_id: str, points: int):
         """Deduct loyalty points (used for discount codes)"""
-        df = self.load_users()
-        index = df[df['user_id'] == customer_id].index
-        if len(index) > 0:
-            current = int(df.at[index[0], 'loyalty_points'])
+        def compute(rows):
+            user = rows[customer_id]
+            if user is None:
+                return {}, None
+            current = int(user['loyalty_points'])
             if current < points:
                 raise ValueError("Insufficient loyalty points")
-            df.at[index[0], 'loyalty_points'] = current - points
-            df.to_csv(self.users_file, index=False)
+            return {customer_id: {'loyalty_points': current - points}}, None
+
+        self._modify_rows('users', 'user_id', [customer_id], compute)
 
     # -------------------------------------------------------
     # Discount Codes
     # -------------------------------------------------------
     def save_discount_code(self, discount_code):
         """Save a new discount code"""
-        df = pd.read_csv(self.discount_codes_file)
         code_data = {
             'code': discount_code.code,
             'discount_percentage': discount_code.discount_percentage,
@@ -317,26 +536,25 @@ class Database:
             'customer_id': discount_code.customer_id or ""
         }
 
-        pd.concat(
-            [df, pd.DataFrame([code_data])],
-            ignore_index=True
-        ).to_csv(self.discount_codes_file, index=False)
+        self._append('discount_codes', [code_data])
 
     def find_discount_code(self, code: str) -> Optional[pd.Series]:
         """Find a discount code"""
-        df = pd.read_csv(self.discount_codes_file)
-        result = df[df['code'] == code]
+        result = self._find('discount_codes', 'code', code)
         return None if result.empty else result.iloc[0]
 
     def mark_discount_code_used(self, code: str):
-        """Mark a discount code as used"""
-        df = pd.read_csv(self.discount_codes_file)
-        index = df[df['code'] == code].index
-        if len(index) > 0:
-            df.at[index[0], 'is_used'] = True
-            df.to_csv(self.discount_codes_file, index=False)
+        """Mark a discount code as used, raise if another order already spent it"""
+        def compute(rows):
+            row = rows[code]
+            if row is None:
+                return {}, None
+            if str(row['is_used']).strip().lower() in ('true', '1'):
+                raise ValueError("Discount code already used")
+            return {code: {'is_used': True}}, None
+
+        self._modify_rows('discount_codes', 'code', [code], compute)
 
     def get_reviews_by_order(self, order_id: str) -> pd.DataFrame:
         """Retrieve all reviews related to a specific order"""
-        df = pd.read_csv(self.reviews_file)
-        return df[df['order_id'] == order_id]
+        return self._find('reviews', 'order_id', order_id)
@@ -0,0 +1,290 @@
+"""
+Pool of warm headless Chrome drivers shared by scrapers.
+
+Starting Chrome (and resolving its driver binary) costs seconds, far
+more than loading one menu page. Scrapers created with a pool borrow a
+running driver instead, and give it back after the page. A returned
+driver is reset (cookies, storage, blank page) before the next borrower
+gets it, and is replaced after max_pages pages or when it crashed.
+
+Scrapers only read the text of a page, so they can also make the
+browser skip images, media, fonts and tracking scripts
+(apply_resource_blocking with one of RESOURCE_BLOCKING_PROFILES).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def chromedriver_path() -> str:
+    """Path of the ChromeDriver binary, downloaded/resolved once per process"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def chrome_options() -> Options:
+    """Options of the headless Chrome used for scraping"""
+    options = Options()
+
+    # Headless mode
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+
+    # to prevent being detected as a bot
+    options.add_argument(
+        'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36'
+    )
+
+    # additional settings
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    options.add_experimental_option('useAutomationExtension', False)
+    return options
+
+
+def create_chrome_driver():
+    """Start a new headless Chrome"""
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options())
+    # hide webdriver feature
+    driver.execute_script(
+        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    )
+    return driver
+
+
+# -------------------------------------------------------
+# Resource blocking
+# -------------------------------------------------------
+# URL patterns (Chrome DevTools Network.setBlockedURLs wildcards) of
+# content the parsers never read
+_IMAGE_PATTERNS = [
+    f"*.{ext}{suffix}"
+    for ext in ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp')
+    for suffix in ('', '?*')
+]
+_MEDIA_PATTERNS = [
+    f"*.{ext}{suffix}"
+    for ext in ('mp4', 'webm', 'ogg', 'mp3', 'wav', 'm3u8', 'ts')
+    for suffix in ('', '?*')
+]
+_FONT_PATTERNS = [
+    f"*.{ext}{suffix}"
+    for ext in ('woff', 'woff2', 'ttf', 'otf', 'eot')
+    for suffix in ('', '?*')
+] + ["*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+# analytics, ads and chat widgets: third-party scripts menus do not need
+_THIRD_PARTY_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*facebook.net*",
+    "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*mc.yandex.ru*",
+    "*yandex.ru/metrika*", "*sentry.io*", "*sentry-cdn.com*", "*newrelic.com*",
+    "*nr-data.net*", "*webengage.com*", "*najva.com*", "*pushe.co*",
+    "*goftino.com*", "*raychat.io*", "*crisp.chat*", "*intercom.io*"
+]
+
+RESOURCE_BLOCKING_PROFILES = {
+    # load everything
+    'off': [],
+    # images, audio/video and web fonts
+    'media': _IMAGE_PATTERNS + _MEDIA_PATTERNS + _FONT_PATTERNS,
+    # media plus analytics/ads/chat scripts
+    'lean': _IMAGE_PATTERNS + _MEDIA_PATTERNS + _FONT_PATTERNS + _THIRD_PARTY_PATTERNS,
+}
+
+
+def blocked_url_patterns(profile: str) -> List[str]:
+    if profile not in RESOURCE_BLOCKING_PROFILES:
+        raise ValueError(f"Unknown resource blocking profile: {profile}")
+    return RESOURCE_BLOCKING_PROFILES[profile]
+
+
+def apply_resource_blocking(driver, profile: str) -> bool:
+    """
+    Make the driver skip requests of a blocking profile (replacing the
+    profile set before, so pooled drivers follow their current borrower).
+    Returns False if the driver has no DevTools access (not Chrome).
+    """
+    patterns = blocked_url_patterns(profile)
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except Exception:
+        return False
+
+
+class _PooledDriver:
+    """Bookkeeping of one driver owned by the pool"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class WebDriverPool:
+    """
+    Bounded pool of WebDrivers.
+    Usage:
+        pool = WebDriverPool(max_size=3)
+        driver = pool.acquire()
+        try:
+            driver.get(url)
+        finally:
+            pool.release(driver)
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        max_size: int = 3,
+        max_pages: int = 50,
+        factory: Callable = create_chrome_driver
+    ):
+        """
+        Args:
+            max_size: Maximum number of drivers alive at the same time
+            max_pages: Pages a driver serves before it is replaced
+            factory: Callable that starts a new driver
+        """
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle: List[_PooledDriver] = []
+        self._leased = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {'created': 0, 'reused': 0, 'recycled': 0, 'discarded': 0}
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Borrow a driver, starting one if the pool is below max_size"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("WebDriver pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    self.stats['reused'] += 1
+                    break
+                if self._size < self.max_size:
+                    # reserve the slot, start the browser outside the lock
+                    self._size += 1
+                    entry = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No WebDriver available")
+                self._cond.wait(remaining)
+
+        if entry is None:
+            try:
+                entry = _PooledDriver(self.factory())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self.stats['created'] += 1
+
+        with self._cond:
+            self._leased[id(entry.driver)] = entry
+        return entry.driver
+
+    def release(self, driver, broken: bool = False):
+        """
+        Give a driver back. Broken drivers and drivers that served
+        max_pages pages are quit; the others are reset for reuse.
+        """
+        with self._cond:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            return
+        entry.pages += 1
+
+        reusable = not broken and not self._closed and entry.pages < self.max_pages
+        keep = False
+        try:
+            # a driver whose reset fails is quit like a broken one
+            keep = reusable and self._reset(driver)
+            if not keep:
+                self._quit(driver)
+        finally:
+            # the slot is given back even if reset or quit was interrupted
+            with self._cond:
+                if keep:
+                    self._idle.append(entry)
+                else:
+                    self._size -= 1
+                    if broken or reusable:
+                        self.stats['discarded'] += 1
+                    elif entry.pages >= self.max_pages:
+                        self.stats['recycled'] += 1
+                self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """Borrow a driver for a with block, flagging it broken on errors"""
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def _reset(self, driver) -> bool:
+        """Clear state left by the previous page; False if the driver is unusable"""
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit idle drivers; drivers still borrowed are quit when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry.driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,91 @@
+"""
+Advisory file locks that serialize table writers across processes.
+
+Several GUI clients and scripts may work on the same data files. Every
+writer takes the lock of the table it changes, so read-modify-write
+sequences cannot interleave. Locks are reentrant inside one process:
+threads wait on an RLock, other processes on the operating system lock.
+"""
+import os
+import threading
+import time
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class _ProcessFileLock:
+    """One OS-level lock per lock file, shared by all threads of the process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def _acquire_os_lock(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            return
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ~10 seconds, keep waiting
+                time.sleep(0.05)
+
+    def _release_os_lock(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self._rlock.acquire()
+        try:
+            if self._depth == 0:
+                self._acquire_os_lock()
+            self._depth += 1
+        except Exception:
+            self._rlock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                self._release_os_lock()
+        finally:
+            self._rlock.release()
+        return False
+
+
+_locks: Dict[str, _ProcessFileLock] = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path: str) -> _ProcessFileLock:
+    """
+    Exclusive, reentrant lock bound to the given lock file.
+    Usage:
+        with file_lock("foods.csv.lock"):
+            ...
+    """
+    path = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = _ProcessFileLock(path)
+        return lock
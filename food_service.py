@@ -1,7 +1,9 @@
 from datetime import date
+import pandas as pd
 from typing import List, Optional
 from model import Food, Cart
 from database import Database
+from persian_text import tokenize
 
 
 class FoodService:
@@ -40,42 +42,30 @@ class FoodService:
         """
         Return a list of foods that are available on a specific date.
         """
-        df = self.db.load_foods()
-        foods_list = []
-
-        for _, row in df.iterrows():
-            # Check whether the food is available on the selected date
-            # (available_dates is a list of date objects)
-            if selected_date in row['available_dates']:
-                foods_list.append(self._parse_food_from_row(row))
-
-        return foods_list
+        # Only the foods listed under this date in the availability index
+        df = self.db.find_foods_by_date(selected_date)
+        return [self._parse_food_from_row(row) for row in df.to_dict('records')]
 
     def search_foods(self, query: str, selected_date: Optional[date] = None) -> List[Food]:
         """
         Search foods by name, ingredients, or description.
+        Words are matched whole or by prefix after Persian normalization
+        (ی/ي, ک/ك, ZWNJ, digits) and results come best match first.
         Optionally filters results by availability date.
         """
-        df = self.db.load_foods()
-        foods_list = []
-        query_lower = query.lower()
+        if not tokenize(query):
+            # nothing to match on, every food qualifies
+            df = (self.db.find_foods_by_date(selected_date) if selected_date
+                  else self.db.load_foods())
+            return [self._parse_food_from_row(row) for row in df.to_dict('records')]
 
-        for _, row in df.iterrows():
+        df = self.db.search_foods(query)
+        foods_list = []
+        for row in df.to_dict('records'):
             # Date filtering (only if a date is provided)
             if selected_date and selected_date not in row['available_dates']:
                 continue
-
-            # Text-based search fields
-            name = str(row['name']).lower()
-            ingredients = str(row['ingredients']).lower()
-            description = str(row['description']).lower()
-
-            if (
-                query_lower in name or
-                query_lower in ingredients or
-                query_lower in description
-            ):
-                foods_list.append(self._parse_food_from_row(row))
+            foods_list.append(self._parse_food_from_row(row))
 
         return foods_list
 
@@ -91,6 +81,54 @@ class FoodService:
 
         return foods_list
 
+    # list_foods sort keys -> columns of the foods table
+    FOOD_SORT_COLUMNS = {
+        'food_id': 'food_id',
+        'name': 'name',
+        'category': 'category',
+        'selling_price': 'selling_price',
+        'cost_price': 'cost_price',
+        'stock': 'stock'
+    }
+
+    def _foods_view(self, query: Optional[str] = None, selected_date: Optional[date] = None,
+                    sort_by: Optional[str] = None, descending: bool = False) -> pd.DataFrame:
+        """
+        Foods matching query (ranked, as search_foods) and/or available on
+        selected_date, sorted by one of FOOD_SORT_COLUMNS.
+        """
+        if query and tokenize(query):
+            df = self.db.search_foods(query)
+            if selected_date:
+                df = df[df['available_dates'].map(lambda dates: selected_date in dates)]
+        elif selected_date:
+            df = self.db.find_foods_by_date(selected_date)
+        else:
+            df = self.db.load_foods()
+
+        if sort_by is not None:
+            if sort_by not in self.FOOD_SORT_COLUMNS:
+                raise ValueError(f"Cannot sort foods by {sort_by}")
+            df = df.sort_values(self.FOOD_SORT_COLUMNS[sort_by], ascending=not descending,
+                                kind='stable')
+        return df
+
+    def list_foods(self, query: Optional[str] = None, selected_date: Optional[date] = None,
+                   sort_by: Optional[str] = None, descending: bool = False,
+                   limit: Optional[int] = None, offset: int = 0) -> List[Food]:
+        """
+        One page (limit/offset) of the foods matching the optional search
+        query and date, sorted by one of FOOD_SORT_COLUMNS. Only the rows
+        of the page become Food objects.
+        """
+        df = self._foods_view(query, selected_date, sort_by, descending)
+        end = None if limit is None else offset + limit
+        return [self._parse_food_from_row(row) for row in df.iloc[offset:end].to_dict('records')]
+
+    def count_foods(self, query: Optional[str] = None, selected_date: Optional[date] = None) -> int:
+        """Number of foods matching the list_foods filters (for paging)"""
+        return len(self._foods_view(query, selected_date))
+
     def get_food_by_id(self, food_id: str) -> Optional[Food]:
         """
         Retrieve a single food by its ID.
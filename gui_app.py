@@ -4,6 +4,7 @@ from tkinter import ttk, messagebox, simpledialog
 import sys
 import threading
 import os
+from functools import partial
 import pandas as pd
 import matplotlib
 matplotlib.use('TkAgg')   
@@ -22,7 +23,17 @@ from admin_service import AdminService
 from model import Cart, Order
 from database import Database
 from restaurant_scrapers import SnappFoodScraper
+from threaded_scraper import ThreadedRestaurantScraper
+from scrape_jobs import ScrapeJob
 from price_comparison import PriceComparisonGUI
+from name_matcher import tfidf_merge
+from gui_tasks import TaskRunner
+from virtual_table import FrameSource, ServiceSource, VirtualTable
+
+# the app's scrapers read menus over HTTP when they can and load pages
+# without images, media, fonts or trackers (the class defaults render
+# every page in a full browser)
+AppSnappFoodScraper = partial(SnappFoodScraper, fetch_mode='auto', resource_blocking='lean')
 
 class FoodDeliveryApp:
     def __init__(self, root):
@@ -42,8 +53,12 @@ class FoodDeliveryApp:
         self.admin_service = AdminService()
         self.db = Database() 
 
+        # blocking service calls run here, results come back on the Tk thread
+        self.tasks = TaskRunner(root)
+
         # scrapers and price comparator
-        self.snappfood_scraper = SnappFoodScraper()
+        self.snappfood_scraper = AppSnappFoodScraper()
+        self.multi_job = None
         self.price_comparator = None
         
         # user status
@@ -63,9 +78,18 @@ class FoodDeliveryApp:
     
     def clear_window(self):
         """clear current window content"""
+        # results of pending loads would land on widgets that are going away
+        self.tasks.cancel_all()
         for widget in self.root.winfo_children():
             widget.destroy()
     
+    def submit_write(self, key, func, *args, **kwargs):
+        """run a service call that changes data in the background, once at a time per key"""
+        if self.tasks.pending(key):
+            messagebox.showwarning("لطفاً صبر کنید", "عملیات قبلی هنوز در حال انجام است")
+            return
+        self.tasks.submit(key, func, *args, write=True, **kwargs)
+    
     # -------------------------------------------------------
     # login/register page
     # -------------------------------------------------------
@@ -303,79 +327,51 @@ class FoodDeliveryApp:
         ttk.Label(top_frame, text="منوی غذاهای امروز", 
                  font=self.title_font).pack(side=tk.LEFT, padx=20)
         
-        # Treeview for displaying foods
-        tree_frame = ttk.Frame(self.root)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # columns
-        columns = ("نام", "دسته‌بندی", "قیمت (تومان)", "موجودی", "توضیحات")
-        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
-        
-        # set columns
-        tree.heading("نام", text="نام")
-        tree.heading("دسته‌بندی", text="دسته‌بندی")
-        tree.heading("قیمت (تومان)", text="قیمت (تومان)")
-        tree.heading("موجودی", text="موجودی")
-        tree.heading("توضیحات", text="توضیحات")
-        
-        tree.column("نام", width=150)
-        tree.column("دسته‌بندی", width=100)
-        tree.column("قیمت (تومان)", width=100)
-        tree.column("موجودی", width=80)
-        tree.column("توضیحات", width=200)
-        
-        # scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # get today's foods
-        foods = self.food_service.get_menu_for_date(date.today())
-        
-        for food in foods:
-            tree.insert("", tk.END, values=(
-                food.name,
-                food.category,
-                f"{food.selling_price:,.0f}",
-                food.stock,
-                food.description[:50] + "..." if len(food.description) > 50 else food.description
-            ))
+        # only the visible rows of the menu are loaded and drawn
+        columns = [("نام", 150), ("دسته‌بندی", 100), ("قیمت (تومان)", 100),
+                   ("موجودی", 80), ("توضیحات", 200)]
+        table = VirtualTable(
+            self.root, columns,
+            ServiceSource(self.food_service.count_foods, self.food_service.list_foods,
+                          selected_date=date.today()),
+            self._food_row_values, tasks=self.tasks,
+            sort_keys={"نام": 'name', "دسته‌بندی": 'category',
+                       "قیمت (تومان)": 'selling_price', "موجودی": 'stock'})
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # buttons frame
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(pady=10)
         
         ttk.Button(btn_frame, text="افزودن به سبد خرید", 
-                  command=lambda: self.add_to_cart_from_tree(tree)).pack(side=tk.LEFT, padx=5)
+                  command=lambda: self.add_to_cart_from_table(table)).pack(side=tk.LEFT, padx=5)
     
-    def add_to_cart_from_tree(self, tree):
-        selected_item = tree.selection()
-        if not selected_item:
+    @staticmethod
+    def _food_row_values(food):
+        """Menu/food table values of a Food"""
+        return (
+            food.name,
+            food.category,
+            f"{food.selling_price:,.0f}",
+            food.stock,
+            food.description[:50] + "..." if len(food.description) > 50 else food.description
+        )
+    
+    def add_to_cart_from_table(self, table):
+        food = table.selected_row()
+        if food is None:
             messagebox.showwarning("خطا", "لطفاً یک غذا انتخاب کنید")
             return
-        
-        item_values = tree.item(selected_item[0])['values']
-        food_name = item_values[0]
-        
-        # search food by name
-        foods = self.food_service.search_foods(food_name)
-        if not foods:
-            messagebox.showerror("خطا", "غذا پیدا نشد")
-            return
-        
-        food = foods[0]
+        food_name = food.name
         
         # get quantity
         quantity = simpledialog.askinteger("تعداد", f"تعداد {food_name} را وارد کنید:", 
                                           parent=self.root, minvalue=1, maxvalue=food.stock)
         if quantity:
-            try:
-                self.food_service.add_to_cart(self.cart, food.food_id, quantity)
-                messagebox.showinfo("موفقیت", f"{quantity} عدد {food_name} به سبد خرید اضافه شد")
-            except ValueError as e:
-                messagebox.showerror("خطا", str(e))
+            # stock is checked against the foods table in the background
+            self.submit_write("cart", self.food_service.add_to_cart, self.cart, food.food_id, quantity,
+                              on_done=lambda _: messagebox.showinfo(
+                                  "موفقیت", f"{quantity} عدد {food_name} به سبد خرید اضافه شد"))
     
     def show_cart(self):
         self.clear_window()
@@ -514,28 +510,29 @@ class FoodDeliveryApp:
         
         # buttons
         def process_checkout():
-            try:
-                order = self.order_service.checkout(
-                    cart=self.cart,
-                    customer_id=self.current_user.user_id,
-                    delivery_date=delivery_date,
-                    payment_method=payment_var.get(),
-                    discount_code_str=discount_entry.get() or None
-                )
-                
-                dialog.destroy()
-                messagebox.showinfo("موفقیت", f"سفارش شما با کد {order.order_id} ثبت شد")
-                
-                # payment
-                if payment_var.get() == Order.PAYMENT_ONLINE:
-                    if messagebox.askyesno("پرداخت", "آیا مایل به پرداخت آنلاین هستید؟"):
-                        self.order_service.process_payment(order.order_id)
-                        messagebox.showinfo("موفقیت", "پرداخت با موفقیت انجام شد")
-                
-                self.create_customer_dashboard()
-                
-            except ValueError as e:
-                messagebox.showerror("خطا", str(e))
+            payment_method = payment_var.get()
+            self.submit_write(
+                "cart", self.order_service.checkout,
+                cart=self.cart,
+                customer_id=self.current_user.user_id,
+                delivery_date=delivery_date,
+                payment_method=payment_method,
+                discount_code_str=discount_entry.get() or None,
+                on_done=lambda order: order_placed(order, payment_method)
+            )
+        
+        def order_placed(order, payment_method):
+            dialog.destroy()
+            messagebox.showinfo("موفقیت", f"سفارش شما با کد {order.order_id} ثبت شد")
+            
+            # payment
+            if payment_method == Order.PAYMENT_ONLINE:
+                if messagebox.askyesno("پرداخت", "آیا مایل به پرداخت آنلاین هستید؟"):
+                    self.submit_write("payment", self.order_service.process_payment, order.order_id,
+                                      on_done=lambda _: messagebox.showinfo(
+                                          "موفقیت", "پرداخت با موفقیت انجام شد"))
+            
+            self.create_customer_dashboard()
         
         btn_frame = ttk.Frame(dialog)
         btn_frame.pack(pady=20)
@@ -557,9 +554,13 @@ class FoodDeliveryApp:
         ttk.Label(top_frame, text="سفارشات من", 
                  font=self.title_font).pack(side=tk.LEFT, padx=20)
         
-        # get order history
-        orders = self.customer_service.get_order_history(self.current_user.user_id)
-        
+        # get order history (in the background)
+        self.tasks.submit("order_history", self.customer_service.get_order_history,
+                          self.current_user.user_id,
+                          on_done=self._show_order_history_table, spinner=self.root)
+    
+    def _show_order_history_table(self, orders):
+        """order history table, once the orders are loaded"""
         if not orders:
             ttk.Label(self.root, text="شما هیچ سفارشی ندارید", 
                      font=self.font).pack(pady=50)
@@ -667,25 +668,35 @@ class FoodDeliveryApp:
             ttk.Button(btn_frame, text="ثبت نظر", 
                   command=lambda: self.submit_review_dialog(order)).pack(side=tk.LEFT, padx=5)
 
-            reviews_df = self.db.get_reviews_by_order(order['order_id'])
-            if not reviews_df.empty:
-                ttk.Button(btn_frame, text="📋 نمایش نظرات", 
-                        command=lambda: self.show_order_reviews(order['order_id'])).pack(side=tk.LEFT, padx=5)      
+            # reviews button once the order's reviews are loaded (in the background)
+            def add_reviews_button(reviews_df):
+                if not reviews_df.empty and btn_frame.winfo_exists():
+                    ttk.Button(btn_frame, text="📋 نمایش نظرات", 
+                            command=lambda: self.show_order_reviews(order['order_id'])).pack(side=tk.LEFT, padx=5)
+            
+            self.tasks.submit(f"order_detail_reviews:{order['order_id']}", self.db.get_reviews_by_order,
+                              order['order_id'], on_done=add_reviews_button)
         
         # close button
         ttk.Button(dialog, text="بستن", 
                   command=dialog.destroy).pack(pady=10)
     
     def show_loyalty_points(self):
-        points = self.customer_service.get_user_points(self.current_user.user_id)
+        self.tasks.submit("points", self.customer_service.get_user_points,
+                          self.current_user.user_id, on_done=self._show_loyalty_points)
+    
+    def _show_loyalty_points(self, points):
         messagebox.showinfo("امتیازات وفاداری", 
                           f"شما {points} امتیاز وفاداری دارید.\n\n"
                           f"هر 1000 تومان خرید = 1 امتیاز\n"
                           f"100 امتیاز = کد تخفیف 10%")
     
     def convert_points(self):
-        points = self.customer_service.get_user_points(self.current_user.user_id)
-        
+        self.tasks.submit("points", self.customer_service.get_user_points,
+                          self.current_user.user_id, on_done=self._convert_points)
+    
+    def _convert_points(self, points):
+        """confirm the conversion once the points are loaded"""
         if points < 100:
             messagebox.showwarning("خطا", f"حداقل امتیاز مورد نیاز: 100\nامتیاز فعلی شما: {points}")
             return
@@ -693,16 +704,13 @@ class FoodDeliveryApp:
         if messagebox.askyesno("تبدیل امتیاز", 
                              f"آیا می‌خواهید 100 امتیاز خود را به یک کد تخفیف 10% تبدیل کنید؟\n"
                              f"امتیاز فعلی: {points}"):
-            try:
-                discount = self.customer_service.generate_discount_code(
-                    self.current_user.user_id, 100
-                )
-                messagebox.showinfo("موفقیت", 
+            self.tasks.submit("convert_points", self.customer_service.generate_discount_code,
+                              self.current_user.user_id, 100,
+                              on_done=lambda discount: messagebox.showinfo(
+                                  "موفقیت",
                                   f"کد تخفیف شما: {discount.code}\n"
                                   f"تخفیف: {discount.discount_percentage}%\n"
-                                  f"معتبر تا: {discount.expiry_date.strftime('%Y-%m-%d')}")
-            except ValueError as e:
-                messagebox.showerror("خطا", str(e))
+                                  f"معتبر تا: {discount.expiry_date.strftime('%Y-%m-%d')}"))
     
     def show_profile(self):
         messagebox.showinfo("پروفایل", 
@@ -714,40 +722,38 @@ class FoodDeliveryApp:
     def show_search_food(self):
         query = simpledialog.askstring("جستجوی غذا", "عبارت جستجو را وارد کنید:", parent=self.root)
         if query:
-            foods = self.food_service.search_foods(query)
-            
-            if not foods:
-                messagebox.showinfo("نتیجه", "غذایی یافت نشد")
-                return
-            
-            # display results in new window
-            result_window = tk.Toplevel(self.root)
-            result_window.title(f"نتایج جستجو برای: {query}")
-            result_window.geometry("600x400")
-            
-            tree_frame = ttk.Frame(result_window)
-            tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            columns = ("نام", "دسته‌بندی", "قیمت", "موجودی", "توضیحات")
-            tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
-            
-            for col in columns:
-                tree.heading(col, text=col)
-            
-            for food in foods:
-                tree.insert("", tk.END, values=(
-                    food.name,
-                    food.category,
-                    f"{food.selling_price:,.0f}",
-                    food.stock,
-                    food.description[:50] + "..." if len(food.description) > 50 else food.description
-                ))
-            
-            scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-            tree.configure(yscrollcommand=scrollbar.set)
-            
-            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            # search in the background
+            self.tasks.submit("search", self.food_service.search_foods, query,
+                              on_done=lambda foods: self._show_search_results(query, foods))
+    
+    def _show_search_results(self, query, foods):
+        """search results window, once the search is done"""
+        if not foods:
+            messagebox.showinfo("نتیجه", "غذایی یافت نشد")
+            return
+        
+        # display results in new window
+        result_window = tk.Toplevel(self.root)
+        result_window.title(f"نتایج جستجو برای: {query}")
+        result_window.geometry("600x400")
+        
+        tree_frame = ttk.Frame(result_window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ("نام", "دسته‌بندی", "قیمت", "موجودی", "توضیحات")
+        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
+        
+        for col in columns:
+            tree.heading(col, text=col)
+        
+        for food in foods:
+            tree.insert("", tk.END, values=self._food_row_values(food))
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
     # -------------------------------------------------------
     # admin dashboard
@@ -828,29 +834,21 @@ class FoodDeliveryApp:
         ttk.Button(top_frame, text="➕ غذای جدید", 
                   command=self.show_add_food_dialog).pack(side=tk.RIGHT)
         
-        # Treeview for displaying foods
-        tree_frame = ttk.Frame(self.root)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        columns = ("ID", "نام", "دسته‌بندی", "قیمت فروش", "قیمت تمام", "موجودی", "تاریخ‌های موجودی")
-        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
-        
-        for col in columns:
-            tree.heading(col, text=col)
-        
-        tree.column("ID", width=100)
-        tree.column("نام", width=150)
-        tree.column("دسته‌بندی", width=100)
-        tree.column("قیمت فروش", width=100)
-        tree.column("قیمت تمام", width=100)
-        tree.column("موجودی", width=80)
-        tree.column("تاریخ‌های موجودی", width=150)
-        
-        # get all foods
-        foods = self.admin_service.food_service.get_all_foods()
-        
-        for food in foods:
-            tree.insert("", tk.END, values=(
+        # search bar: filtering, sorting and paging are done by the food service
+        search_frame = ttk.Frame(self.root)
+        search_frame.pack(fill=tk.X, padx=10)
+        
+        ttk.Label(search_frame, text="جستجو:").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(search_frame, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        
+        columns = [("ID", 100), ("نام", 150), ("دسته‌بندی", 100), ("قیمت فروش", 100),
+                   ("قیمت تمام", 100), ("موجودی", 80), ("تاریخ‌های موجودی", 150)]
+        food_service = self.admin_service.food_service
+        table = VirtualTable(
+            self.root, columns,
+            ServiceSource(food_service.count_foods, food_service.list_foods),
+            lambda food: (
                 food.food_id[:8] + "...",
                 food.name,
                 food.category,
@@ -858,24 +856,27 @@ class FoodDeliveryApp:
                 f"{food.cost_price:,.0f}",
                 food.stock,
                 f"{len(food.available_dates)} روز"
-            ))
+            ),
+            tasks=self.tasks,
+            sort_keys={"ID": 'food_id', "نام": 'name', "دسته‌بندی": 'category',
+                       "قیمت فروش": 'selling_price', "قیمت تمام": 'cost_price',
+                       "موجودی": 'stock'})
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        search = lambda event=None: table.set_filters(query=search_entry.get().strip())
+        search_entry.bind("<Return>", search)
+        ttk.Button(search_frame, text="جستجو", command=search).pack(side=tk.LEFT)
         
         # buttons frame
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(pady=10)
         
         ttk.Button(btn_frame, text="ویرایش", 
-                  command=lambda: self.edit_food(tree)).pack(side=tk.LEFT, padx=5)
+                  command=lambda: self.edit_food(table)).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="حذف", 
-                  command=lambda: self.delete_food(tree)).pack(side=tk.LEFT, padx=5)
+                  command=lambda: self.delete_food(table)).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="بروزرسانی", 
-                  command=self.show_food_management).pack(side=tk.LEFT, padx=5)
+                  command=table.reload).pack(side=tk.LEFT, padx=5)
 
     def show_add_food_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -1002,8 +1003,9 @@ class FoodDeliveryApp:
                 if not available_dates:
                     available_dates = [date.today()]
                 
-                # create food
-                food = self.admin_service.add_new_food(
+                # create food (saved in the background)
+                self.submit_write(
+                    "save_food", self.admin_service.add_new_food,
                     name=name_entry.get().strip(),
                     category=category_entry.get().strip(),
                     selling_price=selling_price,
@@ -1012,16 +1014,19 @@ class FoodDeliveryApp:
                     description=description_text.get("1.0", tk.END).strip(),
                     stock=stock,
                     available_dates_list=available_dates,
-                    restaurant_id=restaurant_id
+                    restaurant_id=restaurant_id,
+                    on_done=food_saved,
+                    on_error=lambda e: messagebox.showerror("خطا", f"خطا در ذخیره غذا: {str(e)}")
                 )
                 
-                messagebox.showinfo("موفقیت", f"غذای '{food.name}' با موفقیت اضافه شد")
-                dialog.destroy()
-                self.show_food_management()
-                
             except Exception as e:
                 messagebox.showerror("خطا", f"خطا در ذخیره غذا: {str(e)}")
         
+        def food_saved(food):
+            messagebox.showinfo("موفقیت", f"غذای '{food.name}' با موفقیت اضافه شد")
+            dialog.destroy()
+            self.show_food_management()
+        
         # buttons (only once created)
         btn_frame = ttk.Frame(dialog)
         btn_frame.pack(pady=10)
@@ -1031,27 +1036,12 @@ class FoodDeliveryApp:
         ttk.Button(btn_frame, text="انصراف", 
                 command=dialog.destroy, width=15).pack(side=tk.LEFT, padx=10)
     
-    def edit_food(self, tree):
-        selected_item = tree.selection()
-        if not selected_item:
+    def edit_food(self, table):
+        selected_food = table.selected_row()
+        if selected_food is None:
             messagebox.showwarning("خطا", "لطفاً یک غذا انتخاب کنید")
             return
         
-        item_values = tree.item(selected_item[0])['values']
-        food_id_short = item_values[0]
-        
-        # find food
-        foods = self.admin_service.food_service.get_all_foods()
-        selected_food = None
-        for food in foods:
-            if food.food_id.startswith(food_id_short[:8]):
-                selected_food = food
-                break
-        
-        if not selected_food:
-            messagebox.showerror("خطا", "غذا پیدا نشد")
-            return
-        
         # display edit dialog
         field = simpledialog.askstring("ویرایش", 
                                      f"ویرایش {selected_food.name}\n\n"
@@ -1101,31 +1091,28 @@ class FoodDeliveryApp:
                     new_value = int(new_value)
                 
                 # update
-                self.admin_service.update_food_info(selected_food.food_id, **{field_name: new_value})
-                messagebox.showinfo("موفقیت", "غذا با موفقیت به‌روزرسانی شد")
-                self.show_food_management()
+                self.submit_write("save_food", self.admin_service.update_food_info,
+                                  selected_food.food_id, **{field_name: new_value},
+                                  on_done=lambda _: self._food_changed(table, "غذا با موفقیت به‌روزرسانی شد"))
                 
         except ValueError as e:
             messagebox.showerror("خطا", str(e))
     
-    def delete_food(self, tree):
-        selected_item = tree.selection()
-        if not selected_item:
+    def delete_food(self, table):
+        food = table.selected_row()
+        if food is None:
             messagebox.showwarning("خطا", "لطفاً یک غذا انتخاب کنید")
             return
         
-        item_values = tree.item(selected_item[0])['values']
-        food_name = item_values[1]
-        
-        if messagebox.askyesno("حذف غذا", f"آیا مطمئن هستید که می‌خواهید '{food_name}' را حذف کنید؟"):
-            # find food_id
-            foods = self.admin_service.food_service.get_all_foods()
-            for food in foods:
-                if food.name == food_name:
-                    self.admin_service.delete_food(food.food_id)
-                    messagebox.showinfo("موفقیت", f"غذای {food_name} حذف شد")
-                    self.show_food_management()
-                    return
+        if messagebox.askyesno("حذف غذا", f"آیا مطمئن هستید که می‌خواهید '{food.name}' را حذف کنید؟"):
+            self.submit_write("save_food", self.admin_service.delete_food, food.food_id,
+                              on_done=lambda _: self._food_changed(table, f"غذای {food.name} حذف شد"))
+    
+    def _food_changed(self, table, message):
+        messagebox.showinfo("موفقیت", message)
+        # the food management screen may have been left meanwhile
+        if table.winfo_exists():
+            table.reload()
     
     def show_order_management(self):
         self.clear_window()
@@ -1139,77 +1126,61 @@ class FoodDeliveryApp:
         ttk.Label(top_frame, text="مدیریت سفارشات", 
                  font=self.title_font).pack(side=tk.LEFT, padx=20)
         
-        # get all orders
-        orders = self.admin_service.get_all_orders()
-        
-        if not orders:
-            ttk.Label(self.root, text="هیچ سفارشی وجود ندارد", 
-                     font=self.font).pack(pady=50)
-            return
-        
-        # Treeview for displaying orders
-        tree_frame = ttk.Frame(self.root)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        columns = ("کد سفارش", "مشتری", "تاریخ", "وضعیت", "مبلغ کل", "روش پرداخت")
-        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
-        
-        for col in columns:
-            tree.heading(col, text=col)
-        
-        tree.column("کد سفارش", width=120)
-        tree.column("مشتری", width=150)
-        tree.column("تاریخ", width=120)
-        tree.column("وضعیت", width=100)
-        tree.column("مبلغ کل", width=100)
-        tree.column("روش پرداخت", width=120)
-        
-        for order in orders:
-            tree.insert("", tk.END, values=(
+        # filters: status and order id / customer name search, applied by the admin service
+        filter_frame = ttk.Frame(self.root)
+        filter_frame.pack(fill=tk.X, padx=10)
+        
+        ttk.Label(filter_frame, text="وضعیت:").pack(side=tk.LEFT)
+        status_var = tk.StringVar(value="همه")
+        ttk.Combobox(filter_frame, textvariable=status_var, state="readonly", width=12,
+                     values=["همه", "Pending", "Paid", "Sent", "Cancelled"]).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="جستجو:").pack(side=tk.LEFT, padx=(10, 0))
+        search_entry = ttk.Entry(filter_frame, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        
+        columns = [("کد سفارش", 120), ("مشتری", 150), ("تاریخ", 120), ("وضعیت", 100),
+                   ("مبلغ کل", 100), ("روش پرداخت", 120)]
+        table = VirtualTable(
+            self.root, columns,
+            ServiceSource(self.admin_service.count_orders, self.admin_service.get_all_orders),
+            lambda order: (
                 order['order_id'][:10] + "...",
                 order['customer_name'],
                 order['date'],
                 order['status'],
                 f"{order['total_amount']:,.0f}",
                 order['payment_method']
-            ))
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            ),
+            tasks=self.tasks,
+            sort_keys={"کد سفارش": 'order_id', "مشتری": 'customer_name', "تاریخ": 'date',
+                       "وضعیت": 'status', "مبلغ کل": 'total_amount',
+                       "روش پرداخت": 'payment_method'})
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def apply_filters(event=None):
+            status = status_var.get()
+            table.set_filters(status=None if status == "همه" else status,
+                              search=search_entry.get().strip())
+        
+        search_entry.bind("<Return>", apply_filters)
+        status_var.trace_add("write", lambda *args: apply_filters())
+        ttk.Button(filter_frame, text="جستجو", command=apply_filters).pack(side=tk.LEFT)
         
         # buttons frame
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(pady=10)
         
         ttk.Button(btn_frame, text="تغییر وضعیت", 
-                  command=lambda: self.change_order_status(tree)).pack(side=tk.LEFT, padx=5)
+                  command=lambda: self.change_order_status(table)).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="بروزرسانی", 
-                  command=self.show_order_management).pack(side=tk.LEFT, padx=5)
+                  command=table.reload).pack(side=tk.LEFT, padx=5)
     
-    def change_order_status(self, tree):
-        selected_item = tree.selection()
-        if not selected_item:
+    def change_order_status(self, table):
+        selected_order = table.selected_row()
+        if selected_order is None:
             messagebox.showwarning("خطا", "لطفاً یک سفارش انتخاب کنید")
             return
-        
-        item_values = tree.item(selected_item[0])['values']
-        order_id_short = item_values[0]
-        current_status = item_values[3]
-        
-        # find order_id
-        orders = self.admin_service.get_all_orders()
-        selected_order = None
-        for order in orders:
-            if order['order_id'].startswith(order_id_short[:10]):
-                selected_order = order
-                break
-        
-        if not selected_order:
-            messagebox.showerror("خطا", "سفارش پیدا نشد")
-            return
+        current_status = selected_order['status']
         
         # select new status dialog
         dialog = tk.Toplevel(self.root)
@@ -1228,16 +1199,15 @@ class FoodDeliveryApp:
                            variable=status_var, value=status).pack(anchor=tk.W)
         
         def update_status():
-            try:
-                self.admin_service.update_order_status(
-                    selected_order['order_id'], 
-                    status_var.get()
-                )
-                messagebox.showinfo("موفقیت", "وضعیت سفارش به‌روزرسانی شد")
-                dialog.destroy()
-                self.show_order_management()
-            except ValueError as e:
-                messagebox.showerror("خطا", str(e))
+            self.submit_write("order_status", self.admin_service.update_order_status,
+                              selected_order['order_id'], status_var.get(),
+                              on_done=status_updated)
+        
+        def status_updated(_):
+            messagebox.showinfo("موفقیت", "وضعیت سفارش به‌روزرسانی شد")
+            dialog.destroy()
+            if table.winfo_exists():
+                table.reload()
         
         ttk.Button(dialog, text="بروزرسانی", 
                   command=update_status).pack(pady=15)
@@ -1296,42 +1266,45 @@ class FoodDeliveryApp:
                     int(end_month.get()),
                     int(end_day.get())
                 )
-                
-                if start_date > end_date:
-                    messagebox.showerror("خطا", "تاریخ شروع باید قبل از تاریخ پایان باشد")
-                    return
-                
-                report = self.admin_service.get_sales_report(start_date, end_date)
-                
-                # display report
-                report_text = (
-                    f"📊 گزارش فروش\n"
-                    f"بازه زمانی: {report['start_date']} تا {report['end_date']}\n"
-                    f"────────────────\n"
-                    f"تعداد سفارشات: {report['order_count']}\n"
-                    f"فروش کل: {report['total_sales']:,.0f} تومان\n"
-                    f"سود خالص: {report['total_profit']:,.0f} تومان\n"
-                    f"────────────────\n"
-                    f"میانگین هر سفارش: {report['total_sales']/max(report['order_count'], 1):,.0f} تومان"
-                )
-                
-                # display report window
-                report_window = tk.Toplevel(self.root)
-                report_window.title("گزارش فروش")
-                report_window.geometry("400x300")
-                
-                text_widget = tk.Text(report_window, font=("Tahoma", 11), padx=10, pady=10)
-                text_widget.pack(fill=tk.BOTH, expand=True)
-                
-                text_widget.insert("1.0", report_text)
-                text_widget.config(state=tk.DISABLED)
-                
-                # draw chart button
-                ttk.Button(report_window, text="📈 رسم نمودار", 
-                          command=self.show_sales_and_profit_chart).pack(pady=10)
-                
             except ValueError as e:
                 messagebox.showerror("خطا", "تاریخ نامعتبر است")
+                return
+            
+            if start_date > end_date:
+                messagebox.showerror("خطا", "تاریخ شروع باید قبل از تاریخ پایان باشد")
+                return
+            
+            # the report is computed in the background
+            self.tasks.submit("sales_report", self.admin_service.get_sales_report,
+                              start_date, end_date, on_done=show_report, spinner=self.root)
+        
+        def show_report(report):
+            # display report
+            report_text = (
+                f"📊 گزارش فروش\n"
+                f"بازه زمانی: {report['start_date']} تا {report['end_date']}\n"
+                f"────────────────\n"
+                f"تعداد سفارشات: {report['order_count']}\n"
+                f"فروش کل: {report['total_sales']:,.0f} تومان\n"
+                f"سود خالص: {report['total_profit']:,.0f} تومان\n"
+                f"────────────────\n"
+                f"میانگین هر سفارش: {report['total_sales']/max(report['order_count'], 1):,.0f} تومان"
+            )
+            
+            # display report window
+            report_window = tk.Toplevel(self.root)
+            report_window.title("گزارش فروش")
+            report_window.geometry("400x300")
+            
+            text_widget = tk.Text(report_window, font=("Tahoma", 11), padx=10, pady=10)
+            text_widget.pack(fill=tk.BOTH, expand=True)
+            
+            text_widget.insert("1.0", report_text)
+            text_widget.config(state=tk.DISABLED)
+            
+            # draw chart button
+            ttk.Button(report_window, text="📈 رسم نمودار", 
+                      command=self.show_sales_and_profit_chart).pack(pady=10)
         
         ttk.Button(date_frame, text="تولید گزارش", 
                   command=generate_report).grid(row=2, column=0, columnspan=4, pady=15)
@@ -1350,19 +1323,15 @@ class FoodDeliveryApp:
         if discount_percent is None:
             return
         
-        try:
-            discount = self.admin_service.create_discount_for_customer(
-                customer_id, discount_percent
-            )
-            
-            messagebox.showinfo("موفقیت", 
+        self.submit_write("admin_discount", self.admin_service.create_discount_for_customer,
+                          customer_id, discount_percent,
+                          on_done=lambda discount: messagebox.showinfo(
+                              "موفقیت", 
                               f"کد تخفیف ایجاد شد:\n\n"
                               f"کد: {discount.code}\n"
                               f"تخفیف: {discount.discount_percentage}%\n"
                               f"معتبر تا: {discount.expiry_date.strftime('%Y-%m-%d')}\n"
-                              f"برای مشتری: {customer_id}")
-        except ValueError as e:
-            messagebox.showerror("خطا", str(e))
+                              f"برای مشتری: {customer_id}"))
     
     # -------------------------------------------------------
     # public functions
@@ -1428,20 +1397,15 @@ class FoodDeliveryApp:
                 messagebox.showerror("خطا", "تعداد باید بیشتر از صفر باشد")
                 return
             
-            try:
-                # update quantity in cart
-                self.food_service.update_cart_item_quantity(
-                    self.cart, 
-                    food_id, 
-                    new_quantity
-                )
-                
-                messagebox.showinfo("موفقیت", f"تعداد {food_name} به {new_quantity} تغییر کرد")
-                dialog.destroy()
-                self.show_cart()  # reset cart page
-                
-            except ValueError as e:
-                messagebox.showerror("خطا", str(e))
+            # update quantity in cart (stock is checked in the background)
+            self.submit_write("cart", self.food_service.update_cart_item_quantity,
+                              self.cart, food_id, new_quantity,
+                              on_done=lambda _: quantity_updated(new_quantity))
+        
+        def quantity_updated(new_quantity):
+            messagebox.showinfo("موفقیت", f"تعداد {food_name} به {new_quantity} تغییر کرد")
+            dialog.destroy()
+            self.show_cart()  # reset cart page
         
         # buttons
         btn_frame = ttk.Frame(dialog)
@@ -1514,21 +1478,29 @@ class FoodDeliveryApp:
                         return
                 
                 # submit review
-                self.customer_service.submit_review(
+                self.submit_write(
+                    f"review:{order['order_id']}", self.customer_service.submit_review,
                     customer_id=self.current_user.user_id,
                     order_id=order['order_id'],
                     rating=rating,
-                    comment=f"{'برای ' + food_name + ': ' if food_name else ''}{comment}"
+                    comment=f"{'برای ' + food_name + ': ' if food_name else ''}{comment}",
+                    on_done=review_submitted,
+                    on_error=review_failed
                 )
                 
-                messagebox.showinfo("موفقیت", "نظر شما با موفقیت ثبت شد")
-                dialog.destroy()
-                
-            except ValueError as e:
-                messagebox.showerror("خطا", str(e))
             except Exception as e:
                 messagebox.showerror("خطا", f"خطا در ثبت نظر: {str(e)}")
         
+        def review_submitted(_):
+            messagebox.showinfo("موفقیت", "نظر شما با موفقیت ثبت شد")
+            dialog.destroy()
+        
+        def review_failed(e):
+            if isinstance(e, ValueError):
+                messagebox.showerror("خطا", str(e))
+            else:
+                messagebox.showerror("خطا", f"خطا در ثبت نظر: {str(e)}")
+        
         # buttons
         btn_frame = ttk.Frame(dialog)
         btn_frame.pack(pady=15)
@@ -1541,9 +1513,13 @@ class FoodDeliveryApp:
 
     def show_order_reviews(self, order_id):
         """نمایش نظرات ثبت شده برای یک سفارش"""
-        # get reviews from database
-        reviews_df = self.db.get_reviews_by_order(order_id)
-        
+        # get reviews from database (in the background)
+        self.tasks.submit("order_reviews", self.db.get_reviews_by_order, order_id,
+                          on_done=lambda reviews_df: self._show_order_reviews_dialog(
+                              order_id, reviews_df))
+    
+    def _show_order_reviews_dialog(self, order_id, reviews_df):
+        """reviews dialog of an order, once its reviews are loaded"""
         if reviews_df.empty:
             messagebox.showinfo("نظرات", "هنوز نظری برای این سفارش ثبت نشده است")
             return
@@ -1602,8 +1578,12 @@ class FoodDeliveryApp:
         ttk.Label(top_frame, text="نظرات من", 
                  font=self.title_font).pack(side=tk.LEFT, padx=20)
         
-        # get all user reviews
-        reviews_df = pd.read_csv(self.db.reviews_file)
+        # get all user reviews (in the background)
+        self.tasks.submit("my_reviews", self.db.load_reviews,
+                          on_done=self._show_my_reviews_table, spinner=self.root)
+    
+    def _show_my_reviews_table(self, reviews_df):
+        """the user's reviews table, once the reviews are loaded"""
         user_reviews = reviews_df[reviews_df['customer_id'] == self.current_user.user_id]
         
         if user_reviews.empty:
@@ -1694,10 +1674,23 @@ class FoodDeliveryApp:
             if start_date > end_date:
                 messagebox.showerror("خطا", "تاریخ شروع نمی‌تواند بعد از تاریخ پایان باشد")
                 return
-                
-            # get data from service
-            report = self.admin_service.get_sales_report(start_date, end_date)
             
+            # get data from service (in the background)
+            self.tasks.submit(
+                "sales_chart", self.admin_service.get_sales_report, start_date, end_date,
+                on_done=lambda report: self._draw_sales_chart(report, start_str, end_str),
+                on_error=lambda e: messagebox.showerror("خطا", f"مشکلی پیش آمد:\n{str(e)}"),
+                spinner=self.chart_frame
+            )
+            
+        except ValueError as e:
+            messagebox.showerror("خطا در تاریخ", f"فرمت تاریخ نامعتبر است\n{e}")
+        except Exception as e:
+            messagebox.showerror("خطا", f"مشکلی پیش آمد:\n{str(e)}")
+    
+    def _draw_sales_chart(self, report, start_str, end_str):
+        """summary and bar chart of a loaded sales report"""
+        try:
             # summary text (optional)
             summary_text = (
                 f"تعداد سفارش‌ها: {report['order_count']}\n"
@@ -1737,8 +1730,6 @@ class FoodDeliveryApp:
             self.root.update_idletasks()       
             self.chart_frame.update()
             
-        except ValueError as e:
-            messagebox.showerror("خطا در تاریخ", f"فرمت تاریخ نامعتبر است\n{e}")
         except Exception as e:
             messagebox.showerror("خطا", f"مشکلی پیش آمد:\n{str(e)}")
     # -------------------------------------------------------
@@ -1790,26 +1781,19 @@ class FoodDeliveryApp:
         ttk.Button(btn_frame, text="ذخیره به CSV", 
                   command=self.save_scraping_results, width=15).pack(side=tk.LEFT, padx=5)
         
-        # Treeview for displaying results
-        tree_frame = ttk.Frame(main_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        
-        columns = ("نام غذا", "قیمت", "توضیحات", "تخفیف")
-        self.scraping_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=10)
-        
-        for col in columns:
-            self.scraping_tree.heading(col, text=col)
-        
-        self.scraping_tree.column("نام غذا", width=150)
-        self.scraping_tree.column("قیمت", width=100)
-        self.scraping_tree.column("توضیحات", width=200)
-        self.scraping_tree.column("تخفیف", width=80)
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.scraping_tree.yview)
-        self.scraping_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.scraping_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # results table, filled by update_scraping_results
+        self.scraping_table = VirtualTable(
+            main_frame, [("نام غذا", 150), ("قیمت", 100), ("توضیحات", 200), ("تخفیف", 80)],
+            FrameSource(self._scraped_frame([])),
+            lambda item: (
+                item['food_name'],
+                f"{item['price']:,}",
+                item['description'],
+                item['discount']
+            ),
+            sort_keys={"نام غذا": 'food_name', "قیمت": 'price'},
+            height=10)
+        self.scraping_table.pack(fill=tk.BOTH, expand=True, pady=10)
         
         # save results
         self.scraped_items = []
@@ -1837,21 +1821,15 @@ class FoodDeliveryApp:
         
         threading.Thread(target=scraping_task, daemon=True).start()
     
+    @staticmethod
+    def _scraped_frame(items):
+        """scraped items as a frame with every column the results table shows"""
+        df = pd.DataFrame(items, columns=['food_name', 'price', 'description', 'discount'])
+        return df.fillna({'description': '', 'discount': '0%'})
+    
     def update_scraping_results(self, items):
-        """update Treeview with scraping results"""
-        # removing previous results
-        for item in self.scraping_tree.get_children():
-            self.scraping_tree.delete(item)
-        
-        # add new items
-        for item in items:
-            self.scraping_tree.insert("", tk.END, values=(
-                item['food_name'],
-                f"{item['price']:,}",
-                item.get('description', ''),
-                item.get('discount', '0%')
-            ))
-        
+        """show scraping results in the results table"""
+        self.scraping_table.set_source(FrameSource(self._scraped_frame(items), ['food_name']))
         self.scraping_status.set(f"اسکرپ کامل شد. {len(items)} آیتم یافت شد.")
     
     def show_scraping_results(self):
@@ -1978,84 +1956,108 @@ class FoodDeliveryApp:
             messagebox.showwarning("خطا", "لطفاً هر دو فایل را انتخاب کنید")
             return
 
-        try:
-            # 1. reading files with appropriate encoding for Persian
-            our_df = pd.read_csv(our_file, encoding='utf-8-sig')
-            comp_df = pd.read_csv(comp_file, encoding='utf-8-sig')
+        # reading and matching large files runs in the background
+        self.comparison_status.set("در حال بارگذاری و مقایسه...")
+        self.tasks.submit("price_comparison", self._compare_price_files, our_file, comp_file,
+                          on_done=self._show_comparison_result,
+                          on_error=self._show_comparison_error)
+
+    @staticmethod
+    def _compare_price_files(our_file, comp_file):
+        """merged price table of the two files (runs on a worker thread)"""
+        # 1. reading files with appropriate encoding for Persian
+        our_df = pd.read_csv(our_file, encoding='utf-8-sig')
+        comp_df = pd.read_csv(comp_file, encoding='utf-8-sig')
 
-            # 2. standardizing column names (more flexible)
-            our_df = our_df.rename(columns={
-                'نام غذا': 'name',
-                'نام': 'name',
-                'غذا': 'name',
-                'قیمت فروش': 'our_price',
-                'selling_price': 'our_price',
-                'قیمت': 'our_price'
-            })
+        # 2. standardizing column names (more flexible)
+        our_df = our_df.rename(columns={
+            'نام غذا': 'name',
+            'نام': 'name',
+            'غذا': 'name',
+            'قیمت فروش': 'our_price',
+            'selling_price': 'our_price',
+            'قیمت': 'our_price'
+        })
 
-            comp_df = comp_df.rename(columns={
-                'food_name': 'name',
-                'نام غذا': 'name',
-                'نام': 'name',
-                'price': 'comp_price',
-                'قیمت': 'comp_price',
-                'قیمت اصلی': 'comp_price'
-            })
+        comp_df = comp_df.rename(columns={
+            'food_name': 'name',
+            'نام غذا': 'name',
+            'نام': 'name',
+            'price': 'comp_price',
+            'قیمت': 'comp_price',
+            'قیمت اصلی': 'comp_price'
+        })
 
-            # checking for required columns
-            required_our = {'name', 'our_price'}
-            required_comp = {'name', 'comp_price'}
+        # checking for required columns
+        required_our = {'name', 'our_price'}
+        required_comp = {'name', 'comp_price'}
 
-            if not required_our.issubset(our_df.columns):
-                missing = required_our - set(our_df.columns)
-                raise ValueError(f"ستون‌های مورد نیاز در فایل خودمان پیدا نشد: {missing}")
+        if not required_our.issubset(our_df.columns):
+            missing = required_our - set(our_df.columns)
+            raise ValueError(f"ستون‌های مورد نیاز در فایل خودمان پیدا نشد: {missing}")
 
-            if not required_comp.issubset(comp_df.columns):
-                missing = required_comp - set(comp_df.columns)
-                raise ValueError(f"ستون‌های مورد نیاز در فایل رقبا پیدا نشد: {missing}")
+        if not required_comp.issubset(comp_df.columns):
+            missing = required_comp - set(comp_df.columns)
+            raise ValueError(f"ستون‌های مورد نیاز در فایل رقبا پیدا نشد: {missing}")
 
-            # 3. converting prices to numbers (if needed)
-            our_df['our_price'] = pd.to_numeric(our_df['our_price'], errors='coerce')
-            comp_df['comp_price'] = pd.to_numeric(comp_df['comp_price'], errors='coerce')
+        # 3. converting prices to numbers (if needed)
+        our_df['our_price'] = pd.to_numeric(our_df['our_price'], errors='coerce')
+        comp_df['comp_price'] = pd.to_numeric(comp_df['comp_price'], errors='coerce')
 
-            # deleting rows with invalid prices
-            our_df = our_df.dropna(subset=['our_price'])
-            comp_df = comp_df.dropna(subset=['comp_price'])
+        # deleting rows with invalid prices
+        our_df = our_df.dropna(subset=['our_price'])
+        comp_df = comp_df.dropna(subset=['comp_price'])
 
-            # 4. performing merge
+        # 4. matching names (near-identical Persian spellings included)
+        try:
+            merged = tfidf_merge(
+                our_df[['name', 'our_price']],
+                comp_df[['name', 'comp_price']],
+                on='name'
+            )
+        except ImportError:
+            # without scikit-learn only identical names are compared
             merged = pd.merge(
                 our_df[['name', 'our_price']],
                 comp_df[['name', 'comp_price']],
                 on='name',
                 how='inner'
             )
+            merged.insert(2, 'matched_name', merged['name'])
+            merged['score'] = 1.0
 
-            if merged.empty:
-                messagebox.showinfo("نتیجه مقایسه", "هیچ غذای مشترکی با نام مشابه پیدا نشد.")
-                self.comparison_status.set("مقایسه انجام شد – ۰ مورد مشترک")
-                return
+        # 5. calculating difference and percentage
+        merged['difference'] = merged['our_price'] - merged['comp_price']
+        merged['percent'] = (merged['difference'] / merged['comp_price'] * 100).round(1)
 
-            # 5. calculating difference and percentage
-            merged['difference'] = merged['our_price'] - merged['comp_price']
-            merged['percent'] = (merged['difference'] / merged['comp_price'] * 100).round(1)
+        return merged
+
+    def _show_comparison_result(self, merged):
+        """store and announce the merged price table"""
+        if merged.empty:
+            messagebox.showinfo("نتیجه مقایسه", "هیچ غذای مشترکی با نام مشابه پیدا نشد.")
+            self.comparison_status.set("مقایسه انجام شد – ۰ مورد مشترک")
+            return
 
-            # 6. saving result for future use
-            self.merged_df = merged          
-            self.comparison_done = True      
+        # 6. saving result for future use
+        self.merged_df = merged          
+        self.comparison_done = True      
 
-            # 7. feedback to user
-            msg = f"مقایسه با موفقیت انجام شد\nتعداد غذاهای مشترک: {len(merged)}\n"
-            msg += f"میانگین اختلاف قیمت: {merged['difference'].mean():,.0f} تومان"
+        # 7. feedback to user
+        msg = f"مقایسه با موفقیت انجام شد\nتعداد غذاهای مشترک: {len(merged)}\n"
+        msg += f"میانگین اختلاف قیمت: {merged['difference'].mean():,.0f} تومان"
 
-            messagebox.showinfo("موفقیت مقایسه", msg)
-            self.comparison_status.set(f"مقایسه انجام شد – {len(merged)} مورد مشترک")
+        messagebox.showinfo("موفقیت مقایسه", msg)
+        self.comparison_status.set(f"مقایسه انجام شد – {len(merged)} مورد مشترک")
 
-        except pd.errors.EmptyDataError:
+    def _show_comparison_error(self, error):
+        """error dialog for a failed comparison"""
+        if isinstance(error, pd.errors.EmptyDataError):
             messagebox.showerror("خطا", "یکی از فایل‌ها خالی است یا ساختار درستی ندارد.")
-        except UnicodeDecodeError:
+        elif isinstance(error, UnicodeDecodeError):
             messagebox.showerror("خطا", "مشکل در خواندن فایل (encoding). فایل را با UTF-8 ذخیره کنید.")
-        except Exception as e:
-            messagebox.showerror("خطا در بارگذاری یا مقایسه", str(e))
+        else:
+            messagebox.showerror("خطا در بارگذاری یا مقایسه", str(error))
             self.comparison_status.set("خطا در فرآیند مقایسه")
     
     def show_comparison_report(self):
@@ -2068,7 +2070,7 @@ class FoodDeliveryApp:
                 return
 
             # here we can open the Treeview or report window
-        summary = self.merged_df[['name', 'our_price', 'comp_price', 'difference', 'percent']].to_string(index=False)
+        summary = self.merged_df[['name', 'matched_name', 'our_price', 'comp_price', 'difference', 'percent', 'score']].to_string(index=False)
         messagebox.showinfo("گزارش مقایسه", summary)
     
     def show_report_in_window(self, report_df):
@@ -2077,41 +2079,23 @@ class FoodDeliveryApp:
         report_window.title("گزارش مقایسه قیمت")
         report_window.geometry("800x500")
         
-        # Treeview
-        tree_frame = ttk.Frame(report_window)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        columns = ["غذا", "قیمت ما", "میانگین رقبا", "اختلاف", "درصد اختلاف", "وضعیت"]
-        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
-        
-        for col in columns:
-            tree.heading(col, text=col)
-        
-        tree.column("غذا", width=150)
-        tree.column("قیمت ما", width=100)
-        tree.column("میانگین رقبا", width=100)
-        tree.column("اختلاف", width=100)
-        tree.column("درصد اختلاف", width=100)
-        tree.column("وضعیت", width=100)
-        
-        for _, row in report_df.iterrows():
-            status_text = "ارزان‌تر" if row['price_difference'] < 0 else "گران‌تر"
-            status_color = "green" if row['price_difference'] < 0 else "red"
-            
-            tree.insert("", tk.END, values=(
+        # only the visible rows are drawn; sorting is done on the frame
+        columns = [("غذا", 150), ("قیمت ما", 100), ("میانگین رقبا", 100), ("اختلاف", 100),
+                   ("درصد اختلاف", 100), ("وضعیت", 100)]
+        table = VirtualTable(
+            report_window, columns, FrameSource(report_df, ['our_food']),
+            lambda row: (
                 row['our_food'],
                 f"{row['our_price']:,}",
                 f"{row['avg_competitor_price']:,}",
                 f"{row['price_difference']:,}",
                 f"{row['price_difference_percent']:.1f}%",
-                status_text
-            ))
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+                "ارزان‌تر" if row['price_difference'] < 0 else "گران‌تر"
+            ),
+            sort_keys={"غذا": 'our_food', "قیمت ما": 'our_price',
+                       "میانگین رقبا": 'avg_competitor_price', "اختلاف": 'price_difference',
+                       "درصد اختلاف": 'price_difference_percent', "وضعیت": 'price_difference'})
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # summary
         summary_frame = ttk.Frame(report_window)
@@ -2185,6 +2169,8 @@ class FoodDeliveryApp:
                   command=self.start_multi_scraping, width=20).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="توقف همه اسکرپ‌ها", 
                   command=self.stop_all_scraping, width=20).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="ادامه اسکرپ", 
+                  command=self.resume_multi_scraping, width=20).pack(side=tk.LEFT, padx=5)
         
         # results
         results_frame = ttk.LabelFrame(main_frame, text="نتایج", padding=10)
@@ -2193,8 +2179,22 @@ class FoodDeliveryApp:
         self.results_text = tk.Text(results_frame, width=70, height=15, font=self.font)
         self.results_text.pack(fill=tk.BOTH, expand=True)
     
+    # manifest of the multi-restaurant scrape, resumed after a stop or crash
+    MULTI_SCRAPE_JOB = "multi_scrape_job.json"
+    
+    def _multi_scrape_running(self):
+        """warn and return True while a multi-restaurant scrape is running"""
+        if self.multi_job is not None:
+            messagebox.showwarning("خطا", "یک اسکرپ در حال اجراست")
+            return True
+        return False
+    
     def start_multi_scraping(self):
         """start scraping multiple restaurants at once"""
+        # checked before anything touches the running job's manifest
+        if self._multi_scrape_running():
+            return
+        
         urls_text = self.urls_text.get("1.0", tk.END).strip()
         urls = [url.strip() for url in urls_text.split('\n') if url.strip()]
         
@@ -2202,62 +2202,107 @@ class FoodDeliveryApp:
             messagebox.showwarning("خطا", "لطفا حداقل یک لینک وارد کنید")
             return
         
-        self.multi_status.set(f"در حال اسکرپ {len(urls)} رستوران...")
+        # a new list of links starts a new job
+        if os.path.exists(self.MULTI_SCRAPE_JOB):
+            os.remove(self.MULTI_SCRAPE_JOB)
+        self.run_multi_scrape_job(ScrapeJob(
+            self.MULTI_SCRAPE_JOB, urls,
+            output_dir=f"multi_scraped_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        ))
+    
+    def resume_multi_scraping(self):
+        """continue the last multi-restaurant scrape from its checkpoint"""
+        if self._multi_scrape_running():
+            return
+        if not os.path.exists(self.MULTI_SCRAPE_JOB):
+            messagebox.showinfo("ادامه اسکرپ", "کار نیمه‌تمامی وجود ندارد")
+            return
+        job = ScrapeJob(self.MULTI_SCRAPE_JOB)
+        if job.finished:
+            messagebox.showinfo("ادامه اسکرپ", "همه رستوران‌های کار قبلی اسکرپ شده‌اند")
+            return
+        self.run_multi_scrape_job(job)
+    
+    def run_multi_scrape_job(self, job):
+        """scrape the unfinished restaurants of job in a separate thread"""
+        if self._multi_scrape_running():
+            return
+        
+        urls = list(job.entries)
+        pending = job.pending_urls()
+        self.multi_job = job
+        self.multi_status.set(f"در حال اسکرپ {len(pending)} رستوران از {len(urls)}...")
         self.results_text.delete("1.0", tk.END)
         
+        def show_result(result):
+            i = urls.index(result['url']) + 1
+            if result['success']:
+                result_text = f"رستوران {i}: {result['count']} آیتم یافت شد\n"
+                for item in result['items'][:3]:  # only first 3 items
+                    result_text += f"   • {item['food_name'][:30]}...: {item['price']:,}\n"
+            else:
+                result_text = f" رستوران {i}: خطا - {result['error']}\n"
+            self.root.after(0, lambda t=result_text: self.results_text.insert(tk.END, t + "\n"))
+        
+        def show_progress(current, total, items_count):
+            status = f"اسکرپ {current} از {total} رستوران انجام شد..."
+            self.root.after(0, lambda s=status: self.multi_status.set(s))
+        
+        def job_finished():
+            # runs on the Tk thread, like every other access to self.multi_job
+            if self.multi_job is job:
+                self.multi_job = None
+        
         def scraping_task():
-            all_results = []
-            for i, url in enumerate(urls, 1):
-                try:
-                    # update status
-                    status = f"در حال اسکرپ رستوران {i} از {len(urls)}..."
-                    self.root.after(0, lambda s=status: self.multi_status.set(s))
-                    
-                    # scrape
-                    items = self.snappfood_scraper.scrape_menu(url)
-                    
-                    # display results
-                    result_text = f"رستوران {i}: {len(items)} آیتم یافت شد\n"
-                    for item in items[:3]:  # only first 3 items
-                        result_text += f"   • {item['food_name'][:30]}...: {item['price']:,}\n"
-                    
-                    self.root.after(0, lambda t=result_text: self.results_text.insert(tk.END, t + "\n"))
-                    all_results.extend(items)
-                    
-                except Exception as e:
-                    error_text = f" رستوران {i}: خطا - {str(e)}\n"
-                    self.root.after(0, lambda t=error_text: self.results_text.insert(tk.END, t))
+            try:
+                run_job()
+            finally:
+                self.root.after(0, job_finished)
+        
+        def run_job():
+            scraper = ThreadedRestaurantScraper(AppSnappFoodScraper, max_workers=3, verbose=False)
+            try:
+                summary = job.run(scraper, show_progress, show_result)
+            except Exception as e:
+                self.root.after(0, lambda e=e: self.multi_status.set(f"خطا: {str(e)}"))
+                return
             
-            # end
-            self.root.after(0, lambda: self.multi_status.set(f"اسکرپ کامل شد. {len(all_results)} آیتم یافت شد."))
+            if summary['remaining']:
+                status = (f"متوقف شد: {summary['done']} از {summary['total']} رستوران انجام شد "
+                          f"({summary['items']} آیتم). برای ادامه «ادامه اسکرپ» را بزنید.")
+            else:
+                status = f"اسکرپ کامل شد. {summary['items']} آیتم یافت شد."
+            self.root.after(0, lambda: self.multi_status.set(status))
             
-            # save all results
-            if all_results:
+            # all results of the job in one file
+            if summary['items'] and not summary['remaining']:
                 try:
-                    df = pd.DataFrame(all_results)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"multi_scraped_{timestamp}.csv"
-                    df.to_csv(filename, index=False, encoding='utf-8-sig')
+                    filename = f"{job.output_dir}.csv"
+                    job.load_items().to_csv(filename, index=False, encoding='utf-8-sig')
                     
                     self.root.after(0, lambda: self.results_text.insert(
                         tk.END, f"\n📁 تمام نتایج در {filename} ذخیره شد\n"))
                 except Exception as e:
-                    self.root.after(0, lambda: self.results_text.insert(
+                    self.root.after(0, lambda e=e: self.results_text.insert(
                         tk.END, f"\nخطا در ذخیره: {str(e)}\n"))
         
         # execute in separate thread
         threading.Thread(target=scraping_task, daemon=True).start()
     
     def stop_all_scraping(self):
-        """stop all scraping"""
-        # add stop logic here
-        self.multi_status.set("عملیات متوقف شد")
-        self.results_text.insert(tk.END, "\n عملیات توسط کاربر متوقف شد\n")            
+        """stop all scraping (restaurants already loading are finished)"""
+        job = self.multi_job
+        if job is None:
+            return
+        job.cancel()
+        self.multi_status.set("در حال توقف... رستوران‌های در حال اسکرپ تمام می‌شوند")
+        self.results_text.insert(tk.END, "\n عملیات توسط کاربر متوقف شد\n")
 
 def main():
     root = tk.Tk()
     app = FoodDeliveryApp(root)
     root.mainloop()
+    app.tasks.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+Background execution of blocking calls for the Tk GUI.
+
+Every service call that reads the tables (orders, order history, menus,
+sales reports, price files) can take seconds on a large CSV. TaskRunner
+runs them on a small thread pool; a worker never touches a widget, it
+puts its outcome on a queue that the Tk main thread drains from a
+root.after() poll, so callbacks always run on the main thread.
+
+Each task has a key ("orders", "menu", ...). Submitting a task under a
+key supersedes the one still pending under it: the old task is
+cancelled if it has not started and its result is dropped otherwise,
+so a slow load can never overwrite the screen a newer one built.
+cancel_all() drops everything, for when the window's content is
+replaced. While a task is pending a Spinner can stand in for its
+result.
+
+Calls that change data (checkout, saving a food, a status update) are
+submitted with write=True: they always run, and cancel_all() leaves
+them pending so their success message or error still reaches the user.
+
+    self.tasks.submit("orders", self.admin_service.get_all_orders,
+                      on_done=fill_tree, spinner=tree_frame)
+"""
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, ttk
+from typing import Any, Callable, Dict, Optional
+
+
+class Spinner(ttk.Frame):
+    """Indeterminate progress bar with a caption, shown while a task is pending"""
+
+    def __init__(self, parent, text: str = "در حال بارگذاری..."):
+        super().__init__(parent)
+        ttk.Label(self, text=text).pack(pady=(20, 5))
+        self._bar = ttk.Progressbar(self, mode='indeterminate', length=200)
+        self._bar.pack()
+        self.pack(pady=10)
+        self._bar.start(15)
+
+    def stop(self):
+        try:
+            if self.winfo_exists():
+                self._bar.stop()
+                self.destroy()
+        except tk.TclError:
+            pass  # the window is gone
+
+
+class Task:
+    """A submitted call: its key, callbacks and spinner"""
+
+    def __init__(self, key: str, on_done, on_error, spinner, write: bool = False):
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.spinner = spinner
+        self.write = write
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        # a write still runs, only its callbacks are dropped
+        if self.future is not None and not self.write:
+            self.future.cancel()
+        self._stop_spinner()
+
+    def _stop_spinner(self):
+        if self.spinner is not None:
+            self.spinner.stop()
+            self.spinner = None
+
+
+def show_error(error: Exception):
+    """Default on_error: an error dialog"""
+    messagebox.showerror("خطا", str(error))
+
+
+class TaskRunner:
+    """Runs blocking calls on worker threads and delivers results on the Tk thread"""
+
+    def __init__(self, root, max_workers: int = 4, poll_ms: int = 30):
+        """
+        Args:
+            root: Tk root (anything with after(ms, callback))
+            max_workers: Worker threads
+            poll_ms: Interval of the result queue poll while tasks are pending
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="gui-task")
+        self._results: "queue.Queue" = queue.Queue()
+        self._pending: Dict[str, Task] = {}
+        self._polling = False
+
+    def submit(
+        self,
+        key: str,
+        func: Callable,
+        *args,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = show_error,
+        spinner: Optional[tk.Misc] = None,
+        write: bool = False,
+        **kwargs
+    ) -> Task:
+        """
+        Run func(*args, **kwargs) on a worker, superseding the task
+        pending under key. Must be called from the Tk thread.
+
+        Args:
+            key: Tasks under the same key replace each other
+            on_done: Called with the result on the Tk thread
+            on_error: Called with the exception on the Tk thread
+            spinner: Parent widget of a Spinner shown until the task ends
+            write: func changes data; it is never cancelled and
+                   cancel_all() keeps its callbacks
+        """
+        self.cancel(key)
+        task = Task(key, on_done, on_error,
+                    Spinner(spinner) if spinner is not None else None, write)
+        self._pending[key] = task
+        task.future = self._executor.submit(self._run, task, func, args, kwargs)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return task
+
+    def _run(self, task: Task, func: Callable, args, kwargs):
+        # worker thread: no Tk calls here
+        if task.cancelled:
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._results.put((task, None, e))
+        else:
+            self._results.put((task, result, None))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    task, result, error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if task.cancelled or self._pending.get(task.key) is not task:
+                    continue  # superseded
+                del self._pending[task.key]
+                task._stop_spinner()
+                if error is None:
+                    if task.on_done:
+                        task.on_done(result)
+                elif task.on_error:
+                    task.on_error(error)
+        finally:
+            # keep polling even if a callback raised
+            if self._pending or not self._results.empty():
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def pending(self, key: Optional[str] = None) -> bool:
+        """Whether a task (under key, or any) is still pending"""
+        return key in self._pending if key is not None else bool(self._pending)
+
+    def cancel(self, key: str):
+        """Drop the task pending under key"""
+        task = self._pending.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        """Drop every pending load (the widgets they would fill are going away)"""
+        for key, task in list(self._pending.items()):
+            if not task.write:
+                self.cancel(key)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,208 @@
+"""
+Browser-free menu fetching over a pooled HTTP session.
+
+Most menu pages ship their data twice: as rendered HTML and as JSON
+(Next.js "__NEXT_DATA__" or a preloaded state script), and the vendor
+app reads the same menu from a JSON endpoint. Fetching that with one
+shared requests.Session avoids starting Chrome at all; the scrapers use
+a browser only when neither source yields menu items.
+"""
+import json
+import re
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept-Language': 'fa-IR,fa;q=0.9,en;q=0.8'
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size: int = 20, retries: int = 2) -> requests.Session:
+    """Session with keep-alive connection pools and retry on transient errors"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',)
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Session shared by every scraper of the process"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+# -------------------------------------------------------
+# Embedded JSON
+# -------------------------------------------------------
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S
+)
+_STATE_RE = re.compile(
+    r'window\.__(?:PRELOADED_STATE|INITIAL_STATE|NUXT)__\s*=\s*(\{.*?\})\s*;?\s*</script>', re.S
+)
+
+
+def extract_embedded_json(html: str) -> List[dict]:
+    """JSON documents embedded in the page's script tags"""
+    documents = []
+    for pattern in (_NEXT_DATA_RE, _STATE_RE):
+        for match in pattern.finditer(html or ""):
+            try:
+                documents.append(json.loads(match.group(1)))
+            except ValueError:
+                continue
+    return documents
+
+
+_NAME_KEYS = ('title', 'name', 'productTitle', 'foodName')
+_PRICE_KEYS = ('price', 'originalPrice', 'finalPrice', 'priceAfterDiscount', 'discountedPrice')
+
+
+def _is_product(node: dict) -> bool:
+    has_name = any(isinstance(node.get(k), str) and node.get(k).strip() for k in _NAME_KEYS)
+    has_price = any(isinstance(node.get(k), (int, float)) and not isinstance(node.get(k), bool)
+                    for k in _PRICE_KEYS)
+    return has_name and has_price
+
+
+def find_products(data) -> List[dict]:
+    """Product-like objects (a name and a numeric price) anywhere in a JSON tree"""
+    products = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if _is_product(node):
+                products.append(node)
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return products
+
+
+def _number(node: dict, keys) -> Optional[float]:
+    for key in keys:
+        value = node.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def product_to_item(product: dict, restaurant: str) -> Optional[Dict]:
+    """
+    Map a JSON product onto the dict _parse_food_card returns:
+    restaurant, food_name, description, price, original_price, discount,
+    stock, scraped_at.
+    """
+    name = next(product[k].strip() for k in _NAME_KEYS
+                if isinstance(product.get(k), str) and product[k].strip())
+
+    original = _number(product, ('price', 'originalPrice'))
+    final = _number(product, ('finalPrice', 'priceAfterDiscount', 'discountedPrice'))
+    discount_amount = _number(product, ('discount', 'discountAmount'))
+    if final is None:
+        final = original
+        if original is not None and discount_amount and 0 < discount_amount < original:
+            final = original - discount_amount
+    if original is None or original < final:
+        original = final
+    if not final:
+        return None
+
+    ratio = _number(product, ('discountRatio', 'discountPercent', 'discountPercentage'))
+    if ratio is None:
+        ratio = round((original - final) * 100 / original) if original else 0
+
+    stock = "نامشخص"
+    for key in ('stock', 'capacity', 'remaining'):
+        value = product.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            stock = str(int(value))
+            break
+    for key in ('available', 'isAvailable', 'inStock'):
+        if product.get(key) is False:
+            stock = "0"
+
+    description = product.get('description') or product.get('ingredient') or ""
+    return {
+        'restaurant': restaurant,
+        'food_name': name,
+        'description': str(description).strip()[:100],
+        'price': int(final),
+        'original_price': int(original),
+        'discount': f"{int(ratio)}%",
+        'stock': stock,
+        'scraped_at': pd.Timestamp.now()
+    }
+
+
+def items_from_json(data, restaurant: str) -> List[Dict]:
+    """Menu items of every product in a JSON document"""
+    items = []
+    for product in find_products(data):
+        item = product_to_item(product, restaurant)
+        if item:
+            items.append(item)
+    return items
+
+
+def items_from_html(html: str, restaurant: str) -> List[Dict]:
+    """Items from the first JSON document embedded in a page that has any"""
+    for document in extract_embedded_json(html):
+        items = items_from_json(document, restaurant)
+        if items:
+            return items
+    return []
+
+
+class HttpMenuFetcher:
+    """Fetches menu pages and menu JSON without a browser"""
+
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = 15):
+        self.session = session or get_session()
+        self.timeout = timeout
+
+    def get_text(self, url: str) -> str:
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            # requests assumes ISO-8859-1 for text/* without a charset
+            response.encoding = 'utf-8'
+        return response.text
+
+    def get_json(self, url: str):
+        response = self.session.get(url, timeout=self.timeout,
+                                    headers={'Accept': 'application/json'})
+        response.raise_for_status()
+        return response.json()
+
+    def items_from_json(self, data, restaurant: str) -> List[Dict]:
+        return items_from_json(data, restaurant)
+
+    def items_from_html(self, html: str, restaurant: str) -> List[Dict]:
+        return items_from_html(html, restaurant)
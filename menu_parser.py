@@ -0,0 +1,199 @@
+"""
+Fast extraction of food cards from menu HTML.
+
+The BeautifulSoup path of SnappFoodScraper builds a pure-Python tree and
+then re-walks every card several times: get_text() of each p/span/div
+for prices, get_text() of the whole card for the discount and again for
+the stock, each followed by a list of regexes compiled on the fly. Here
+the page is parsed by lxml (C), a card's text is collected in one walk
+(the digits of every nested p/span/div come out of the same walk) and
+the patterns are compiled once. The extracted fields are the ones
+_parse_food_card produces.
+
+lxml is optional: without it HAVE_LXML is False and the scraper keeps
+using BeautifulSoup. The text helpers (parse_number, find_discount,
+find_stock, pick_prices) are shared by both paths; they read the card
+text through persian_text, so Persian digits and Arabic letters give the
+same fields as their ASCII and Persian forms.
+"""
+import re
+from typing import Dict, List, Optional
+
+from persian_text import normalize, parse_int
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    HAVE_LXML = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAVE_LXML = False
+
+DIGITS_RE = re.compile(r'\d+')
+
+DISCOUNT_PATTERNS = [
+    re.compile(r'(\d+)\s*%', re.IGNORECASE),
+    re.compile(r'٪\s*(\d+)', re.IGNORECASE),
+    re.compile(r'(\d+)\s*٪', re.IGNORECASE),
+    re.compile(r'تخفیف\s*(\d+)', re.IGNORECASE),
+    re.compile(r'discount.*?(\d+)', re.IGNORECASE)
+]
+
+STOCK_PATTERNS = [
+    re.compile(r'موجودی\s*(\d+)'),
+    re.compile(r'(\d+)\s*عدد\s*موجود'),
+    re.compile(r'موجود\s*:\s*(\d+)')
+]
+
+UNAVAILABLE_KEYWORDS = ('ناموجود', 'موجود نیست', 'اتمام', 'تمام شد')
+
+# prices are the numbers of at least this many tomans
+MIN_PRICE = 1000
+
+PRICE_TAGS = frozenset(('p', 'span', 'div'))
+NAME_TAGS = ('h3', 'h4', 'h5', 'h2')
+DESCRIPTION_KEYWORDS = ('desc', 'description', 'detail')
+# elements whose text BeautifulSoup's get_text() leaves out
+_SKIPPED_TAGS = frozenset(('script', 'style', 'template'))
+
+PRODUCT_CARD_XPATH = "//div[starts-with(@data-testid, 'ProductCard')]"
+
+
+def parse_number(text: str) -> int:
+    """All the (Persian or English) digits of text as one integer, 0 if none"""
+    return parse_int(text)
+
+
+def find_discount(card_text: str) -> str:
+    """Discount percentage in a card's text, "0%" if none"""
+    card_text = normalize(card_text)
+    for pattern in DISCOUNT_PATTERNS:
+        match = pattern.search(card_text)
+        if match:
+            return f"{match.group(1)}%"
+    return "0%"
+
+
+def find_stock(card_text: str) -> str:
+    """Stock in a card's text: a count, "0" if unavailable, else "نامشخص" """
+    card_text = normalize(card_text)
+    for pattern in STOCK_PATTERNS:
+        match = pattern.search(card_text)
+        if match:
+            return match.group(1)
+    if any(keyword in card_text for keyword in UNAVAILABLE_KEYWORDS):
+        return "0"
+    return "نامشخص"
+
+
+def pick_prices(candidates) -> Dict[str, int]:
+    """Final (lowest) and original (highest) of the price candidates"""
+    prices = sorted(set(candidates))
+    if not prices:
+        return {'final_price': 0, 'original_price': 0}
+    return {'final_price': prices[0], 'original_price': prices[-1]}
+
+
+# -------------------------------------------------------
+# lxml path
+# -------------------------------------------------------
+def find_cards(html: str) -> list:
+    """Food card elements of a page (empty for a page without cards)"""
+    if not html or not html.strip():
+        return []
+    try:
+        root = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return []
+    return root.xpath(PRODUCT_CARD_XPATH)
+
+
+def card_markup(card) -> str:
+    """Markup of a card, for fingerprinting"""
+    return etree.tostring(card, encoding='unicode', with_tail=False)
+
+
+def _strings(element) -> List[str]:
+    """Text nodes of element in document order, as BeautifulSoup get_text() sees them"""
+    strings = []
+
+    def walk(node):
+        if node.text and node.tag not in _SKIPPED_TAGS:
+            strings.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str):
+                walk(child)
+            # comments and processing instructions only contribute their tail
+            if child.tail:
+                strings.append(child.tail)
+
+    walk(element)
+    return strings
+
+
+def _stripped_text(element) -> str:
+    """BeautifulSoup get_text(strip=True)"""
+    return ''.join(s.strip() for s in _strings(element))
+
+
+def card_fields(card) -> Optional[Dict]:
+    """
+    Fields of one card: name, description, final_price, original_price,
+    discount and stock. None without a name.
+    """
+    text_parts: List[str] = []
+    candidates: List[int] = []
+    name_tags = {}
+    title_tag = None
+    description_tag = None
+
+    # one walk: card text, the digits of every p/span/div, and the tags
+    # the name and description come from
+    def walk(node, depth) -> str:
+        nonlocal title_tag, description_tag
+        tag = node.tag
+        digits = []
+        if node.text and tag not in _SKIPPED_TAGS:
+            text_parts.append(node.text)
+            digits.extend(DIGITS_RE.findall(node.text))
+        for child in node:
+            if isinstance(child.tag, str):
+                if child.tag in NAME_TAGS and child.tag not in name_tags:
+                    name_tags[child.tag] = child
+                classes = child.get('class')
+                if classes:
+                    lowered = classes.lower()
+                    if title_tag is None and 'title' in lowered:
+                        title_tag = child
+                    if (description_tag is None and child.tag == 'p'
+                            and any(keyword in lowered for keyword in DESCRIPTION_KEYWORDS)):
+                        description_tag = child
+                digits.append(walk(child, depth + 1))
+            if child.tail:
+                text_parts.append(child.tail)
+                digits.extend(DIGITS_RE.findall(child.tail))
+        digit_string = ''.join(digits)
+        if depth and tag in PRICE_TAGS and digit_string:
+            try:
+                price = int(digit_string)
+            except ValueError:
+                price = 0
+            if price >= MIN_PRICE:
+                candidates.append(price)
+        return digit_string
+
+    walk(card, 0)
+
+    name_tag = next((name_tags[tag] for tag in NAME_TAGS if tag in name_tags), title_tag)
+    name = _stripped_text(name_tag) if name_tag is not None else ""
+    if not name:
+        return None
+
+    description = _stripped_text(description_tag)[:100] if description_tag is not None else ""
+    card_text = ''.join(text_parts)
+    return dict(
+        name=name,
+        description=description,
+        discount=find_discount(card_text),
+        stock=find_stock(card_text),
+        **pick_prices(candidates)
+    )
@@ -0,0 +1,36 @@
+"""
+One-shot migration of the six CSV tables into a SQLite database.
+
+Usage:
+    python migrate_to_sqlite.py [--data-dir .] [--db food_delivery.db]
+
+Afterwards run the app with FOOD_DELIVERY_STORAGE=sqlite.
+"""
+import argparse
+import os
+
+from storage import CSVBackend, SQLiteBackend, migrate_csv_to_sqlite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert CSV tables to SQLite")
+    parser.add_argument("--data-dir", default=".", help="Folder containing the CSV files")
+    parser.add_argument("--db", default="food_delivery.db", help="SQLite file to create")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        print(f"{args.db} already exists, its tables will be replaced")
+
+    sqlite_backend = SQLiteBackend(args.db)
+    try:
+        counts = migrate_csv_to_sqlite(CSVBackend(args.data_dir), sqlite_backend)
+    finally:
+        sqlite_backend.close()
+
+    for table, count in counts.items():
+        print(f"{table:.<30} {count} rows")
+    print(f"Migration finished: {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Word-set (Jaccard) matching of food names against a competitor catalog.
+
+PriceComparisonGUI pairs every food of ours with the scraped item whose
+name shares the most words: similarity is |A ∩ B| / |A ∪ B| over the
+persian_text word sets of the two names (ي/ی, ك/ک, ZWNJ and digit
+alphabets do not matter), a pair needs more than 0.5 and the first of
+equally similar items wins. Scoring every pair is O(N×M), so NameMatcher
+indexes the catalog once and scores only the items that can pass the
+threshold.
+
+Words are ordered by how few catalog names contain them. A name of q
+words needs at least α(q, c) words in common with a name of c words to
+pass the threshold, so the two share a word among the first q - α + 1
+of the one and the first c - α + 1 of the other (prefix filtering).
+Only those prefix words are indexed, per name length, and probed; the
+rare words keep the posting lists short. Candidates are then scored
+exactly, which gives the same matches as the pairwise scan. Repeated
+catalog names are indexed once and repeated queries answered once.
+
+tfidf_merge() is the bulk mode for files of prices: both name lists
+become sparse TF-IDF matrices of character n-grams (so "سیب زمینی" and
+"سیب‌زمینی سرخ کرده" still share most of their features), the cosine
+similarities of all pairs come from one sparse matrix product per block
+of rows, and the top-k matches of every name are merged into a frame.
+"""
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from persian_text import normalize, word_set
+
+# a match needs a similarity strictly above this
+MIN_SIMILARITY = 0.5
+
+
+def jaccard(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Shared words over all words, 0.0 if either set is empty"""
+    if not words1 or not words2:
+        return 0.0
+    common = len(words1 & words2)
+    return common / (len(words1) + len(words2) - common)
+
+
+def _min_overlap(size1: int, size2: int, threshold: float) -> int:
+    """Fewest shared words for a similarity above threshold"""
+    return int(threshold * (size1 + size2) / (1 + threshold)) + 1
+
+
+class NameMatcher:
+    """Prefix-filtered inverted index over the names of a catalog"""
+
+    def __init__(self, names: Iterable, threshold: float = MIN_SIMILARITY):
+        """
+        Args:
+            names: Catalog names; matches are reported by position
+            threshold: Matches need a similarity strictly above this
+        """
+        self.threshold = threshold
+        sets = [word_set(name) for name in names]
+        self._size = len(sets)
+
+        # a repeated name can only win at its first position
+        first: Dict[FrozenSet[str], int] = {}
+        for position, words in enumerate(sets):
+            if words:
+                first.setdefault(words, position)
+        self._names: List[Tuple[int, FrozenSet[str]]] = [(p, w) for w, p in first.items()]
+
+        frequency = Counter(word for _, words in self._names for word in words)
+        self._rank: Dict[str, int] = {
+            word: rank for rank, word in
+            enumerate(sorted(frequency, key=lambda word: (frequency[word], word)))
+        }
+
+        # word count -> prefix word -> names; the prefix is long enough
+        # for the shortest name that can still match
+        self._index: Dict[int, Dict[str, List[int]]] = {}
+        for name_id, (_, words) in enumerate(self._names):
+            size = len(words)
+            shortest = next(q for q in range(1, size + 1)
+                            if _min_overlap(q, size, threshold) <= q)
+            postings = self._index.setdefault(size, {})
+            prefix = size - _min_overlap(shortest, size, threshold) + 1
+            for word in self._ordered(words)[:prefix]:
+                postings.setdefault(word, []).append(name_id)
+        self._matches: Dict[FrozenSet[str], Optional[Tuple[int, float]]] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _ordered(self, words: FrozenSet[str]) -> List[str]:
+        # words the catalog has never seen sort first; they match nothing
+        return sorted(words, key=lambda word: (self._rank.get(word, -1), word))
+
+    def candidates(self, name) -> List[int]:
+        """Positions that may pass the threshold, in catalog order"""
+        return sorted(self._names[name_id][0] for name_id in self._candidates(word_set(name)))
+
+    def _candidates(self, words: FrozenSet[str]) -> set:
+        found = set()
+        if not words:
+            return found
+        ordered = self._ordered(words)
+        size = len(words)
+        for other_size, postings in self._index.items():
+            overlap = _min_overlap(size, other_size, self.threshold)
+            if overlap > min(size, other_size):
+                continue
+            for word in ordered[:size - overlap + 1]:
+                found.update(postings.get(word, ()))
+        return found
+
+    def best_match(self, name) -> Optional[Tuple[int, float]]:
+        """
+        (position, similarity) of the most similar catalog name, the
+        first one on ties; None if no name passes the threshold.
+        """
+        words = word_set(name)
+        if words in self._matches:
+            return self._matches[words]
+        best = None
+        for name_id in self._candidates(words):
+            position, other = self._names[name_id]
+            similarity = jaccard(words, other)
+            if similarity > self.threshold and (
+                    best is None or similarity > best[1]
+                    or (similarity == best[1] and position < best[0])):
+                best = (position, similarity)
+        self._matches[words] = best
+        return best
+
+    def match_all(self, names: Iterable) -> List[Optional[Tuple[int, float]]]:
+        """best_match of every name"""
+        return [self.best_match(name) for name in names]
+
+
+def tfidf_merge(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    on: str = 'name',
+    top_k: int = 1,
+    min_score: float = 0.75,
+    ngram_range: Tuple[int, int] = (2, 3),
+    block_size: int = 2000
+) -> pd.DataFrame:
+    """
+    Fuzzy inner merge of two frames on a name column. Requires scikit-learn.
+
+    Args:
+        left, right: Frames with an `on` column
+        on: Name column of both frames
+        top_k: Matches kept per left row, best first
+        min_score: Lowest cosine similarity of a match (1.0 for equal names)
+        ngram_range: Lengths of the character n-grams
+        block_size: Left rows per sparse product, bounds the memory used
+
+    Returns:
+        The left columns, the right columns (`on` renamed to
+        "matched_<on>", clashing names suffixed "_right") and 'score'
+    """
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+    except ImportError as e:
+        raise ImportError("tfidf_merge requires scikit-learn (pip install scikit-learn)") from e
+
+    left = left.reset_index(drop=True)
+    right = right.reset_index(drop=True).rename(columns={on: f"matched_{on}"})
+    left_names = [normalize(name).strip() for name in left[on].fillna('')]
+    right_names = [normalize(name).strip() for name in right[f"matched_{on}"].fillna('')]
+
+    left_rows: List[int] = []
+    right_rows: List[int] = []
+    scores: List[float] = []
+    if any(left_names) and any(right_names):
+        vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=ngram_range, dtype=np.float32)
+        vectorizer.fit(left_names + right_names)
+        left_matrix = vectorizer.transform(left_names)
+        right_matrix = vectorizer.transform(right_names).T.tocsr()
+
+        for start in range(0, len(left_names), block_size):
+            similarities = (left_matrix[start:start + block_size] @ right_matrix).tocsr()
+            similarities.data[similarities.data < min_score - 1e-9] = 0
+            similarities.eliminate_zeros()
+            for row in range(similarities.shape[0]):
+                begin, end = similarities.indptr[row], similarities.indptr[row + 1]
+                if begin == end:
+                    continue
+                row_scores = similarities.data[begin:end]
+                row_columns = similarities.indices[begin:end]
+                # best first, the first right row on ties
+                order = np.lexsort((row_columns, -row_scores))[:top_k]
+                left_rows.extend([start + row] * len(order))
+                right_rows.extend(row_columns[order].tolist())
+                scores.extend(np.minimum(row_scores[order], 1.0).round(4).tolist())
+
+    merged = left.iloc[left_rows].reset_index(drop=True).join(
+        right.iloc[right_rows].reset_index(drop=True), rsuffix='_right'
+    )
+    merged['score'] = scores
+    return merged
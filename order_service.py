@@ -1,7 +1,6 @@
 import uuid
 from datetime import date, datetime
 from typing import Optional
-import pandas as pd
 from model import Order, Cart, DiscountCode
 from database import Database
 from food_service import FoodService
@@ -26,7 +25,7 @@ class OrderService:
         Finalize the checkout process:
         - Convert cart into an order
         - Apply discount code if provided
-        - Validate and reduce food stock
+        - Validate and reduce food stock (all items at once)
         - Persist order and order items
         """
         if not cart.items:
@@ -72,25 +71,23 @@ class OrderService:
                 raise ValueError("Invalid or expired discount code")
 
             new_order.apply_discount(discount)
-            self.db.mark_discount_code_used(discount_code_str)
 
-        # 3. Reduce food stock
+        # 3. Reduce food stock: one check and one write for the whole cart,
+        # nothing is decremented if any item is short
+        quantities = {}
         for item in cart.items:
             food_id = item.food.food_id
-            quantity = item.quantity
-
-            foods_df = self.db.load_foods()
-            stock_row = foods_df[foods_df["food_id"] == food_id]
-
-            if stock_row.empty:
-                raise ValueError(f"Food with ID {food_id} not found")
-
-            current_stock = int(stock_row.iloc[0]["stock"])
-
-            if current_stock < quantity:
-                raise ValueError(f"Insufficient stock for {item.food.name}")
-
-            self.db.update_food_stock(food_id, current_stock - quantity)
+            quantities[food_id] = quantities.get(food_id, 0) + item.quantity
+        self.db.reserve_stock(quantities)
+
+        # the code is only spent once the stock is secured; if a concurrent
+        # checkout spent it first, give the stock back
+        if new_order.discount_code:
+            try:
+                self.db.mark_discount_code_used(new_order.discount_code)
+            except ValueError:
+                self.db.release_stock(quantities)
+                raise
 
         # 4. Save order and order items
         self.db.save_order(new_order)
@@ -109,12 +106,10 @@ class OrderService:
         #1. change the situation of the order
         self.db.update_order_status(order_id, Order.STATUS_PAID)
         #2. read user id to find total amount
-        orders_df = pd.read_csv(self.db.orders_file)
-        order_row = orders_df[orders_df['order_id'] == order_id]
-        if order_row.empty:
+        order_data = self.db.get_order_by_id(order_id)
+        if order_data is None:
             raise ValueError(f"Order with ID {order_id} not found")
 
-        order_data = order_row.iloc[0]
         customer_id = order_data['customer_id']   
         total_before_discount = float(order_data['total_amount']) + float(order_data['discount_amount'])
         customer_service = CustomerService()  
@@ -133,21 +128,12 @@ class OrderService:
         if items_df.empty:
             raise ValueError("Order not found or contains no items")
 
-        # 2. Restore food stock
+        # 2. Restore food stock (foods deleted since then are skipped)
+        quantities = {}
         for _, row in items_df.iterrows():
             food_id = str(row["food_id"])
-            quantity = int(row["quantity"])
-
-            foods_df = self.db.load_foods()
-            stock_row = foods_df[foods_df["food_id"] == food_id]
-
-            if stock_row.empty:
-                continue
-
-            current_stock = int(stock_row.iloc[0]["stock"])
-            new_stock = current_stock + quantity
-
-            self.db.update_food_stock(food_id, new_stock)
+            quantities[food_id] = quantities.get(food_id, 0) + int(row["quantity"])
+        self.db.release_stock(quantities)
 
         # 3. Update order status
         self.db.update_order_status(order_id, Order.STATUS_CANCELLED)
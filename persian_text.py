@@ -0,0 +1,122 @@
+"""
+Persian text normalization shared by search, name matching and scraping.
+
+Arabic and Persian keyboards produce different code points for the same
+letters (ي/ی, ك/ک), digits come in three alphabets and words may be
+joined with a zero-width non-joiner. normalize() folds all of these to
+one form so that text typed by a user matches text stored in the
+catalog; tokenize() then splits it into words and word_set() gives the
+words of a name for similarity scores.
+
+Everything is a single str.translate with tables built at import time.
+Food names and query words repeat endlessly (every search, every
+comparison, every rebuild of the search index), so short strings are
+normalized once and served from an LRU cache afterwards; long texts
+such as a menu card's text skip the cache. Scraped text only needs its
+digits and separators unified: normalize_digits() and parse_int() do
+that without touching the letters.
+"""
+import re
+from functools import lru_cache
+from typing import FrozenSet, List
+
+PERSIAN_DIGITS = '۰۱۲۳۴۵۶۷۸۹'
+ARABIC_DIGITS = '٠١٢٣٤٥٦٧٨٩'
+
+_DIGIT_MAP = {
+    **{p: str(i) for i, p in enumerate(PERSIAN_DIGITS)},
+    **{a: str(i) for i, a in enumerate(ARABIC_DIGITS)},
+    '٬': ',',  # Arabic thousands separator
+    '٫': '.',  # Arabic decimal separator
+}
+_DIGIT_TABLE = str.maketrans(_DIGIT_MAP)
+
+_CHAR_MAP = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه', 'ۀ': 'ه', 'ھ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u200c': ' ',  # ZWNJ: "سیب‌زمینی" matches "سیب زمینی"
+    '\u00a0': ' ',  # no-break space
+    'ـ': None,  # tatweel
+    '\u200d': None,  # zero-width joiner
+    '\u200e': None, '\u200f': None,  # LRM, RLM
+    **{chr(c): None for c in range(0x202A, 0x202F)},  # bidi embeddings and overrides
+    **{chr(c): None for c in range(0x064B, 0x0660)},  # harakat, hamza above/below
+    '\u0670': None,  # superscript alef
+    **_DIGIT_MAP,
+})
+
+_TOKEN_RE = re.compile(r'\w+')
+_NUMBER_RE = re.compile(r'[0-9]+')
+
+# strings up to this long go through the cache
+CACHED_LENGTH = 64
+_CACHE_SIZE = 1 << 16
+
+
+def _normalize(text: str) -> str:
+    return text.translate(_CHAR_MAP).lower()
+
+
+_normalize_cached = lru_cache(maxsize=_CACHE_SIZE)(_normalize)
+
+
+def normalize(text) -> str:
+    """Unify Arabic/Persian letters and digits, drop diacritics, lowercase"""
+    if not isinstance(text, str):
+        text = str(text)
+    if len(text) <= CACHED_LENGTH:
+        return _normalize_cached(text)
+    return _normalize(text)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _tokens_cached(text: str) -> tuple:
+    return tuple(_TOKEN_RE.findall(_normalize(text)))
+
+
+def tokenize(text) -> List[str]:
+    """Words of the normalized text"""
+    if not isinstance(text, str):
+        text = str(text)
+    if len(text) <= CACHED_LENGTH:
+        return list(_tokens_cached(text))
+    return _TOKEN_RE.findall(_normalize(text))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _word_set_cached(text: str) -> FrozenSet[str]:
+    return frozenset(_TOKEN_RE.findall(_normalize(text)))
+
+
+def word_set(text) -> FrozenSet[str]:
+    """Distinct words of the normalized text"""
+    if not isinstance(text, str):
+        text = str(text)
+    if len(text) <= CACHED_LENGTH:
+        return _word_set_cached(text)
+    return frozenset(_TOKEN_RE.findall(_normalize(text)))
+
+
+def normalize_digits(text) -> str:
+    """Persian and Arabic digits and number separators in ASCII"""
+    return str(text).translate(_DIGIT_TABLE)
+
+
+def parse_int(text) -> int:
+    """All the digits of text (in any alphabet) as one integer, 0 if none"""
+    if not text:
+        return 0
+    digits = ''.join(_NUMBER_RE.findall(normalize_digits(text)))
+    return int(digits) if digits else 0
+
+
+def cache_info() -> dict:
+    """Hits and misses of the normalization caches"""
+    return {
+        'normalize': _normalize_cached.cache_info(),
+        'tokenize': _tokens_cached.cache_info(),
+        'word_set': _word_set_cached.cache_info(),
+    }
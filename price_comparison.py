@@ -5,6 +5,9 @@ import pandas as pd
 from datetime import datetime
 import os
 
+from name_matcher import NameMatcher, jaccard
+from persian_text import word_set
+
 class PriceComparisonGUI:
     """GUI for comparing prices with Snappfood"""
     
@@ -199,7 +202,8 @@ https://snappfood.ir/restaurant/menu/رستوران-نام
                 # import scraper
                 from restaurant_scrapers import SnappFoodScraper
                 
-                scraper = SnappFoodScraper()
+                # HTTP first, and no images or media if the browser is needed
+                scraper = SnappFoodScraper(fetch_mode='auto', resource_blocking='lean')
                 items = scraper.scrape_menu(url)
                 
                 # update UI in main thread
@@ -307,24 +311,16 @@ https://snappfood.ir/restaurant/menu/رستوران-نام
         
         comparison_results = []
         
-        # comparing with similar name
-        for _, our_food in self.our_foods.iterrows():
-            our_name = str(our_food['name']).lower().strip()
+        # comparing with similar name: index Snappfood names once, score only candidates
+        snap_rows = self.scraped_data.to_dict('records')
+        matcher = NameMatcher(row.get('food_name', '') for row in snap_rows)
+        
+        for our_food in self.our_foods.to_dict('records'):
             our_price = float(our_food['selling_price'])
             
-            # searching for similar food in Snappfood
-            best_match = None
-            best_similarity = 0
-            
-            for _, snap_food in self.scraped_data.iterrows():
-                snap_name = str(snap_food.get('food_name', '')).lower().strip()
-                
-                # calculating simple similarity
-                similarity = self.calculate_similarity(our_name, snap_name)
-                
-                if similarity > best_similarity and similarity > 0.5:  # minimum 50% similarity
-                    best_similarity = similarity
-                    best_match = snap_food
+            # searching for similar food in Snappfood (minimum 50% similarity)
+            match = matcher.best_match(our_food['name'])
+            best_match = snap_rows[match[0]] if match is not None else None
             
             if best_match is not None:
                 snap_price = float(best_match.get('price', 0))
@@ -366,16 +362,7 @@ https://snappfood.ir/restaurant/menu/رستوران-نام
     def calculate_similarity(self, str1: str, str2: str) -> float:
         """calculating similarity of two strings"""
         # الگوریتم ساده: کلمات مشترک
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
+        return jaccard(word_set(str1), word_set(str2))
     
     def generate_report(self, results):
         """creating report"""
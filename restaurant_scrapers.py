@@ -1,5 +1,10 @@
 from scraper import BaseRestaurantScraper
-from typing import List, Dict
+from driver_pool import WebDriverPool
+import http_fetch
+from http_fetch import HttpMenuFetcher
+from scrape_cache import ScrapeCache, fingerprint_cards, fingerprint_items
+import menu_parser
+from typing import List, Dict, Optional
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
@@ -7,13 +12,59 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import re
 import time
+import requests
+
+# menu items on Snappfood pages
+PRODUCT_CARD_SELECTOR = '[data-testid^="ProductCard"]'
+
+# a price written with thousands separators
+_PRICE_TEXT_RE = re.compile(r'(\d{1,3}(?:[,٬]\d{3})*)')
 
 
 class SnappFoodScraper(BaseRestaurantScraper):
     """Scraper for Snappfood using Selenium """
     
-    def __init__(self):
-        super().__init__("SnappFood", "https://snappfood.ir")
+    # 'lxml' parses pages with menu_parser when lxml is installed,
+    # 'bs4' always uses BeautifulSoup
+    html_parser = 'lxml'
+    
+    # the parsers read text only, so callers may pass resource_blocking='lean'
+    # to skip images, media, fonts and trackers; the default loads everything
+    resource_blocking = 'off'
+    
+    # vendor menu JSON used by the HTTP fetch mode ({vendor_code} from the URL)
+    menu_endpoint = (
+        "https://snappfood.ir/mobile/v2/restaurant/details/dynamic"
+        "?optionalClient=WEBSITE&client=WEBSITE&deviceType=WEBSITE&locale=fa"
+        "&vendorCode={vendor_code}"
+    )
+    
+    def __init__(self, pool: Optional[WebDriverPool] = None, fetch_mode: str = 'browser',
+                 http_fetcher: Optional[HttpMenuFetcher] = None,
+                 scrape_cache: Optional[ScrapeCache] = None,
+                 resource_blocking: Optional[str] = None):
+        """
+        Args:
+            pool: Optional WebDriverPool for the browser
+            fetch_mode: 'browser' (the default) always renders the page in
+                        Selenium, 'auto' tries plain HTTP first and falls
+                        back to the browser, 'http' never starts a browser
+            http_fetcher: HttpMenuFetcher to use (shared session by default)
+            scrape_cache: Optional ScrapeCache of the menus seen before
+            resource_blocking: Browser blocking profile ('off', the default,
+                               'media' or 'lean')
+        """
+        super().__init__("SnappFood", "https://snappfood.ir", pool=pool,
+                         resource_blocking=resource_blocking)
+        if fetch_mode not in ('auto', 'http', 'browser'):
+            raise ValueError(f"Unknown fetch mode: {fetch_mode}")
+        self.fetch_mode = fetch_mode
+        self.http_fetcher = http_fetcher
+        self.scrape_cache = scrape_cache
+        # outcome of the last scrape_menu with a cache: False if the menu
+        # was unchanged, and the items added, removed or repriced
+        self.menu_changed = True
+        self.menu_delta: List[Dict] = []
     
     def scrape_menu(self, restaurant_url: str) -> List[Dict]:
         """
@@ -27,6 +78,24 @@ class SnappFoodScraper(BaseRestaurantScraper):
         """
         try:
             print(f"Starting scrape for: {restaurant_url}")
+            self.timings = {}
+            self.menu_changed = True
+            self.menu_delta = []
+            
+            if self.scrape_cache is not None:
+                cached = self.scrape_cache.fresh_items(restaurant_url)
+                if cached is not None:
+                    self.menu_changed = False
+                    print(f"Menu checked recently, {len(cached)} items from cache")
+                    return cached
+            
+            if self.fetch_mode != 'browser':
+                menu_items = self._scrape_http(restaurant_url)
+                if menu_items or self.fetch_mode == 'http':
+                    print(f"\nSuccessfully scraped {len(menu_items)} items over HTTP "
+                          f"{self._format_timings()}")
+                    return menu_items
+                print("No menu data over HTTP, falling back to the browser...")
             
             # waiting for ProductCard
             html = self._try_strategy_1(restaurant_url)
@@ -48,33 +117,11 @@ class SnappFoodScraper(BaseRestaurantScraper):
             print("Page loaded successfully")
             
             # ParsingHTML
-            soup = BeautifulSoup(html, 'html.parser')
-            menu_items = []
+            parse_start = time.perf_counter()
+            menu_items = self.parse_menu_html(html, url=restaurant_url)
             
-            # different strategies for finding food cards
-            food_cards = self._find_food_cards(soup)
-            
-            print(f"Found {len(food_cards)} food cards")
-            
-            if len(food_cards) == 0:
-                print("No food cards found. Saving HTML for debugging...")
-                self._save_debug_html(html)
-                print("HTML saved to snappfood_debug.html")
-                
-                # trying to find any related content to food
-                menu_items = self._extract_from_any_structure(soup)
-            else:
-                # parsing found cards
-                for idx, card in enumerate(food_cards, 1):
-                    try:
-                        item = self._parse_food_card(card, idx)
-                        if item:
-                            menu_items.append(item)
-                    except Exception as e:
-                        print(f"Error parsing card {idx}: {e}")
-                        continue
-            
-            print(f"\nSuccessfully scraped {len(menu_items)} items")
+            self.timings['parse'] = time.perf_counter() - parse_start
+            print(f"\nSuccessfully scraped {len(menu_items)} items {self._format_timings()}")
             return menu_items
             
         except Exception as e:
@@ -86,12 +133,137 @@ class SnappFoodScraper(BaseRestaurantScraper):
         finally:
             self._close_driver()
     
+    def parse_menu_html(self, html: str, fallback: bool = True, save_debug: bool = True,
+                        url: Optional[str] = None) -> List[Dict]:
+        """
+        Menu items from the HTML of a menu page.
+        Without food cards, fallback=True saves the page for debugging
+        (save_debug) and tries to find food in any structure.
+        With a scrape cache and the page's url, cards identical to the
+        cached menu are not parsed again.
+        """
+        soup = None
+        menu_items = []
+        
+        if self.html_parser == 'lxml' and menu_parser.HAVE_LXML:
+            food_cards = menu_parser.find_cards(html)
+            card_markup, card_fields = menu_parser.card_markup, menu_parser.card_fields
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+            # different strategies for finding food cards
+            food_cards = self._find_food_cards(soup)
+            card_markup, card_fields = str, self._card_fields
+        
+        print(f"Found {len(food_cards)} food cards")
+        
+        fingerprint = None
+        if food_cards and self.scrape_cache is not None and url:
+            fingerprint = fingerprint_cards([card_markup(card) for card in food_cards])
+            cached = self.scrape_cache.unchanged_items(url, fingerprint)
+            if cached is not None:
+                self.menu_changed = False
+                print("Menu unchanged since last scrape")
+                return cached
+        
+        if len(food_cards) == 0:
+            if not fallback:
+                return []
+            if save_debug:
+                print("No food cards found. Saving HTML for debugging...")
+                self._save_debug_html(html)
+                print("HTML saved to snappfood_debug.html")
+            
+            # trying to find any related content to food
+            menu_items = self._extract_from_any_structure(soup or BeautifulSoup(html, 'html.parser'))
+        else:
+            # parsing found cards
+            for idx, card in enumerate(food_cards, 1):
+                try:
+                    item = self._parse_food_card(card, idx, card_fields)
+                    if item:
+                        menu_items.append(item)
+                except Exception as e:
+                    print(f"Error parsing card {idx}: {e}")
+                    continue
+        
+        return self._remember(url, menu_items, fingerprint)
+    
+    def _remember(self, url: Optional[str], items: List[Dict],
+                  fingerprint: Optional[str] = None) -> List[Dict]:
+        """Store a scraped menu in the scrape cache and note what changed"""
+        if self.scrape_cache is None or not url or not items:
+            return items
+        delta = self.scrape_cache.update(url, fingerprint or fingerprint_items(items), items)
+        self.menu_changed = delta is not None
+        self.menu_delta = delta or []
+        return items
+    
+    def scrape_file(self, path: str) -> List[Dict]:
+        """Menu items from a saved page (e.g. snappfood_debug.html), no network"""
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        return http_fetch.items_from_html(html, self.name) or self.parse_menu_html(html, save_debug=False)
+    
+    # -------------------------------------------------------
+    # HTTP fetch mode
+    # -------------------------------------------------------
+    @staticmethod
+    def _vendor_code(url: str) -> Optional[str]:
+        """Vendor code at the end of the restaurant slug (".../name-r-p5j2vw/")"""
+        match = re.search(r'-r-([0-9a-zA-Z]+)/?(?:\?|$)', url)
+        return match.group(1) if match else None
+    
+    def menu_json_url(self, url: str) -> Optional[str]:
+        """Vendor menu endpoint of a restaurant page, None if unknown"""
+        vendor_code = self._vendor_code(url)
+        if vendor_code and self.menu_endpoint:
+            return self.menu_endpoint.format(vendor_code=vendor_code)
+        return None
+    
+    def items_from_json(self, data, url: Optional[str] = None) -> List[Dict]:
+        """Menu items of a vendor menu JSON document"""
+        return self._remember(url, http_fetch.items_from_json(data, self.name))
+    
+    def items_from_page(self, html: str, url: Optional[str] = None) -> List[Dict]:
+        """Menu items of served HTML: embedded JSON, then food cards"""
+        items = http_fetch.items_from_html(html, self.name)
+        if items:
+            return self._remember(url, items)
+        return self.parse_menu_html(html, fallback=False, url=url)
+    
+    def _scrape_http(self, url: str) -> List[Dict]:
+        """
+        Menu without a browser: the vendor menu endpoint first, then the
+        JSON embedded in the page, then food cards in the served HTML.
+        """
+        if self.http_fetcher is None:
+            self.http_fetcher = HttpMenuFetcher()
+        fetcher = self.http_fetcher
+        
+        with self._phase('http'):
+            json_url = self.menu_json_url(url)
+            if json_url:
+                try:
+                    items = self.items_from_json(fetcher.get_json(json_url), url)
+                    if items:
+                        return items
+                except (requests.RequestException, ValueError) as e:
+                    print(f"Menu endpoint error: {e}")
+            
+            try:
+                html = fetcher.get_text(url)
+            except requests.RequestException as e:
+                print(f"HTTP fetch error: {e}")
+                return []
+            
+            return self.items_from_page(html, url)
+    
     def _try_strategy_1(self, url: str) -> str:
         """Strategy 1: waiting for ProductCard"""
         try:
             return self.fetch_page(
                 url,
-                wait_for_selector='[data-testid^="ProductCard"]',
+                wait_for_selector=PRODUCT_CARD_SELECTOR,
                 wait_time=30
             )
         except Exception as e:
@@ -106,20 +278,22 @@ class SnappFoodScraper(BaseRestaurantScraper):
             self.driver.get(url)
             
             # waiting for body
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            with self._phase('ready'):
+                WebDriverWait(self.driver, 20).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                self._wait_until_ready(PRODUCT_CARD_SELECTOR)
             
             # scrolling the page
             print("Scrolling page...")
-            self._scroll_page()
-            
-            # additional time for loading
-            time.sleep(5)
+            with self._phase('scroll'):
+                self._scroll_page(PRODUCT_CARD_SELECTOR)
             
+            self._record_page_metrics()
             return self.driver.page_source
             
         except Exception as e:
+            self._mark_driver_error(e)
             print(f"Strategy 2 error: {e}")
             return ""
     
@@ -128,23 +302,23 @@ class SnappFoodScraper(BaseRestaurantScraper):
         try:
             self._init_driver()
             print(f"Loading: {url}")
-            self.driver.get(url)
+            with self._phase('navigate'):
+                self.driver.get(url)
             
-            # just wait a little
-            time.sleep(10)
+            # wait for the page to settle, however long it takes (up to the limit)
+            with self._phase('ready'):
+                self._wait_until_ready(PRODUCT_CARD_SELECTOR, timeout=2 * self.ready_timeout)
             
             # scrolling
             print("Scrolling page")
-            for _ in range(5):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-            
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(2)
+            with self._phase('scroll'):
+                self._scroll_page(PRODUCT_CARD_SELECTOR)
             
+            self._record_page_metrics()
             return self.driver.page_source
             
         except Exception as e:
+            self._mark_driver_error(e)
             print(f"Strategy 3 error: {e}")
             return ""
     
@@ -158,6 +332,8 @@ class SnappFoodScraper(BaseRestaurantScraper):
         if cards:
             print(f" Found {len(cards)} cards with ProductCard testid")
             return cards
+        
+        return []
     
     def _extract_from_any_structure(self, soup: BeautifulSoup) -> List[Dict]:
         """Extracting food from any structure found"""
@@ -179,7 +355,7 @@ class SnappFoodScraper(BaseRestaurantScraper):
                 
                 # extracting price from parent
                 parent_text = parent.get_text()
-                prices = re.findall(r'(\d{1,3}(?:[,٬]\d{3})*)', parent_text)
+                prices = _PRICE_TEXT_RE.findall(parent_text)
                 
                 if not prices:
                     continue
@@ -213,40 +389,52 @@ class SnappFoodScraper(BaseRestaurantScraper):
         except Exception as e:
             print(f"Error saving debug HTML: {e}")
     
-    def _parse_food_card(self, card, index: int) -> Dict:
-        """Parse a single food card element"""
-        
-        # extracting name
-        name = self._extract_name(card)
-        if not name:
+    def _parse_food_card(self, card, index: int, card_fields=None) -> Dict:
+        """
+        Parse a single food card element
+        (card_fields: menu_parser.card_fields for lxml cards)
+        """
+        fields = (card_fields or self._card_fields)(card)
+        if not fields:
             return None
+        name = fields['name']
         
-        # extracting description
-        description = self._extract_description(card)
-        
-        # extracting price
-        prices = self._extract_prices(card)
-        
-        if not prices['final_price']:
+        if not fields['final_price']:
             print(f"[{index}] {name}: No price found, skipping")
             return None
         
-        discount = self._extract_discount(card)
-        stock_info = self._extract_stock(card)
-        
-        print(f"[{index}] {name}: {prices['final_price']:,} تومان {discount}")
+        print(f"[{index}] {name}: {fields['final_price']:,} تومان {fields['discount']}")
         
         return {
             'restaurant': self.name,
             'food_name': name,
-            'description': description,
-            'price': prices['final_price'],
-            'original_price': prices['original_price'],
-            'discount': discount,
-            'stock': stock_info,
+            'description': fields['description'],
+            'price': fields['final_price'],
+            'original_price': fields['original_price'],
+            'discount': fields['discount'],
+            'stock': fields['stock'],
             'scraped_at': pd.Timestamp.now()
         }
     
+    def _card_fields(self, card) -> Optional[Dict]:
+        """Fields of a BeautifulSoup card, as menu_parser.card_fields"""
+        
+        # extracting name
+        name = self._extract_name(card)
+        if not name:
+            return None
+        
+        # the card text is read once for discount and stock
+        card_text = card.get_text()
+        
+        return dict(
+            name=name,
+            description=self._extract_description(card),
+            discount=menu_parser.find_discount(card_text),
+            stock=menu_parser.find_stock(card_text),
+            **self._extract_prices(card)
+        )
+    
     def _extract_name(self, card) -> str:
         """Extract food name from card"""
         # searching with different tags
@@ -277,11 +465,6 @@ class SnappFoodScraper(BaseRestaurantScraper):
     
     def _extract_prices(self, card) -> Dict:
         """Extract prices from card (original and final)"""
-        prices = {
-            'final_price': 0,
-            'original_price': 0
-        }
-        
         # searching with all p and span tags
         price_tags = card.find_all(['p', 'span', 'div'])
         
@@ -292,69 +475,20 @@ class SnappFoodScraper(BaseRestaurantScraper):
             price = self._extract_number(text)
             
             # if the number is greater than 1000, it is probably a price
-            if price >= 1000:
+            if price >= menu_parser.MIN_PRICE:
                 price_candidates.append(price)
         
-        # removing duplicates
-        price_candidates = list(set(price_candidates))
-        price_candidates.sort()
-        
-        if len(price_candidates) == 0:
-            return prices
-        elif len(price_candidates) == 1:
-            prices['final_price'] = price_candidates[0]
-            prices['original_price'] = price_candidates[0]
-        else:
-            # lowest price = final price
-            # highest price = original price (before discount)
-            prices['final_price'] = price_candidates[0]
-            prices['original_price'] = price_candidates[-1]
-        
-        return prices
+        # lowest price = final price
+        # highest price = original price (before discount)
+        return menu_parser.pick_prices(price_candidates)
     
     def _extract_discount(self, card) -> str:
         """Extract discount percentage from card"""
-        # searching in the entire card text
-        card_text = card.get_text()
-        
-        # different discount patterns
-        patterns = [
-            r'(\d+)\s*%',
-            r'٪\s*(\d+)',
-            r'(\d+)\s*٪',
-            r'تخفیف\s*(\d+)',
-            r'discount.*?(\d+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, card_text, re.IGNORECASE)
-            if match:
-                return f"{match.group(1)}%"
-        
-        return "0%"
+        return menu_parser.find_discount(card.get_text())
     
     def _extract_stock(self, card) -> str:
         """Extract stock information from card"""
-        card_text = card.get_text()
-        
-        # stock patterns
-        stock_patterns = [
-            r'موجودی\s*(\d+)',
-            r'(\d+)\s*عدد\s*موجود',
-            r'موجود\s*:\s*(\d+)'
-        ]
-        
-        for pattern in stock_patterns:
-            match = re.search(pattern, card_text)
-            if match:
-                return match.group(1)
-        
-        # checking if the food is unavailable
-        unavailable_keywords = ['ناموجود', 'موجود نیست', 'اتمام', 'تمام شد']
-        if any(keyword in card_text for keyword in unavailable_keywords):
-            return "0"
-        
-        return "نامشخص"
+        return menu_parser.find_stock(card.get_text())
     
     def _extract_number(self, text: str) -> int:
         """
@@ -366,27 +500,4 @@ class SnappFoodScraper(BaseRestaurantScraper):
         Returns:
             Integer number or 0 if not found
         """
-        if not text:
-            return 0
-        
-        # removing all characters except Persian and English numbers
-        clean_text = re.sub(r'[^\d۰-۹]', '', text)
-        
-        # converting Persian numbers to English
-        persian_to_english = str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789')
-        clean_text = clean_text.translate(persian_to_english)
-        
-        try:
-            return int(clean_text) if clean_text else 0
-        except ValueError:
-            return 0
-
-    def _close_driver(self):
-        """Close the Selenium WebDriver"""
-        if self.driver:
-            try:
-                self.driver.quit()
-                self.driver = None
-                print("✅ Selenium WebDriver closed")
-            except Exception as e:
-                print(f"Error closing driver: {e}")
\ No newline at end of file
+        return menu_parser.parse_number(text)
@@ -0,0 +1,186 @@
+"""
+Scrape cache: the last menu seen at every restaurant URL.
+
+Menus change rarely, so a daily re-scrape mostly finds what it found
+yesterday. The cache keeps, per URL, a fingerprint of the raw menu (the
+food cards found on the page, or the menu JSON) with the parsed items
+and timestamps. A scraper with a cache
+- skips the fetch entirely while an entry is younger than ttl,
+- skips parsing when the fetched page has the same fingerprint,
+- otherwise reports what changed (added, removed, price-changed items).
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+def fingerprint_cards(cards) -> str:
+    """Fingerprint of the food cards found on a page (whitespace-insensitive)"""
+    digest = hashlib.sha1()
+    for card in cards:
+        digest.update(" ".join(str(card).split()).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+_ITEM_FIELDS = ('food_name', 'description', 'price', 'original_price', 'discount', 'stock')
+
+
+def fingerprint_items(items: List[Dict]) -> str:
+    """Fingerprint of parsed items, for menus read from JSON"""
+    rows = [[str(item.get(field)) for field in _ITEM_FIELDS] for item in items]
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def menu_delta(old_items: List[Dict], new_items: List[Dict]) -> List[Dict]:
+    """
+    Changes between two menus of a restaurant, matched by food name:
+    rows with 'change' ('added', 'removed' or 'price_changed'),
+    'restaurant', 'food_name', 'price' and 'old_price'.
+    """
+    old = {item['food_name']: item for item in old_items}
+    new = {item['food_name']: item for item in new_items}
+    changes = []
+    for name, item in new.items():
+        before = old.get(name)
+        if before is None:
+            changes.append({'change': 'added', 'restaurant': item.get('restaurant'),
+                            'food_name': name, 'price': item.get('price'), 'old_price': None})
+        elif before.get('price') != item.get('price'):
+            changes.append({'change': 'price_changed', 'restaurant': item.get('restaurant'),
+                            'food_name': name, 'price': item.get('price'),
+                            'old_price': before.get('price')})
+    for name, item in old.items():
+        if name not in new:
+            changes.append({'change': 'removed', 'restaurant': item.get('restaurant'),
+                            'food_name': name, 'price': None, 'old_price': item.get('price')})
+    return changes
+
+
+class ScrapeCache:
+    """
+    Last menu of each URL in an SQLite file, safe to share between the
+    threads of a ThreadedRestaurantScraper.
+    """
+
+    def __init__(self, path: str = "scrape_cache.db", ttl: timedelta = timedelta(hours=12)):
+        """
+        Args:
+            path: SQLite file of the cache (":memory:" for a process-local cache)
+            ttl: Age under which a cached menu is used without fetching the page
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS menus ("
+            "url TEXT PRIMARY KEY, fingerprint TEXT, items TEXT, "
+            "fetched_at TEXT, checked_at TEXT, changed_at TEXT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _load_items(text: str) -> List[Dict]:
+        items = json.loads(text)
+        for item in items:
+            if item.get('scraped_at'):
+                item['scraped_at'] = pd.Timestamp(item['scraped_at'])
+        return items
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Entry of url: fingerprint, items, fetched_at, checked_at, changed_at"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, items, fetched_at, checked_at, changed_at "
+                "FROM menus WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'fingerprint': row[0],
+            'items': self._load_items(row[1]),
+            'fetched_at': datetime.fromisoformat(row[2]),
+            'checked_at': datetime.fromisoformat(row[3]),
+            'changed_at': datetime.fromisoformat(row[4])
+        }
+
+    @staticmethod
+    def _as_of(items: List[Dict], checked_at: datetime) -> List[Dict]:
+        """Cached items stamped with the last time their menu was confirmed"""
+        scraped_at = pd.Timestamp(checked_at)
+        for item in items:
+            item['scraped_at'] = scraped_at
+        return items
+
+    def fresh_items(self, url: str) -> Optional[List[Dict]]:
+        """
+        Cached items of url if it was checked less than ttl ago; their
+        scraped_at is that last check, not the first scrape.
+        """
+        entry = self.get(url)
+        if entry is None or datetime.now() - entry['checked_at'] >= self.ttl:
+            return None
+        return self._as_of(entry['items'], entry['checked_at'])
+
+    def _touch(self, url: str, now: Optional[datetime] = None):
+        now = now or datetime.now()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE menus SET checked_at = ? WHERE url = ?",
+                               (now.isoformat(), url))
+
+    def unchanged_items(self, url: str, fingerprint: str) -> Optional[List[Dict]]:
+        """
+        Cached items of url if its menu still has this fingerprint, with
+        scraped_at set to now (the page was just fetched and matched).
+        """
+        entry = self.get(url)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return None
+        now = datetime.now()
+        self._touch(url, now)
+        return self._as_of(entry['items'], now)
+
+    def update(self, url: str, fingerprint: str, items: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Store the menu just scraped from url.
+
+        Returns:
+            None if the menu is unchanged, else its menu_delta from the
+            cached menu (every item 'added' for a new URL)
+        """
+        entry = self.get(url)
+        now = datetime.now().isoformat()
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            self._touch(url)
+            return None
+
+        delta = menu_delta(entry['items'] if entry else [], items)
+        if entry is not None and not delta and fingerprint_items(entry['items']) == fingerprint_items(items):
+            # same menu in a different markup
+            with self._lock, self._conn:
+                self._conn.execute("UPDATE menus SET fingerprint = ?, checked_at = ? WHERE url = ?",
+                                   (fingerprint, now, url))
+            return None
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO menus VALUES (?, ?, ?, ?, ?, ?)",
+                (url, fingerprint, json.dumps(items, ensure_ascii=False, default=str), now, now, now)
+            )
+        return delta
+
+    def invalidate(self, url: Optional[str] = None):
+        with self._lock, self._conn:
+            if url is None:
+                self._conn.execute("DELETE FROM menus")
+            else:
+                self._conn.execute("DELETE FROM menus WHERE url = ?", (url,))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,190 @@
+"""
+Resumable multi-restaurant scrape jobs.
+
+A job is a JSON manifest next to a directory of per-restaurant CSV
+files. The manifest records for every URL its status (pending, done or
+failed), attempts, timing, item count, last error and output file, and
+is rewritten atomically after each restaurant. Running a job again (or
+after a crash, or after cancel()) only scrapes the URLs that are not
+done yet:
+
+    job = ScrapeJob("menus_job.json", urls)
+    job.run(ThreadedRestaurantScraper(SnappFoodScraper, verbose=False))
+    df = job.load_items()
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ScrapeJob:
+    """Manifest of a multi-restaurant scrape, checkpointed per restaurant"""
+
+    def __init__(
+        self,
+        path: str,
+        urls: Optional[List[str]] = None,
+        output_dir: Optional[str] = None,
+        max_attempts: int = 3
+    ):
+        """
+        Args:
+            path: Manifest file; an existing manifest is resumed
+            urls: URLs of the job, added to an existing manifest as pending
+            output_dir: Directory of the per-restaurant CSV files
+                        (default: "<manifest name>_items" next to it)
+            max_attempts: Failed URLs are retried until this many attempts
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._scraper = None
+        # set by cancel(), also before run() has handed it to a scraper
+        self._cancel = threading.Event()
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.output_dir = manifest['output_dir']
+            self.created_at = manifest['created_at']
+            self.entries: Dict[str, dict] = manifest['urls']
+        else:
+            self.output_dir = output_dir or f"{os.path.splitext(path)[0]}_items"
+            self.created_at = datetime.now().isoformat(timespec='seconds')
+            self.entries = {}
+
+        for url in urls or []:
+            self.entries.setdefault(url, {
+                'status': PENDING,
+                'attempts': 0,
+                'elapsed_time': None,
+                'finished_at': None,
+                'count': 0,
+                'error': None,
+                'output': None
+            })
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._save()
+
+    def _save(self):
+        """Write the manifest to a temp file and swap it in"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': self.created_at,
+                'output_dir': self.output_dir,
+                'urls': self.entries
+            }, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _output_path(self, url: str) -> str:
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.output_dir, f"{name}.csv")
+
+    def pending_urls(self) -> List[str]:
+        """URLs still to scrape: not done and not out of attempts"""
+        return [
+            url for url, entry in self.entries.items()
+            if entry['status'] != DONE and entry['attempts'] < self.max_attempts
+        ]
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending_urls()
+
+    def record(self, result: Dict):
+        """Store the result of one restaurant and checkpoint the manifest"""
+        url = result['url']
+        output = None
+        if result['success'] and result['items']:
+            output = self._output_path(url)
+            tmp_path = f"{output}.tmp"
+            pd.DataFrame(result['items']).to_csv(tmp_path, index=False, encoding='utf-8-sig')
+            os.replace(tmp_path, output)
+
+        with self._lock:
+            entry = self.entries[url]
+            entry['attempts'] += 1
+            entry['elapsed_time'] = round(result['elapsed_time'], 3)
+            entry['finished_at'] = datetime.now().isoformat(timespec='seconds')
+            if result['success']:
+                entry.update(status=DONE, count=result['count'], error=None, output=output)
+            else:
+                entry.update(status=FAILED, error=result['error'])
+            self._save()
+
+    def run(
+        self,
+        scraper,
+        progress_callback: Optional[Callable] = None,
+        on_result: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Scrape the pending URLs with a ThreadedRestaurantScraper (or
+        AsyncRestaurantScraper), checkpointing after every restaurant.
+        progress_callback(current, total, items_count) counts this run only;
+        on_result(result) gets each restaurant's result once it is recorded.
+
+        Returns:
+            summary() after the run
+        """
+        urls = self.pending_urls()
+        self._scraper = scraper
+        try:
+            # cancel() from now on reaches the scraper; one that came
+            # earlier stops the job before any restaurant is started
+            if self._cancel.is_set():
+                return self.summary()
+            for completed_count, result in enumerate(scraper.iter_results(urls), 1):
+                self.record(result)
+                if on_result:
+                    on_result(result)
+                if progress_callback:
+                    progress_callback(completed_count, len(urls), result['count'])
+        finally:
+            self._scraper = None
+            # the job can be resumed after a cancelled run
+            self._cancel.clear()
+        return self.summary()
+
+    def cancel(self):
+        """
+        Stop the running job after the pages in flight; run() resumes it.
+        A job cancelled before run() reaches the scraper stops without
+        starting any restaurant.
+        """
+        self._cancel.set()
+        scraper = self._scraper
+        if scraper is not None:
+            scraper.cancel()
+
+    def summary(self) -> Dict:
+        statuses = [entry['status'] for entry in self.entries.values()]
+        return {
+            'total': len(statuses),
+            'done': statuses.count(DONE),
+            'failed': statuses.count(FAILED),
+            'pending': statuses.count(PENDING),
+            'items': sum(entry['count'] for entry in self.entries.values()),
+            'remaining': len(self.pending_urls())
+        }
+
+    def load_items(self) -> pd.DataFrame:
+        """Items of all finished restaurants, in job order"""
+        frames = [
+            pd.read_csv(entry['output'], encoding='utf-8-sig')
+            for entry in self.entries.values()
+            if entry['status'] == DONE and entry['output'] and entry['count']
+        ]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,147 @@
+"""
+Incremental outputs for scraped menu items.
+
+ThreadedRestaurantScraper.scrape_to() hands each restaurant's items to
+the sinks as soon as that restaurant is done, so items are on disk while
+the run continues and memory stays bounded by one restaurant's menu
+(or one Parquet row group) whatever the number of URLs.
+
+    with CSVSink("menus.csv") as csv_sink, SQLiteSink("menus.db") as db_sink:
+        scraper.scrape_to(urls, [csv_sink, db_sink])
+"""
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+class ResultSink(ABC):
+    """Receives the items of one restaurant at a time"""
+
+    @abstractmethod
+    def write(self, items: List[Dict]):
+        """Store one restaurant's items"""
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class CSVSink(ResultSink):
+    """
+    Appends items to a CSV file, flushed after every restaurant.
+    The columns are fixed by the first batch (or the existing file when
+    appending); later batches are aligned to them. Without append an
+    existing file is replaced by the first non-empty batch, so a run
+    that fails or finds nothing leaves the previous results in place.
+    """
+
+    def __init__(self, path: str, append: bool = False, encoding: str = 'utf-8-sig'):
+        self.path = path
+        self.encoding = encoding
+        self.columns: Optional[List[str]] = None
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            self.columns = list(pd.read_csv(path, nrows=0, encoding=encoding).columns)
+        # mode of the next open: the first batch truncates unless appending
+        self._mode = 'a' if append else 'w'
+        self.rows = 0
+
+    def write(self, items: List[Dict]):
+        if not items:
+            return
+        df = pd.DataFrame(items)
+        header = self.columns is None
+        if header:
+            self.columns = list(df.columns)
+        else:
+            df = df.reindex(columns=self.columns)
+        # the BOM is written once, at the start of the file
+        encoding = self.encoding if header else self.encoding.replace('-sig', '')
+        with open(self.path, self._mode, encoding=encoding, newline='') as f:
+            df.to_csv(f, index=False, header=header)
+        self._mode = 'a'
+        self.rows += len(df)
+
+
+class SQLiteSink(ResultSink):
+    """Inserts items into a table of an SQLite database, committed per restaurant"""
+
+    def __init__(self, path: str, table: str = 'scraped_items', replace: bool = False):
+        self.path = path
+        self.table = table
+        self.conn = sqlite3.connect(path)
+        if replace:
+            self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.conn.commit()
+        self.rows = 0
+
+    def write(self, items: List[Dict]):
+        if not items:
+            return
+        df = pd.DataFrame(items)
+        if 'scraped_at' in df.columns:
+            df['scraped_at'] = df['scraped_at'].astype(str)
+        with self.conn:
+            df.to_sql(self.table, self.conn, if_exists='append', index=False)
+        self.rows += len(df)
+
+    def close(self):
+        self.conn.close()
+
+
+class ParquetSink(ResultSink):
+    """
+    Writes items to a Parquet file in row groups of row_group_size rows.
+    The schema is taken from the first row group. Requires pyarrow.
+    """
+
+    def __init__(self, path: str, row_group_size: int = 10000):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError("ParquetSink requires pyarrow (pip install pyarrow)") from e
+        self.path = path
+        self.row_group_size = row_group_size
+        self._buffer: List[Dict] = []
+        self._writer = None
+        self._schema = None
+        self.rows = 0
+
+    def write(self, items: List[Dict]):
+        self._buffer.extend(items)
+        while len(self._buffer) >= self.row_group_size:
+            self._write_group(self._buffer[:self.row_group_size])
+            del self._buffer[:self.row_group_size]
+
+    def _write_group(self, items: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame(items)
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            df = df.reindex(columns=self._schema.names)
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._buffer:
+            self._write_group(self._buffer)
+            self._buffer = []
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
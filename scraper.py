@@ -1,67 +1,128 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_pool import (
+    WebDriverPool, apply_resource_blocking, blocked_url_patterns, create_chrome_driver
+)
 import time
 
 
+# Snapshot used to detect when a page has finished loading. Installs a
+# MutationObserver on first use (again after each navigation) that stamps
+# the time of the latest DOM change.
+_PAGE_STATE_JS = """
+if (!window.__scraperObserver && document.documentElement) {
+    window.__lastMutation = performance.now();
+    window.__scraperObserver = new MutationObserver(function () {
+        window.__lastMutation = performance.now();
+    });
+    window.__scraperObserver.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+var selector = arguments[0];
+return {
+    readyState: document.readyState,
+    idleMs: performance.now() - (window.__lastMutation || 0),
+    resources: performance.getEntriesByType('resource').length,
+    cards: selector ? document.querySelectorAll(selector).length : 0,
+    height: document.body ? document.body.scrollHeight : 0
+};
+"""
+
+# Load time and bytes transferred of the current page (resource timing)
+_PAGE_METRICS_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var bytes = nav ? (nav.transferSize || 0) : 0;
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || 0;
+}
+return {
+    transferBytes: bytes,
+    resources: resources.length,
+    domContentLoadedMs: nav ? nav.domContentLoadedEventEnd : null,
+    loadMs: nav ? nav.loadEventEnd : null
+};
+"""
+
+
 class BaseRestaurantScraper(ABC):
     """Base class for restaurant scrapers using Selenium"""
     
-    def __init__(self, name: str, base_url: str):
+    # upper bound (seconds) on waiting for a page to settle
+    ready_timeout = 15.0
+    # a page is ready once nothing changed for this long
+    quiet_period = 0.5
+    poll_interval = 0.1
+    max_scrolls = 30
+    # requests the browser skips, see driver_pool.RESOURCE_BLOCKING_PROFILES
+    resource_blocking = 'off'
+    
+    def __init__(self, name: str, base_url: str, pool: Optional[WebDriverPool] = None,
+                 resource_blocking: Optional[str] = None):
+        """
+        Args:
+            name: Restaurant platform name
+            base_url: Platform home page
+            pool: Optional WebDriverPool to borrow warm drivers from;
+                  without it every scraper starts its own Chrome
+            resource_blocking: Blocking profile ('off', 'media', 'lean');
+                               default: the class's resource_blocking
+        """
         self.name = name
         self.base_url = base_url
+        self.pool = pool
         self.driver = None
+        self._driver_broken = False
+        if resource_blocking is not None:
+            blocked_url_patterns(resource_blocking)
+            self.resource_blocking = resource_blocking
+        # seconds spent per phase (navigate, ready, scroll, parse) of the
+        # current scrape; scrape_menu implementations reset it
+        self.timings: Dict[str, float] = {}
+        # load time and bytes of the last page loaded in the browser
+        self.page_metrics: Dict[str, float] = {}
     
     def _init_driver(self):
-        """Initialize Selenium WebDriver"""
+        """Initialize Selenium WebDriver (or borrow one from the pool)"""
         if self.driver:
             return
         
-        chrome_options = Options()
-        
-        # Headless mode 
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
+        self._driver_broken = False
+        if self.pool is not None:
+            self.driver = self.pool.acquire()
+        else:
+            # install and initialize ChromeDriver automatically
+            self.driver = create_chrome_driver()
+            print("✅ Selenium WebDriver initialized")
         
-        # to prevent being detected as a bot
-        chrome_options.add_argument(
-            'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) '
-            'Chrome/120.0.0.0 Safari/537.36'
-        )
-        
-        # additional settings
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # install and initialize ChromeDriver automatically
-        service = Service(ChromeDriverManager().install())
-        
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # hide webdriver feature
-        self.driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        )
-        
-        print("✅ Selenium WebDriver initialized")
+        # pooled drivers keep the profile of their previous borrower
+        apply_resource_blocking(self.driver, self.resource_blocking)
     
     def _close_driver(self):
-        """Close Selenium WebDriver"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        """Close Selenium WebDriver (or return it to the pool)"""
+        if not self.driver:
+            return
+        driver, self.driver = self.driver, None
+        if self.pool is not None:
+            self.pool.release(driver, broken=self._driver_broken)
+            return
+        try:
+            driver.quit()
             print("✅ Selenium WebDriver closed")
+        except Exception as e:
+            print(f"Error closing driver: {e}")
+    
+    def _mark_driver_error(self, error: Exception):
+        """Flag the driver for replacement when the browser itself failed"""
+        if isinstance(error, WebDriverException) and not isinstance(error, TimeoutException):
+            self._driver_broken = True
     
     @abstractmethod
     def scrape_menu(self, restaurant_url: str) -> List[Dict]:
@@ -84,40 +145,115 @@ class BaseRestaurantScraper(ABC):
             self._init_driver()
             
             print(f"🔄 Loading: {url}")
-            self.driver.get(url)
+            with self._phase('navigate'):
+                self.driver.get(url)
             
             # wait for specific element to load (if specified)
-            if wait_for_selector:
-                print(f"⏳ Waiting for element: {wait_for_selector}")
-                WebDriverWait(self.driver, wait_time).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
-                )
-            else:
-                # wait for page to load
-                time.sleep(3)
+            with self._phase('ready'):
+                if wait_for_selector:
+                    print(f"⏳ Waiting for element: {wait_for_selector}")
+                    WebDriverWait(self.driver, wait_time).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_selector))
+                    )
+                # wait until the page stops changing
+                self._wait_until_ready(wait_for_selector)
             
-            # scroll to load lazy-loaded images
-            self._scroll_page()
+            # scroll to load lazy-loaded content
+            with self._phase('scroll'):
+                self._scroll_page(wait_for_selector)
             
+            self._record_page_metrics()
             html = self.driver.page_source
-            print("✅ Page loaded successfully")
+            print(f"✅ Page loaded successfully {self._format_timings()}")
             
             return html
             
         except Exception as e:
+            self._mark_driver_error(e)
             print(f"Error fetching {url}: {e}")
             return ""
     
-    def _scroll_page(self):
+    @contextmanager
+    def _phase(self, name: str):
+        """Add the duration of a with block to self.timings[name]"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+    
+    def _format_timings(self) -> str:
+        return "(" + ", ".join(f"{k} {v:.2f}s" for k, v in self.timings.items()) + ")"
+    
+    def _record_page_metrics(self):
+        """Store load time and transferred bytes of the current page in page_metrics"""
+        try:
+            metrics = self.driver.execute_script(_PAGE_METRICS_JS)
+        except Exception:
+            metrics = None
+        if not isinstance(metrics, dict):
+            self.page_metrics = {}
+            return
+        self.page_metrics = {
+            'transfer_kb': (metrics.get('transferBytes') or 0) / 1024,
+            'resources': metrics.get('resources') or 0,
+            'dom_ready_s': (metrics.get('domContentLoadedMs') or 0) / 1000,
+            'load_s': (metrics.get('loadMs') or 0) / 1000
+        }
+    
+    def _page_state(self, selector: Optional[str] = None) -> Optional[dict]:
+        """One snapshot of the page, see _PAGE_STATE_JS"""
+        state = self.driver.execute_script(_PAGE_STATE_JS, selector)
+        return state if isinstance(state, dict) else None
+    
+    def _wait_until_ready(self, selector: Optional[str] = None,
+                          timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the page is quiet: document loaded, no DOM mutation for
+        quiet_period seconds, and the number of loaded resources, matching
+        cards (selector) and page height unchanged over that time.
+        Gives up after timeout (default ready_timeout) seconds.
+        Returns True if the page settled before the deadline.
+        """
+        timeout = self.ready_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        last_signature = None
+        stable_since = time.monotonic()
+        
+        while True:
+            state = self._page_state(selector)
+            if state is None:
+                # driver cannot report page state, nothing to wait for
+                return True
+            
+            now = time.monotonic()
+            signature = (state.get('resources'), state.get('cards'), state.get('height'))
+            if signature != last_signature:
+                last_signature = signature
+                stable_since = now
+            
+            quiet = (
+                state.get('readyState') == 'complete' and
+                state.get('idleMs', 0) >= self.quiet_period * 1000 and
+                now - stable_since >= self.quiet_period
+            )
+            if quiet:
+                return True
+            if now >= deadline:
+                print(f"⚠️ Page still changing after {timeout:.0f}s, continuing")
+                return False
+            time.sleep(min(self.poll_interval, max(deadline - now, 0)))
+    
+    def _scroll_page(self, selector: Optional[str] = None):
         """Scroll page to load lazy-loaded content"""
         try:
             # scroll gradually to the bottom of the page
             last_height = self.driver.execute_script("return document.body.scrollHeight")
             
-            while True:
-                # scroll to the bottom
+            for _ in range(self.max_scrolls):
+                # scroll to the bottom and wait for what it triggers to settle
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
+                self._wait_until_ready(selector)
                 
                 # calculate new height
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -130,7 +266,6 @@ class BaseRestaurantScraper(ABC):
             
             # scroll to the top
             self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.5)
             
         except Exception as e:
             print(f"Scroll error (non-critical): {e}")
@@ -0,0 +1,169 @@
+"""
+Full-text index over the searchable columns of the foods table.
+
+Words of name, ingredients and description are normalized with
+persian_text and mapped to the foods containing them. The word list is
+kept sorted, so a query word matches every indexed word it is a prefix
+of by a binary search instead of a scan of the catalog. Results are
+ranked by the fields that matched (name over ingredients over
+description, whole words over prefixes).
+
+Like TableCache, SearchIndexCache remembers the version token of the
+table each index was built from; Database patches an index in place
+when it writes foods itself and any other change triggers a rebuild.
+"""
+import threading
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Hashable, List, Optional
+
+import pandas as pd
+
+from persian_text import tokenize
+
+
+class FoodSearchIndex:
+    """Inverted index: normalized word -> {food_id: weight}"""
+
+    FIELD_WEIGHTS = {'name': 3.0, 'ingredients': 2.0, 'description': 1.0}
+    # a prefix hit counts for less than the whole word
+    PREFIX_FACTOR = 0.5
+    # extra score when the query is exactly the food's name
+    NAME_MATCH_BONUS = 10.0
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []
+        self._docs: Dict[str, dict] = {}
+        self._order: Dict[str, int] = {}
+        if df is not None and not df.empty:
+            columns = ['food_id'] + [f for f in self.FIELD_WEIGHTS if f in df.columns]
+            for row in df[columns].to_dict('records'):
+                self.add(row['food_id'], row)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _weights(self, doc: dict) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = doc.get(field)
+            if value is None or pd.isna(value):
+                continue
+            for token in set(tokenize(value)):
+                weights[token] = weights.get(token, 0.0) + weight
+        return weights
+
+    def add(self, food_id: str, fields: dict):
+        """Index a food (replacing its previous entry)"""
+        if food_id in self._docs:
+            self.remove(food_id)
+        else:
+            self._order[food_id] = len(self._order)
+        doc = {field: fields.get(field) for field in self.FIELD_WEIGHTS}
+        self._docs[food_id] = doc
+        for token, weight in self._weights(doc).items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                insort(self._terms, token)
+            posting[food_id] = weight
+
+    def remove(self, food_id: str):
+        doc = self._docs.pop(food_id, None)
+        if doc is None:
+            return
+        for token in self._weights(doc):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(food_id, None)
+            if not posting:
+                del self._postings[token]
+                del self._terms[bisect_left(self._terms, token)]
+
+    def update(self, food_id: str, fields: dict):
+        """Re-index a food after some of its columns changed"""
+        doc = self._docs.get(food_id)
+        if doc is None or not any(field in fields for field in self.FIELD_WEIGHTS):
+            return
+        merged = dict(doc)
+        merged.update({f: v for f, v in fields.items() if f in self.FIELD_WEIGHTS})
+        self.add(food_id, merged)
+
+    def _term_scores(self, term: str) -> Dict[str, float]:
+        scores: Dict[str, float] = {}
+        i = bisect_left(self._terms, term)
+        while i < len(self._terms) and self._terms[i].startswith(term):
+            word = self._terms[i]
+            factor = 1.0 if word == term else self.PREFIX_FACTOR
+            for food_id, weight in self._postings[word].items():
+                score = weight * factor
+                if score > scores.get(food_id, 0.0):
+                    scores[food_id] = score
+            i += 1
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Ids of the foods matching every word of query (each word as a
+        whole word or a prefix), best first; ties keep catalog order.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores: Optional[Dict[str, float]] = None
+        for term in dict.fromkeys(terms):
+            term_scores = self._term_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {fid: s + term_scores[fid] for fid, s in scores.items() if fid in term_scores}
+            if not scores:
+                return []
+
+        for food_id in scores:
+            name = self._docs[food_id]['name']
+            if name is not None and not pd.isna(name) and tokenize(name) == terms:
+                scores[food_id] += self.NAME_MATCH_BONUS
+
+        ranked = sorted(scores, key=lambda fid: (-scores[fid], self._order[fid]))
+        return ranked[:limit] if limit is not None else ranked
+
+
+class SearchIndexCache:
+    """Search indexes of loaded foods tables, checked against version tokens"""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, tuple] = {}
+        self._lock = threading.RLock()
+        self.builds = 0
+
+    def get(self, key: Hashable, token, loader: Callable[[], pd.DataFrame]) -> FoodSearchIndex:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and token is not None and entry[0] == token:
+                return entry[1]
+        # built outside the lock, the loader may take the table's file lock
+        index = FoodSearchIndex(loader())
+        with self._lock:
+            self.builds += 1
+            self._entries[key] = (token, index)
+        return index
+
+    def apply(self, key: Hashable, old_token, new_token, change: Callable[[FoodSearchIndex], None]):
+        """Patch the index written through, or drop it if it missed a change"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if old_token is None or entry[0] != old_token:
+                del self._entries[key]
+                return
+            change(entry[1])
+            self._entries[key] = (new_token, entry[1])
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            for key in list(self._entries):
+                if path is None or key == path:
+                    del self._entries[key]
@@ -0,0 +1,610 @@
+"""
+Storage backends for the Database layer.
+
+Database talks to its tables through a small StorageBackend interface
+so the same service code can run on the original CSV files or on an
+indexed SQLite file.
+"""
+import csv
+import functools
+import io
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from file_lock import file_lock
+
+
+# -------------------------------------------------------
+# Table Schemas
+# -------------------------------------------------------
+# column name -> SQLite type, in file order
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'users': {
+        'user_id': 'TEXT', 'role': 'TEXT', 'first_name': 'TEXT', 'last_name': 'TEXT',
+        'email': 'TEXT', 'password': 'TEXT', 'phone': 'TEXT', 'national_code': 'TEXT',
+        'address': 'TEXT', 'personnel_id': 'TEXT', 'loyalty_points': 'INTEGER',
+        'failed_attempts': 'INTEGER', 'is_locked': 'BOOLEAN'
+    },
+    'foods': {
+        'food_id': 'TEXT', 'restaurant_id': 'TEXT', 'name': 'TEXT', 'category': 'TEXT',
+        'selling_price': 'REAL', 'cost_price': 'REAL', 'ingredients': 'TEXT',
+        'description': 'TEXT', 'stock': 'INTEGER', 'available_dates': 'TEXT'
+    },
+    'orders': {
+        'order_id': 'TEXT', 'restaurant_id': 'TEXT', 'customer_id': 'TEXT',
+        'order_date': 'TEXT', 'delivery_date': 'TEXT', 'status': 'TEXT',
+        'total_amount': 'REAL', 'discount_amount': 'REAL',
+        'payment_method': 'TEXT', 'discount_code': 'TEXT'
+    },
+    'order_items': {
+        'order_id': 'TEXT', 'food_id': 'TEXT', 'quantity': 'INTEGER', 'unit_price': 'REAL'
+    },
+    'reviews': {
+        'review_id': 'TEXT', 'customer_id': 'TEXT', 'order_id': 'TEXT',
+        'rating': 'INTEGER', 'comment': 'TEXT', 'review_date': 'TEXT'
+    },
+    'discount_codes': {
+        'code': 'TEXT', 'discount_percentage': 'REAL', 'expiry_date': 'TEXT',
+        'is_used': 'BOOLEAN', 'customer_id': 'TEXT'
+    }
+}
+
+# columns that get a SQLite index (point lookups used by Database)
+TABLE_INDEXES: Dict[str, List[str]] = {
+    'users': ['user_id', 'email', 'personnel_id'],
+    'foods': ['food_id'],
+    'orders': ['order_id', 'customer_id'],
+    'order_items': ['order_id'],
+    'reviews': ['order_id', 'customer_id'],
+    'discount_codes': ['code']
+}
+
+
+class StorageBackend(ABC):
+    """Interface every storage engine behind Database must implement"""
+
+    @abstractmethod
+    def ensure_table(self, table: str):
+        """Create the table (with its schema columns) if it does not exist"""
+        pass
+
+    @abstractmethod
+    def read_table(self, table: str, dtype=None) -> pd.DataFrame:
+        """Return the whole table as a DataFrame"""
+        pass
+
+    @abstractmethod
+    def write_table(self, table: str, df: pd.DataFrame):
+        """Replace the whole table with the given DataFrame"""
+        pass
+
+    @abstractmethod
+    def append_rows(self, table: str, rows: List[dict]):
+        """Insert new rows at the end of the table"""
+        pass
+
+    @abstractmethod
+    def find_rows(self, table: str, column: str, value, dtype=None) -> pd.DataFrame:
+        """Return all rows where column == value"""
+        pass
+
+    @abstractmethod
+    def update_rows(self, table: str, column: str, value, fields: dict) -> int:
+        """Set fields on the first row where column == value, return rows updated"""
+        pass
+
+    @abstractmethod
+    def update_many(self, table: str, column: str, updates: Dict[object, dict]) -> int:
+        """Apply {key value: fields} updates in a single write, return rows updated"""
+        pass
+
+    @abstractmethod
+    def delete_rows(self, table: str, column: str, value) -> int:
+        """Delete all rows where column == value, return rows deleted"""
+        pass
+
+    @abstractmethod
+    def table_path(self, table: str) -> str:
+        """File that holds the table on disk"""
+        pass
+
+    @abstractmethod
+    def version_token(self, table: str):
+        """Value that changes whenever the table changes (used by the table cache)"""
+        pass
+
+    @abstractmethod
+    def lock(self, table: str):
+        """Cross-process exclusive lock of the table (reentrant context manager)"""
+        pass
+
+    @property
+    def supports_point_lookups(self) -> bool:
+        """True if find_rows is cheaper than scanning a cached copy of the table"""
+        return False
+
+    def compact(self, table: str):
+        """Fold any pending update log into the table (no-op by default)"""
+        pass
+
+    def parse_rows(self, table: str, rows: List[dict], dtype=None) -> pd.DataFrame:
+        """New rows shaped the way read_table would return them"""
+        return pd.DataFrame(rows)
+
+    def find_rows_in(self, table: str, column: str, values, dtype=None) -> pd.DataFrame:
+        """Return all rows where column is one of values"""
+        df = self.read_table(table, dtype=dtype)
+        return df[df[column].isin(list(values))]
+
+
+# -------------------------------------------------------
+# CSV Backend (one file per table)
+# -------------------------------------------------------
+# insert-mostly tables: new rows are appended, updates go to a journal
+APPEND_ONLY_TABLES = ('orders', 'order_items', 'reviews', 'discount_codes')
+
+
+def _locked(method):
+    """Run a backend method while holding the lock of its table argument"""
+    @functools.wraps(method)
+    def wrapper(self, table, *args, **kwargs):
+        with self.lock(table):
+            return method(self, table, *args, **kwargs)
+    return wrapper
+
+
+class CSVBackend(StorageBackend):
+    """
+    Every table is a CSV file.
+    Tables in APPEND_ONLY_TABLES only get their new rows written at the end
+    of the file. Their rare updates (order status, used discount codes) are
+    appended to a "<table>.csv.journal" file of JSON lines that readers
+    replay, and compact() folds the journal back into the CSV.
+
+    Reads and writes hold "<table>.csv.lock", and every write bumps the
+    counter in "<table>.csv.version" so other processes notice changes
+    even when the file size and mtime look the same.
+    """
+
+    def __init__(self, data_dir: str = ".", compact_threshold: int = 100):
+        self.data_dir = data_dir
+        # journal entries allowed before an update triggers compaction
+        self.compact_threshold = compact_threshold
+
+    def table_path(self, table: str) -> str:
+        return os.path.join(self.data_dir, f"{table}.csv")
+
+    def journal_path(self, table: str) -> str:
+        return self.table_path(table) + ".journal"
+
+    def lock(self, table: str):
+        return file_lock(self.table_path(table) + ".lock")
+
+    def _version_path(self, table: str) -> str:
+        return self.table_path(table) + ".version"
+
+    def _read_version(self, table: str) -> int:
+        try:
+            with open(self._version_path(table), encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_version(self, table: str):
+        """Called with the table lock held after every write"""
+        with open(self._version_path(table), 'w', encoding='utf-8') as f:
+            f.write(str(self._read_version(table) + 1))
+
+    def version_token(self, table: str):
+        token = []
+        for path in (self.table_path(table), self.journal_path(table)):
+            try:
+                st = os.stat(path)
+                token.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                token.append(None)
+        if token[0] is None:
+            return None
+        token.append(self._read_version(table))
+        return tuple(token)
+
+    @_locked
+    def ensure_table(self, table: str):
+        path = self.table_path(table)
+        if not os.path.exists(path):
+            cols = list(TABLE_SCHEMAS[table].keys())
+            pd.DataFrame(columns=cols).to_csv(path, index=False)
+
+    # ---------------- journal helpers ----------------
+    def _read_journal(self, table: str) -> List[dict]:
+        path = self.journal_path(table)
+        if table not in APPEND_ONLY_TABLES or not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+        return entries
+
+    def _apply_journal(self, df: pd.DataFrame, entries: List[dict]) -> pd.DataFrame:
+        """Replay journaled updates on the first row matching each key"""
+        first_rows: Dict[str, dict] = {}
+        for entry in entries:
+            column = entry['column']
+            if column not in df.columns:
+                continue
+            if column not in first_rows:
+                unique = df[column].drop_duplicates(keep='first')
+                first_rows[column] = dict(zip(unique.values, unique.index))
+            index = first_rows[column].get(entry['value'])
+            if index is None:
+                continue
+            for field, new_value in entry['fields'].items():
+                if field in df.columns:
+                    df.at[index, field] = new_value
+        return df
+
+    def _append_journal(self, table: str, column: str, value, fields: dict):
+        entry = {'column': column, 'value': value, 'fields': fields}
+        with open(self.journal_path(table), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._bump_version(table)
+
+    def _write_csv(self, table: str, df: pd.DataFrame):
+        """Write to a temp file and swap it in, readers never see half a file"""
+        path = self.table_path(table)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._bump_version(table)
+
+    def parse_rows(self, table: str, rows: List[dict], dtype=None) -> pd.DataFrame:
+        # round-trip through CSV text so types match what read_csv infers
+        buffer = io.StringIO()
+        pd.DataFrame(rows).to_csv(buffer, index=False)
+        buffer.seek(0)
+        return pd.read_csv(buffer, dtype=dtype)
+
+    def _read_header(self, path: str) -> List[str]:
+        with open(path, newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+
+    @_locked
+    def compact(self, table: str):
+        """Rewrite the CSV with all journaled updates applied and drop the journal"""
+        if self._read_journal(table):
+            self.write_table(table, self.read_table(table))
+
+    # ---------------- table operations ----------------
+    @_locked
+    def read_table(self, table: str, dtype=None) -> pd.DataFrame:
+        path = self.table_path(table)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return pd.DataFrame(columns=list(TABLE_SCHEMAS[table].keys()))
+        df = pd.read_csv(path, dtype=dtype)
+        entries = self._read_journal(table)
+        return self._apply_journal(df, entries) if entries else df
+
+    @_locked
+    def write_table(self, table: str, df: pd.DataFrame):
+        self._write_csv(table, df)
+        # the rewritten file already contains every journaled update
+        if table in APPEND_ONLY_TABLES and os.path.exists(self.journal_path(table)):
+            os.remove(self.journal_path(table))
+
+    @_locked
+    def append_rows(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        path = self.table_path(table)
+        header = []
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header = self._read_header(path)
+
+        new_columns = {key for row in rows for key in row}
+        if table not in APPEND_ONLY_TABLES or not header or not new_columns <= set(header):
+            # new file or new columns: rewrite the whole table with a fresh header
+            df = self.read_table(table)
+            new_rows = pd.DataFrame(rows)
+            if df.empty:
+                # keep the schema's column order without concatenating an empty frame
+                columns = list(df.columns) + [c for c in new_rows.columns if c not in df.columns]
+                self.write_table(table, new_rows.reindex(columns=columns))
+            else:
+                self.write_table(table, pd.concat([df, new_rows], ignore_index=True))
+            return
+
+        with open(path, 'rb+') as f:
+            # make sure the last existing line is terminated
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            if needs_newline:
+                f.write(os.linesep)
+            pd.DataFrame(rows, columns=header).to_csv(f, header=False, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        self._bump_version(table)
+
+    @_locked
+    def find_rows(self, table: str, column: str, value, dtype=None) -> pd.DataFrame:
+        df = self.read_table(table, dtype=dtype)
+        return df[df[column] == value]
+
+    @_locked
+    def update_rows(self, table: str, column: str, value, fields: dict) -> int:
+        df = self.read_table(table)
+        index = df[df[column] == value].index
+        if len(index) == 0:
+            return 0
+        if table in APPEND_ONLY_TABLES:
+            fields = {k: v for k, v in fields.items() if k in df.columns}
+            self._append_journal(table, column, value, fields)
+            if len(self._read_journal(table)) >= self.compact_threshold:
+                self.compact(table)
+            return 1
+        for field, new_value in fields.items():
+            if field in df.columns:
+                df.at[index[0], field] = new_value
+        self.write_table(table, df)
+        return 1
+
+    @_locked
+    def update_many(self, table: str, column: str, updates: Dict[object, dict]) -> int:
+        if table in APPEND_ONLY_TABLES:
+            return sum(self.update_rows(table, column, key, fields)
+                       for key, fields in updates.items())
+        df = self.read_table(table)
+        unique = df[column].drop_duplicates(keep='first')
+        first_rows = dict(zip(unique.values, unique.index))
+        updated = 0
+        for key, fields in updates.items():
+            index = first_rows.get(key)
+            if index is None:
+                continue
+            for field, new_value in fields.items():
+                if field in df.columns:
+                    df.at[index, field] = new_value
+            updated += 1
+        if updated:
+            self.write_table(table, df)
+        return updated
+
+    @_locked
+    def delete_rows(self, table: str, column: str, value) -> int:
+        df = self.read_table(table)
+        keep = df[df[column] != value]
+        deleted = len(df) - len(keep)
+        if deleted:
+            self.write_table(table, keep)
+        return deleted
+
+
+# -------------------------------------------------------
+# SQLite Backend (single file, indexed)
+# -------------------------------------------------------
+class SQLiteBackend(StorageBackend):
+    """All tables in one SQLite file with indexes on the lookup columns"""
+
+    def __init__(self, db_path: str = "food_delivery.db"):
+        self.db_path = db_path
+        # GUI callbacks and scraper threads share one Database object
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        # own commits do not change PRAGMA data_version, so count them here
+        self._local_writes: Dict[str, int] = {}
+
+    def table_path(self, table: str) -> str:
+        return self.db_path
+
+    def lock(self, table: str):
+        # SQLite keeps single statements atomic; this lock spans read-modify-write
+        return file_lock(f"{self.db_path}.{table}.lock")
+
+    def version_token(self, table: str):
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._local_writes.get(table, 0))
+
+    @property
+    def supports_point_lookups(self) -> bool:
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def ensure_table(self, table: str):
+        schema = TABLE_SCHEMAS[table]
+        cols = ", ".join(f'"{name}" {sql_type}' for name, sql_type in schema.items())
+        with self._lock, self._conn:
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({cols})')
+            for column in TABLE_INDEXES.get(table, []):
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table}_{column}" '
+                    f'ON "{table}" ("{column}")'
+                )
+
+    def _to_sql_value(self, value):
+        """Convert pandas/numpy scalars into something sqlite3 can bind"""
+        if isinstance(value, (list, dict)):
+            return str(value)
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        if hasattr(value, 'item'):
+            return value.item()
+        return value
+
+    def _from_sql(self, table: str, df: pd.DataFrame, dtype=None) -> pd.DataFrame:
+        """Give SQLite results the same shape read_csv would"""
+        schema = TABLE_SCHEMAS[table]
+        if dtype is str:
+            for col in df.columns:
+                df[col] = df[col].map(lambda v: None if v is None or pd.isna(v) else str(v))
+            return df
+        for col, sql_type in schema.items():
+            if col in df.columns and sql_type == 'BOOLEAN':
+                df[col] = df[col].map(lambda v: bool(v) if v is not None else False)
+        return df
+
+    def parse_rows(self, table: str, rows: List[dict], dtype=None) -> pd.DataFrame:
+        columns = list(TABLE_SCHEMAS[table].keys())
+        df = pd.DataFrame(
+            [[self._to_sql_value(row.get(c)) for c in columns] for row in rows],
+            columns=columns
+        )
+        return self._from_sql(table, df, dtype)
+
+    def _insert(self, table: str, rows: List[dict]):
+        columns = list(TABLE_SCHEMAS[table].keys())
+        placeholders = ", ".join("?" for _ in columns)
+        col_sql = ", ".join(f'"{c}"' for c in columns)
+        values = [
+            tuple(self._to_sql_value(row.get(c)) for c in columns)
+            for row in rows
+        ]
+        self._conn.executemany(
+            f'INSERT INTO "{table}" ({col_sql}) VALUES ({placeholders})', values
+        )
+
+    def read_table(self, table: str, dtype=None) -> pd.DataFrame:
+        with self._lock:
+            df = pd.read_sql_query(f'SELECT * FROM "{table}" ORDER BY rowid', self._conn)
+        return self._from_sql(table, df, dtype)
+
+    def write_table(self, table: str, df: pd.DataFrame):
+        rows = df.to_dict('records')
+        with self._lock, self._conn:
+            self._local_writes[table] = self._local_writes.get(table, 0) + 1
+            self._conn.execute(f'DELETE FROM "{table}"')
+            self._insert(table, rows)
+
+    def append_rows(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._local_writes[table] = self._local_writes.get(table, 0) + 1
+            self._insert(table, rows)
+
+    def find_rows(self, table: str, column: str, value, dtype=None) -> pd.DataFrame:
+        with self._lock:
+            df = pd.read_sql_query(
+                f'SELECT * FROM "{table}" WHERE "{column}" = ? ORDER BY rowid',
+                self._conn,
+                params=(self._to_sql_value(value),)
+            )
+        return self._from_sql(table, df, dtype)
+
+    # stay below SQLite's limit on bound parameters per statement
+    MAX_IN_PARAMS = 500
+
+    def find_rows_in(self, table: str, column: str, values, dtype=None) -> pd.DataFrame:
+        values = [self._to_sql_value(v) for v in dict.fromkeys(values)]
+        frames = []
+        with self._lock:
+            for i in range(0, len(values), self.MAX_IN_PARAMS):
+                chunk = values[i:i + self.MAX_IN_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                frames.append(pd.read_sql_query(
+                    f'SELECT * FROM "{table}" WHERE "{column}" IN ({placeholders}) ORDER BY rowid',
+                    self._conn,
+                    params=chunk
+                ))
+        if not frames:
+            return self.parse_rows(table, [], dtype)
+        return self._from_sql(table, pd.concat(frames, ignore_index=True), dtype)
+
+    def _update_first(self, table: str, column: str, value, fields: dict) -> int:
+        schema = TABLE_SCHEMAS[table]
+        fields = {k: v for k, v in fields.items() if k in schema}
+        if not fields:
+            return 0
+        set_sql = ", ".join(f'"{k}" = ?' for k in fields)
+        params = [self._to_sql_value(v) for v in fields.values()]
+        params.append(self._to_sql_value(value))
+        cursor = self._conn.execute(
+            f'UPDATE "{table}" SET {set_sql} WHERE rowid = ('
+            f'SELECT rowid FROM "{table}" WHERE "{column}" = ? ORDER BY rowid LIMIT 1)',
+            params
+        )
+        return cursor.rowcount
+
+    def update_rows(self, table: str, column: str, value, fields: dict) -> int:
+        with self._lock, self._conn:
+            self._local_writes[table] = self._local_writes.get(table, 0) + 1
+            return self._update_first(table, column, value, fields)
+
+    def update_many(self, table: str, column: str, updates: Dict[object, dict]) -> int:
+        # one transaction: either every row is updated or none
+        with self._lock, self._conn:
+            self._local_writes[table] = self._local_writes.get(table, 0) + 1
+            return sum(self._update_first(table, column, key, fields)
+                       for key, fields in updates.items())
+
+    def delete_rows(self, table: str, column: str, value) -> int:
+        with self._lock, self._conn:
+            self._local_writes[table] = self._local_writes.get(table, 0) + 1
+            cursor = self._conn.execute(
+                f'DELETE FROM "{table}" WHERE "{column}" = ?',
+                (self._to_sql_value(value),)
+            )
+            return cursor.rowcount
+
+
+_sqlite_backends: Dict[str, SQLiteBackend] = {}
+_sqlite_backends_lock = threading.Lock()
+
+
+def create_backend(kind: Optional[str] = None) -> StorageBackend:
+    """
+    Build the backend selected by FOOD_DELIVERY_STORAGE ("csv" or "sqlite").
+    The SQLite file location can be changed with FOOD_DELIVERY_SQLITE_PATH.
+    """
+    kind = (kind or os.environ.get("FOOD_DELIVERY_STORAGE", "csv")).lower()
+    if kind == "csv":
+        return CSVBackend(os.environ.get("FOOD_DELIVERY_DATA_DIR", "."))
+    if kind == "sqlite":
+        db_path = os.path.abspath(
+            os.environ.get("FOOD_DELIVERY_SQLITE_PATH", "food_delivery.db")
+        )
+        # every service builds its own Database, they share one connection per file
+        with _sqlite_backends_lock:
+            if db_path not in _sqlite_backends:
+                _sqlite_backends[db_path] = SQLiteBackend(db_path)
+            return _sqlite_backends[db_path]
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+# -------------------------------------------------------
+# Migration
+# -------------------------------------------------------
+def migrate_csv_to_sqlite(csv_backend: CSVBackend, sqlite_backend: SQLiteBackend) -> Dict[str, int]:
+    """Copy the six CSV tables into SQLite, return row counts per table"""
+    counts = {}
+    for table in TABLE_SCHEMAS:
+        sqlite_backend.ensure_table(table)
+        # read as text so national codes, phone numbers and ids keep their digits
+        df = csv_backend.read_table(table, dtype=str)
+        for col, sql_type in TABLE_SCHEMAS[table].items():
+            if col not in df.columns:
+                continue
+            if sql_type in ('INTEGER', 'REAL'):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            elif sql_type == 'BOOLEAN':
+                df[col] = df[col].map(lambda v: str(v).strip().lower() in ('true', '1'))
+        sqlite_backend.write_table(table, df)
+        counts[table] = len(df)
+    return counts
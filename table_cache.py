@@ -0,0 +1,225 @@
+"""
+In-process cache of parsed tables shared by every Database instance.
+
+Each entry remembers the version token of the table it was loaded from
+(file mtime and size for CSV files). A read whose token still matches is
+served from memory; a changed token triggers a reload.
+
+Entries also carry hash indexes (column value -> row positions). An
+index is built the first time a column is looked up and is kept up to
+date when Database appends or updates rows through apply_append and
+apply_update, so lookups never scan the table. Cells holding lists (the
+parsed available_dates of foods) are indexed under each of their items,
+which makes the index an inverted index: date -> foods on that date.
+"""
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+import pandas as pd
+
+
+def _index_keys(value) -> list:
+    """Index keys of a cell: the items of a list cell, else the value itself"""
+    return value if isinstance(value, list) else [value]
+
+
+class _CacheEntry:
+    def __init__(self, token, df: pd.DataFrame):
+        self.token = token
+        self.df = df
+        # column -> {value: [row positions]}
+        self.indexes: Dict[str, Dict[object, List[int]]] = {}
+
+    def build_index(self, column: str) -> Dict[object, List[int]]:
+        index: Dict[object, List[int]] = {}
+        for pos, value in enumerate(self.df[column].tolist()):
+            for key in _index_keys(value):
+                index.setdefault(key, []).append(pos)
+        self.indexes[column] = index
+        return index
+
+
+class TableCache:
+    """Keeps parsed DataFrames in memory until their file changes"""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _entry(self, key: Hashable, token, loader: Callable[[], pd.DataFrame]) -> _CacheEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and token is not None and entry.token == token:
+                self.hits += 1
+                return entry
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+
+        # loaders take the table's file lock; loading outside our lock keeps a
+        # thread that holds the file lock from waiting on one that waits for it.
+        # token was read before loading, so a table changed meanwhile is only
+        # reloaded once more, never served stale.
+        entry = _CacheEntry(token, loader())
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def get(
+        self,
+        key: Hashable,
+        token,
+        loader: Callable[[], pd.DataFrame],
+        copy: bool = True
+    ) -> pd.DataFrame:
+        """
+        Return the cached frame for key, loading it when missing or when
+        token differs from the one it was loaded with.
+        Callers get a copy by default because services modify frames in
+        place; read-only lookups can pass copy=False.
+        """
+        entry = self._entry(key, token, loader)
+        with self._lock:
+            return entry.df.copy() if copy else entry.df
+
+    def lookup(
+        self,
+        key: Hashable,
+        token,
+        loader: Callable[[], pd.DataFrame],
+        column: str,
+        value
+    ) -> pd.DataFrame:
+        """Rows where column == value, answered from the column's hash index"""
+        entry = self._entry(key, token, loader)
+        with self._lock:
+            index = entry.indexes.get(column)
+            if index is None:
+                index = entry.build_index(column)
+            return entry.df.iloc[index.get(value, [])]
+
+    def lookup_many(
+        self,
+        key: Hashable,
+        token,
+        loader: Callable[[], pd.DataFrame],
+        column: str,
+        values: List
+    ) -> pd.DataFrame:
+        """Rows matching any of values, in the order of values"""
+        entry = self._entry(key, token, loader)
+        with self._lock:
+            index = entry.indexes.get(column)
+            if index is None:
+                index = entry.build_index(column)
+            positions = [pos for value in values for pos in index.get(value, [])]
+            return entry.df.iloc[positions]
+
+    # -------------------------------------------------------
+    # Write-through maintenance
+    # -------------------------------------------------------
+    def _writable_entry(self, key: Hashable, old_token) -> Optional[_CacheEntry]:
+        """Entry that is still in sync with the table as it was before the write"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if old_token is None or entry.token != old_token:
+            # someone else changed the table in between, reload next time
+            del self._entries[key]
+            return None
+        return entry
+
+    def apply_append(self, key: Hashable, old_token, new_token, rows: pd.DataFrame):
+        """Add freshly written rows to a cached frame and its indexes"""
+        with self._lock:
+            entry = self._writable_entry(key, old_token)
+            if entry is None:
+                return
+            start = len(entry.df)
+            if entry.df.empty:
+                df = rows.reset_index(drop=True)
+            else:
+                df = pd.concat([entry.df, rows], ignore_index=True)
+            entry.df = df
+            for column, index in entry.indexes.items():
+                values = df[column].iloc[start:].tolist() if column in df.columns else []
+                for offset, value in enumerate(values):
+                    for key in _index_keys(value):
+                        index.setdefault(key, []).append(start + offset)
+            entry.token = new_token
+
+    def apply_update(self, key: Hashable, old_token, new_token, column: str, value, fields: dict):
+        """Set fields on the first cached row where column == value"""
+        self.apply_updates(key, old_token, new_token, column, {value: fields})
+
+    def apply_updates(self, key: Hashable, old_token, new_token, column: str,
+                      updates: Dict[object, dict]):
+        """apply_update for several {value: fields} pairs written together"""
+        with self._lock:
+            entry = self._writable_entry(key, old_token)
+            if entry is None:
+                return
+            index = entry.indexes.get(column)
+            if index is None:
+                index = entry.build_index(column)
+            df = entry.df
+            for value, fields in updates.items():
+                positions = index.get(value)
+                if not positions:
+                    continue
+                pos = positions[0]
+                for field, new_value in fields.items():
+                    if field not in df.columns:
+                        continue
+                    field_index = entry.indexes.get(field)
+                    if field_index is not None:
+                        old_value = df.iat[pos, df.columns.get_loc(field)]
+                        for key in _index_keys(old_value):
+                            bucket = field_index.get(key)
+                            if bucket and pos in bucket:
+                                bucket.remove(pos)
+                                if not bucket:
+                                    del field_index[key]
+                        for key in _index_keys(new_value):
+                            bucket = field_index.setdefault(key, [])
+                            if pos not in bucket:
+                                bucket.append(pos)
+                                bucket.sort()
+                    df.at[df.index[pos], field] = new_value
+            entry.token = new_token
+
+    def invalidate(self, path: Optional[str] = None, table: Optional[str] = None):
+        """
+        Drop cached entries. Keys are (path, table, variant) tuples;
+        without arguments the whole cache is cleared.
+        """
+        with self._lock:
+            if path is None and table is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if (path is None or key[0] == path) and (table is None or key[1] == table):
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'entries': len(self._entries)
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.reloads = 0
@@ -1,6 +1,12 @@
 import unittest
+import multiprocessing
 import os
+import shutil
+import tempfile
+import threading
+import time
 import uuid
+import pandas as pd
 from datetime import date, datetime, timedelta
 from model import Customer, Admin, Food, Cart, Order, OrderItem, DiscountCode, Review
 from database import Database
@@ -9,6 +15,50 @@ from food_service import FoodService
 from customer_service import CustomerService
 from order_service import OrderService
 from admin_service import AdminService
+from storage import CSVBackend, SQLiteBackend, migrate_csv_to_sqlite
+from driver_pool import WebDriverPool, RESOURCE_BLOCKING_PROFILES
+from scraper import BaseRestaurantScraper
+from threaded_scraper import ThreadedRestaurantScraper
+from restaurant_scrapers import SnappFoodScraper
+from http_fetch import HttpMenuFetcher
+from async_scraper import AsyncHttpClient, AsyncRestaurantScraper, HostRateLimiter
+from scrape_sinks import CSVSink, SQLiteSink
+from scrape_jobs import ScrapeJob
+from scrape_cache import ScrapeCache
+import menu_parser
+import persian_text
+from gui_tasks import TaskRunner
+from virtual_table import FrameSource, ServiceSource, VirtualTableModel
+from threaded_scraper import quick_scrape
+from name_matcher import NameMatcher, jaccard, tfidf_merge, word_set
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _stress_backend(kind, data_dir):
+    if kind == 'sqlite':
+        return SQLiteBackend(os.path.join(data_dir, 'data.db'))
+    return CSVBackend(data_dir)
+
+
+def _stress_worker(kind, data_dir, customer_id, rounds, results):
+    """One writer process of TestConcurrentWriters"""
+    db = Database(backend=_stress_backend(kind, data_dir))
+    reserved = 0
+    claimed = 0
+    for _ in range(rounds):
+        db.add_loyalty_points(customer_id, 1)
+        try:
+            db.reserve_stock({"f-1": 1})
+            reserved += 1
+        except ValueError:
+            pass
+        db.update_food_stock("f-2", os.getpid())
+    try:
+        db.mark_discount_code_used("ONCE")
+        claimed = 1
+    except ValueError:
+        pass
+    results.put((reserved, claimed))
 
 
 class TestAuthManager(unittest.TestCase):
@@ -385,6 +435,58 @@ class TestCustomerService(unittest.TestCase):
         self.assertTrue(discount.is_valid())
 
 
+class TestOrderHistory(unittest.TestCase):
+    """تست‌های مربوط به تاریخچه سفارش‌ها و صفحه‌بندی آن"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _service(self, backend):
+        service = CustomerService()
+        service.db = Database(backend=backend)
+        pizza = Food("f-1", "r-1", "پیتزا", "فست‌فود", 50000, 30000, "", "", 100, [date.today()])
+        salad = Food("f-2", "r-1", "سالاد", "پیش‌غذا", 20000, 5000, "", "", 100, [date.today()])
+        service.db.save_food(pizza)
+        service.db.save_food(salad)
+        for day in range(1, 6):
+            order = Order("r-1", f"o-{day}", "c-1",
+                          [OrderItem(pizza, day), OrderItem(salad, 1)], date.today())
+            order.order_date = datetime(2025, 1, day, 12)
+            service.db.save_order(order)
+            service.db.save_order_items(order.order_id, order.items)
+        other = Order("r-1", "o-other", "c-2", [OrderItem(pizza, 1)], date.today())
+        service.db.save_order(other)
+        service.db.save_order_items(other.order_id, other.items)
+        return service
+
+    def _check(self, service):
+        history = service.get_order_history("c-1")
+        self.assertEqual([o['order_id'] for o in history], ["o-5", "o-4", "o-3", "o-2", "o-1"])
+        self.assertEqual(history[0]['items'][0],
+                         {'food_name': "پیتزا", 'quantity': 5, 'unit_price': 50000.0, 'total': 250000.0})
+        self.assertEqual(history[0]['final_amount'], 270000.0)
+
+        page = service.get_order_history("c-1", limit=2, offset=2)
+        self.assertEqual([o['order_id'] for o in page], ["o-3", "o-2"])
+        self.assertEqual(service.get_order_history("c-1", limit=2, offset=10), [])
+        self.assertEqual(service.count_orders("c-1"), 5)
+
+        service.db.delete_food("f-2")
+        items = service.get_order_history("c-1", limit=1)[0]['items']
+        self.assertEqual([i['food_name'] for i in items], ["پیتزا", "f-2"])
+
+    def test_csv_history(self):
+        """تست تاریخچه سفارش با CSV"""
+        self._check(self._service(CSVBackend(self.tmp_dir)))
+
+    def test_sqlite_history(self):
+        """تست تاریخچه سفارش با SQLite"""
+        self._check(self._service(SQLiteBackend(os.path.join(self.tmp_dir, "data.db"))))
+
+
 class TestAdminService(unittest.TestCase):
     """تست‌های مربوط به خدمات ادمین"""
 
@@ -452,6 +554,1773 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(discount.discount_percentage, 15.0)
 
 
+class TestSalesReport(unittest.TestCase):
+    """تست‌های مربوط به گزارش فروش و سود"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.admin_service = AdminService()
+        self.admin_service.db = self.db = Database(backend=CSVBackend(self.tmp_dir))
+        self.pizza = Food("f-1", "r-1", "پیتزا", "فست‌فود", 50000, 30000, "", "", 100, [date.today()])
+        self.salad = Food("f-2", "r-2", "سالاد", "پیش‌غذا", 20000, 5000, "", "", 100, [date.today()])
+        self.db.save_food(self.pizza)
+        self.db.save_food(self.salad)
+        self._order("r-1", datetime(2025, 1, 1, 12), [OrderItem(self.pizza, 2)])
+        self._order("r-2", datetime(2025, 1, 2, 13), [OrderItem(self.salad, 3)])
+        self._order("r-1", datetime(2025, 1, 2, 20), [OrderItem(self.pizza, 1)])
+        self._order("r-1", datetime(2025, 2, 1, 9), [OrderItem(self.pizza, 5)])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _order(self, restaurant_id, when, items):
+        order = Order(restaurant_id, str(uuid.uuid4()), "c-1", items, when.date())
+        order.order_date = when
+        self.db.save_order(order)
+        self.db.save_order_items(order.order_id, items)
+
+    def test_totals(self):
+        """تست جمع فروش و سود در بازه"""
+        report = self.admin_service.get_sales_report(date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(report['order_count'], 3)
+        self.assertEqual(report['total_sales'], 3 * 50000 + 3 * 20000)
+        self.assertEqual(report['total_profit'], 3 * 20000 + 3 * 15000)
+
+    def test_breakdowns(self):
+        """تست تفکیک گزارش بر اساس روز، رستوران، دسته و غذا"""
+        report = self.admin_service.get_sales_report(date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual([(r['day'], r['sales'], r['order_count']) for r in report['by_day']],
+                         [("2025-01-01", 100000, 1), ("2025-01-02", 110000, 2)])
+        self.assertEqual([(r['restaurant'], r['profit']) for r in report['by_restaurant']],
+                         [("r-1", 60000), ("r-2", 45000)])
+        self.assertEqual({r['category']: r['quantity'] for r in report['by_category']},
+                         {"فست‌فود": 3, "پیش‌غذا": 3})
+        self.assertEqual({r['name'] for r in report['by_food']}, {"پیتزا", "سالاد"})
+
+    def test_deleted_food_counts_as_sales_only(self):
+        """تست غذای حذف‌شده: فقط در فروش حساب می‌شود"""
+        self.db.delete_food("f-2")
+        report = self.admin_service.get_sales_report(date(2025, 1, 2), date(2025, 1, 2))
+        self.assertEqual(report['total_sales'], 110000)
+        self.assertEqual(report['total_profit'], 20000)
+
+    def test_all_foods_deleted(self):
+        """تست گزارش وقتی همه غذاهای سفارش‌ها حذف شده‌اند"""
+        self.db.delete_food("f-1")
+        self.db.delete_food("f-2")
+        report = self.admin_service.get_sales_report(
+            date(2025, 1, 1), date(2025, 1, 31), breakdowns=('day', 'category', 'food'))
+        self.assertEqual(report['total_sales'], 3 * 50000 + 3 * 20000)
+        self.assertEqual(report['total_profit'], 0)
+        self.assertEqual(report['by_category'], [])
+        self.assertEqual({r['food']: r['sales'] for r in report['by_food']},
+                         {"f-1": 150000, "f-2": 60000})
+
+    def test_empty_range(self):
+        """تست بازه بدون سفارش"""
+        report = self.admin_service.get_sales_report(date(2024, 1, 1), date(2024, 1, 31))
+        self.assertEqual(report['order_count'], 0)
+        self.assertEqual(report['total_sales'], 0)
+        self.assertEqual(report['by_day'], [])
+
+
+class TestOrdersView(unittest.TestCase):
+    """تست‌های مربوط به فهرست سفارش‌های ادمین با فیلتر و صفحه‌بندی"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.admin_service = AdminService()
+        self.admin_service.db = self.db = Database(backend=CSVBackend(self.tmp_dir))
+        self.db.save_user(Customer("c-1", "علی", "محمدی", "ali@example.com",
+                                   "Test@1234", "09123456789", "1234567890"))
+        self.db.save_user(Customer("c-2", "رضا", "احمدی", "reza@example.com",
+                                   "Test@1234", "09987654321", "0987654321"))
+        food = Food("f-1", "r-1", "پیتزا", "فست‌فود", 50000, 30000, "", "", 100, [date.today()])
+        specs = [("o-1", "c-1", 1, 1, Order.STATUS_PAID), ("o-2", "c-2", 2, 3, Order.STATUS_PENDING),
+                 ("o-3", "c-1", 3, 2, Order.STATUS_PAID), ("o-4", "c-9", 4, 1, Order.STATUS_SENT)]
+        for order_id, customer_id, day, quantity, status in specs:
+            order = Order("r-1", order_id, customer_id, [OrderItem(food, quantity)], date.today())
+            order.order_date = datetime(2025, 1, day, 12)
+            order.status = status
+            self.db.save_order(order)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _ids(self, **kwargs):
+        return [o['order_id'] for o in self.admin_service.get_all_orders(**kwargs)]
+
+    def test_default_view(self):
+        """تست فهرست کامل با نام مشتری"""
+        orders = self.admin_service.get_all_orders()
+        self.assertEqual([o['order_id'] for o in orders], ["o-1", "o-2", "o-3", "o-4"])
+        self.assertEqual(orders[0]['customer_name'], "علی محمدی")
+        self.assertEqual(orders[3]['customer_name'], "c-9")
+
+    def test_filters_sort_and_paging(self):
+        """تست فیلتر وضعیت، بازه تاریخ، مشتری، مرتب‌سازی و صفحه‌بندی"""
+        self.assertEqual(self._ids(status=Order.STATUS_PAID), ["o-1", "o-3"])
+        self.assertEqual(self._ids(start_date=date(2025, 1, 2), end_date=date(2025, 1, 3)),
+                         ["o-2", "o-3"])
+        self.assertEqual(self._ids(customer_id="c-1"), ["o-1", "o-3"])
+        self.assertEqual(self._ids(sort_by='total_amount', descending=True),
+                         ["o-2", "o-3", "o-1", "o-4"])
+        self.assertEqual(self._ids(sort_by='date', descending=True, limit=2, offset=1),
+                         ["o-3", "o-2"])
+        self.assertEqual(self.admin_service.count_orders(status=Order.STATUS_PAID), 2)
+        with self.assertRaises(ValueError):
+            self.admin_service.get_all_orders(sort_by='unknown')
+
+    def test_search(self):
+        """تست جستجو در کد سفارش و نام مشتری"""
+        self.assertEqual(self._ids(search="علي"), ["o-1", "o-3"])
+        self.assertEqual(self._ids(search="رضا احمدی"), ["o-2"])
+        self.assertEqual(self._ids(search="o-4"), ["o-4"])
+        self.assertEqual(self._ids(search="محمدی", status=Order.STATUS_PAID, limit=1, offset=1),
+                         ["o-3"])
+        self.assertEqual(self.admin_service.count_orders(search="علی"), 2)
+        self.assertEqual(self.admin_service.count_orders(search="حسین"), 0)
+
+    def test_pages_reuse_view(self):
+        """تست استفاده دوباره از نمای مرتب‌شده هنگام صفحه‌بندی"""
+        loads = []
+        load_orders = self.db.load_orders
+        self.db.load_orders = lambda: loads.append(1) or load_orders()
+
+        pages = [self._ids(sort_by='total_amount', descending=True, limit=2, offset=offset)
+                 for offset in (0, 2)]
+        self.assertEqual(pages, [["o-2", "o-3"], ["o-1", "o-4"]])
+        self.assertEqual(self.admin_service.count_orders(), 4)
+        self.assertEqual(len(loads), 1)
+
+        # a change to the orders table is seen by the next page
+        self.db.update_order_status("o-4", Order.STATUS_PAID)
+        self.assertEqual(self._ids(status=Order.STATUS_PAID, sort_by='date'), ["o-1", "o-3", "o-4"])
+        self.assertEqual(self.admin_service.count_orders(status=Order.STATUS_PAID), 3)
+        self.assertEqual(len(loads), 2)
+
+
+class TestStorageBackends(unittest.TestCase):
+    """تست‌های مربوط به لایه ذخیره‌سازی CSV و SQLite"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.sqlite = SQLiteBackend(os.path.join(self.tmp_dir, "test.db"))
+        self.db = Database(backend=self.sqlite)
+        self.food = Food(
+            food_id="f-1", restaurant_id="r-1", name="پیتزا", category="فست‌فود",
+            selling_price=50000, cost_price=30000, ingredients="پنیر",
+            description="پیتزا", stock=10, available_dates=[date.today()]
+        )
+
+    def tearDown(self):
+        self.sqlite.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _customer(self, email="ali@example.com"):
+        return Customer(str(uuid.uuid4()), "علی", "محمدی", email, "Test@1234",
+                        "09123456789", "0012345678")
+
+    def test_sqlite_user_roundtrip(self):
+        """تست ذخیره و جستجوی کاربر در SQLite"""
+        customer = self._customer()
+        self.db.save_user(customer)
+        row = self.db.find_user_by_email("ali@example.com")
+        self.assertIsNotNone(row)
+        self.assertEqual(row['user_id'], customer.user_id)
+        self.assertEqual(row['national_code'], "0012345678")
+        self.assertFalse(row['is_locked'])
+
+        self.db.update_user_login_state("ali@example.com", 3, True)
+        row = self.db.find_user_by_email("ali@example.com")
+        self.assertEqual(row['failed_attempts'], 3)
+        self.assertTrue(row['is_locked'])
+
+        with self.assertRaises(ValueError):
+            self.db.save_user(self._customer())
+
+    def test_sqlite_food_stock_and_dates(self):
+        """تست به‌روزرسانی موجودی و تاریخ‌ها در SQLite"""
+        self.db.save_food(self.food)
+        self.db.update_food_stock("f-1", 7)
+        row = self.db.find_food_by_id("f-1")
+        self.assertEqual(row['stock'], 7)
+        self.assertEqual(row['available_dates'], [date.today()])
+
+        with self.assertRaises(ValueError):
+            self.db.update_food("missing", {'stock': 1})
+
+    def test_sqlite_loyalty_and_discount(self):
+        """تست امتیاز وفاداری و کد تخفیف در SQLite"""
+        customer = self._customer()
+        self.db.save_user(customer)
+        self.db.add_loyalty_points(customer.user_id, 120)
+        self.db.deduct_loyalty_points(customer.user_id, 100)
+        self.assertEqual(int(self.db.find_user_by_email(customer.email)['loyalty_points']), 20)
+        with self.assertRaises(ValueError):
+            self.db.deduct_loyalty_points(customer.user_id, 100)
+
+        self.db.save_discount_code(DiscountCode("CODE1", 10.0, datetime.now() + timedelta(days=1)))
+        self.assertFalse(bool(self.db.find_discount_code("CODE1")['is_used']))
+        self.db.mark_discount_code_used("CODE1")
+        self.assertTrue(bool(self.db.find_discount_code("CODE1")['is_used']))
+
+    def test_migrate_csv_to_sqlite(self):
+        """تست انتقال جداول CSV به SQLite"""
+        csv_db = Database(backend=CSVBackend(self.tmp_dir))
+        customer = self._customer()
+        csv_db.save_user(customer)
+        csv_db.save_food(self.food)
+
+        target = SQLiteBackend(os.path.join(self.tmp_dir, "migrated.db"))
+        try:
+            counts = migrate_csv_to_sqlite(CSVBackend(self.tmp_dir), target)
+            self.assertEqual(counts['users'], 1)
+            self.assertEqual(counts['foods'], 1)
+            self.assertEqual(counts['orders'], 0)
+
+            migrated = Database(backend=target)
+            row = migrated.find_user_by_email(customer.email)
+            self.assertEqual(row['national_code'], "0012345678")
+            self.assertEqual(migrated.find_food_by_id("f-1")['available_dates'], [date.today()])
+        finally:
+            target.close()
+
+
+class TestTableCache(unittest.TestCase):
+    """تست‌های مربوط به کش جداول در حافظه"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database(backend=CSVBackend(self.tmp_dir))
+        self.db.cache.invalidate()
+        self.db.cache.reset_stats()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_repeated_reads_hit_cache(self):
+        """تست خواندن تکراری از کش"""
+        self.db.load_users()
+        self.db.load_users()
+        self.db.load_users()
+        stats = self.db.cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_cache_copies_are_independent(self):
+        """تست مستقل بودن نسخه‌های برگشتی از کش"""
+        df = self.db.load_users()
+        df['email'] = "changed"
+        df.loc[len(df)] = None
+        self.assertTrue(self.db.load_users().empty)
+
+    def test_external_change_triggers_reload(self):
+        """تست بارگذاری مجدد بعد از تغییر فایل توسط فرایند دیگر"""
+        self.db.load_users()
+        other = Database(backend=CSVBackend(self.tmp_dir))
+        df = other.backend.read_table('users')
+        df.loc[0, 'email'] = "other@example.com"
+        # write directly, bypassing the cache like another process would
+        other.backend.write_table('users', df)
+        os.utime(self.db.users_file, ns=(0, 0))
+
+        users = self.db.load_users()
+        self.assertEqual(len(users), 1)
+        self.assertEqual(self.db.cache_stats()['reloads'], 1)
+
+    def test_writes_invalidate_cache(self):
+        """تست پاک شدن کش بعد از نوشتن"""
+        self.db.load_users()
+        self.db.save_user(Customer(str(uuid.uuid4()), "علی", "محمدی", "ali@example.com",
+                                   "Test@1234", "09123456789", "1234567890"))
+        self.assertIsNotNone(self.db.find_user_by_email("ali@example.com"))
+
+
+class TestAppendOnlyTables(unittest.TestCase):
+    """تست‌های مربوط به نوشتن افزایشی جداول سفارش"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.backend = CSVBackend(self.tmp_dir, compact_threshold=3)
+        self.db = Database(backend=self.backend)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _order_row(self, order_id):
+        return {
+            'order_id': order_id, 'restaurant_id': 'r-1', 'customer_id': 'c-1',
+            'order_date': '2024-01-01 12:00:00', 'delivery_date': '2024-01-02',
+            'status': Order.STATUS_PENDING, 'total_amount': 1000.0,
+            'discount_amount': 0.0, 'payment_method': Order.PAYMENT_ONLINE,
+            'discount_code': None
+        }
+
+    def test_append_keeps_existing_bytes(self):
+        """تست اضافه شدن سطر جدید بدون بازنویسی فایل"""
+        self.db._append('orders', [self._order_row("o-1")])
+        with open(self.db.orders_file, 'rb') as f:
+            before = f.read()
+        self.db._append('orders', [self._order_row("o-2")])
+        with open(self.db.orders_file, 'rb') as f:
+            after = f.read()
+
+        self.assertTrue(after.startswith(before))
+        self.assertEqual(after.count(b"o-"), 2)
+        self.assertEqual(list(self.db.load_orders()['order_id']), ["o-1", "o-2"])
+
+    def test_append_follows_existing_header(self):
+        """تست رعایت ترتیب ستون‌های فایل قدیمی"""
+        old_cols = ['order_id', 'customer_id', 'order_date', 'delivery_date', 'status',
+                    'total_amount', 'discount_amount', 'payment_method', 'discount_code',
+                    'restaurant_id']
+        pd.DataFrame(columns=old_cols).to_csv(self.db.orders_file, index=False)
+        self.db._append('orders', [self._order_row("o-1")])
+        row = self.db.get_order_by_id("o-1")
+        self.assertEqual(row['restaurant_id'], 'r-1')
+        self.assertEqual(row['customer_id'], 'c-1')
+
+    def test_status_updates_are_journaled_and_compacted(self):
+        """تست ثبت تغییر وضعیت در ژورنال و فشرده‌سازی"""
+        for i in range(3):
+            self.db._append('orders', [self._order_row(f"o-{i}")])
+
+        self.db.update_order_status("o-0", Order.STATUS_PAID)
+        self.assertTrue(os.path.exists(self.backend.journal_path('orders')))
+        self.assertEqual(self.db.get_order_by_id("o-0")['status'], Order.STATUS_PAID)
+
+        self.db.update_order_status("o-1", Order.STATUS_SENT)
+        self.db.update_order_status("o-0", Order.STATUS_CANCELLED)
+        # threshold reached: journal folded into the CSV
+        self.assertFalse(os.path.exists(self.backend.journal_path('orders')))
+        raw = pd.read_csv(self.db.orders_file)
+        self.assertEqual(list(raw['status']), [Order.STATUS_CANCELLED, Order.STATUS_SENT,
+                                               Order.STATUS_PENDING])
+
+    def test_discount_code_used_flag_survives_compaction(self):
+        """تست ماندگاری وضعیت استفاده از کد تخفیف"""
+        self.db.save_discount_code(DiscountCode("CODE1", 10.0, datetime.now() + timedelta(days=1)))
+        self.db.mark_discount_code_used("CODE1")
+        self.assertTrue(bool(self.db.find_discount_code("CODE1")['is_used']))
+        self.db.compact()
+        self.assertTrue(bool(self.db.find_discount_code("CODE1")['is_used']))
+
+
+class TestHashIndexes(unittest.TestCase):
+    """تست‌های مربوط به ایندکس‌های درهم‌سازی در حافظه"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database(backend=CSVBackend(self.tmp_dir))
+        self.db.cache.invalidate()
+        self.customer = Customer(str(uuid.uuid4()), "علی", "محمدی", "ali@example.com",
+                                 "Test@1234", "09123456789", "1234567890")
+        self.db.save_user(self.customer)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_lookups_use_index_without_reloading(self):
+        """تست جستجو بدون خواندن دوباره فایل پس از نوشتن"""
+        self.assertIsNotNone(self.db.find_user_by_email("ali@example.com"))
+        self.db.cache.reset_stats()
+
+        other = Customer(str(uuid.uuid4()), "رضا", "احمدی", "reza@example.com",
+                         "Test@1234", "09987654321", "0987654321")
+        self.db.save_user(other)
+        self.db.update_user_login_state("ali@example.com", 2, False)
+
+        self.assertEqual(self.db.find_user_by_email("reza@example.com")['user_id'], other.user_id)
+        self.assertEqual(int(self.db.find_user_by_email("ali@example.com")['failed_attempts']), 2)
+        stats = self.db.cache_stats()
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['reloads'], 0)
+
+    def test_index_follows_key_change(self):
+        """تست به‌روزرسانی ایندکس بعد از تغییر ایمیل"""
+        self.db.find_user_by_email("ali@example.com")
+        self.db.update_user_profile("ali@example.com", {'email': "new@example.com"})
+        self.assertIsNone(self.db.find_user_by_email("ali@example.com"))
+        self.assertEqual(self.db.find_user_by_email("new@example.com")['user_id'],
+                         self.customer.user_id)
+
+    def test_order_lookups(self):
+        """تست جستجوی سفارش و اقلام آن با ایندکس"""
+        food = Food("f-1", "r-1", "پیتزا", "فست‌فود", 50000, 30000, "پنیر", "پیتزا", 10,
+                    [date.today()])
+        for _ in range(3):
+            order = Order("r-1", str(uuid.uuid4()), self.customer.user_id,
+                          [OrderItem(food, 1)], date.today())
+            self.db.save_order(order)
+            self.db.save_order_items(order.order_id, order.items)
+
+        self.assertEqual(len(self.db.get_customer_orders(self.customer.user_id)), 3)
+        self.assertEqual(len(self.db.get_order_items(order.order_id)), 1)
+        self.db.update_order_status(order.order_id, Order.STATUS_SENT)
+        self.assertEqual(self.db.get_order_by_id(order.order_id)['status'], Order.STATUS_SENT)
+        self.assertIsNone(self.db.get_order_by_id("missing"))
+
+
+class TestDateIndex(unittest.TestCase):
+    """تست‌های مربوط به ایندکس تاریخ برای منوی روز"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database(backend=CSVBackend(self.tmp_dir))
+        self.db.cache.invalidate()
+        self.today = date.today()
+        self.tomorrow = self.today + timedelta(days=1)
+        self.db.save_food(Food("f-1", "r-1", "پیتزا", "فست‌فود", 50000, 30000, "", "", 5,
+                               [self.today, self.tomorrow]))
+        self.db.save_food(Food("f-2", "r-1", "برگر", "فست‌فود", 40000, 20000, "", "", 5,
+                               [self.tomorrow]))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _menu(self, day):
+        return list(self.db.find_foods_by_date(day)['food_id'])
+
+    def test_menu_by_date(self):
+        """تست دریافت غذاهای یک تاریخ از ایندکس"""
+        self.assertEqual(self._menu(self.today), ["f-1"])
+        self.assertEqual(self._menu(self.tomorrow), ["f-1", "f-2"])
+        self.assertEqual(self._menu(self.today - timedelta(days=1)), [])
+
+    def test_index_maintained_on_save_and_update(self):
+        """تست به‌روز ماندن ایندکس بدون خواندن دوباره جدول"""
+        self._menu(self.today)
+        self.db.cache.reset_stats()
+
+        self.db.save_food(Food("f-3", "r-1", "سالاد", "پیش‌غذا", 20000, 10000, "", "", 5,
+                               [self.today]))
+        self.db.update_food("f-1", {'available_dates': [self.tomorrow]})
+
+        self.assertEqual(self._menu(self.today), ["f-3"])
+        self.assertEqual(self._menu(self.tomorrow), ["f-1", "f-2"])
+        stats = self.db.cache_stats()
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['reloads'], 0)
+
+
+class TestFoodSearch(unittest.TestCase):
+    """تست‌های مربوط به ایندکس جستجوی متنی غذاها"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.food_service = FoodService()
+        self.food_service.db = Database(backend=CSVBackend(self.tmp_dir))
+        self.db = self.food_service.db
+        self.today = date.today()
+        self.db.save_food(Food("f-1", "r-1", "پيتزا مخصوص", "فست‌فود", 50000, 30000,
+                               "پنير، گوجه", "پیتزای ۲ نفره", 5, [self.today]))
+        self.db.save_food(Food("f-2", "r-1", "پیتزا", "فست‌فود", 40000, 20000,
+                               "", "", 5, [self.today + timedelta(days=1)]))
+        self.db.save_food(Food("f-3", "r-1", "سیب‌زمینی سرخ‌کرده", "پیش‌غذا", 20000, 10000,
+                               "سیب زمینی", "کنار کباب", 5, [self.today]))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _ids(self, query, selected_date=None):
+        return [f.food_id for f in self.food_service.search_foods(query, selected_date)]
+
+    def test_normalized_prefix_search(self):
+        """تست یکسان‌سازی حروف عربی/فارسی و جستجوی پیشوندی"""
+        self.assertEqual(self._ids("پیتزا"), ["f-2", "f-1"])
+        self.assertEqual(self._ids("پیت"), ["f-1", "f-2"])
+        self.assertEqual(self._ids("پنیر"), ["f-1"])
+        self.assertEqual(self._ids("كباب"), ["f-3"])
+        self.assertEqual(self._ids("سیب زمینی"), ["f-3"])
+        self.assertEqual(self._ids("2"), ["f-1"])
+        self.assertEqual(self._ids("پیتزا", self.today), ["f-1"])
+        self.assertEqual(self._ids("همبرگر"), [])
+        self.assertEqual(len(self._ids("")), 3)
+
+    def test_index_updates_incrementally(self):
+        """تست به‌روزرسانی ایندکس بدون ساخت دوباره"""
+        self._ids("پیتزا")
+        builds = self.db.search_indexes.builds
+
+        self.db.save_food(Food("f-4", "r-1", "کشک بادمجان", "پیش‌غذا", 30000, 15000,
+                               "", "", 5, [self.today]))
+        self.db.update_food("f-3", {'name': "سالاد"})
+        self.db.delete_food("f-2")
+        self.db.reserve_stock({"f-1": 1})
+
+        self.assertEqual(self._ids("کشک"), ["f-4"])
+        self.assertEqual(self._ids("سالاد"), ["f-3"])
+        self.assertEqual(self._ids("سرخ"), [])
+        self.assertEqual(self._ids("پیتزا"), ["f-1"])
+        self.assertEqual(self.db.search_indexes.builds, builds)
+
+    def test_invalidated_index_is_rebuilt(self):
+        """تست ساخت دوباره ایندکس پس از باطل شدن"""
+        self._ids("پیتزا")
+        builds = self.db.search_indexes.builds
+        self.db.search_indexes.invalidate(self.db.backend.table_path('foods'))
+        self.assertEqual(self._ids("پیتزا"), ["f-2", "f-1"])
+        self.assertEqual(self.db.search_indexes.builds, builds + 1)
+
+    def test_list_foods_paging(self):
+        """تست فهرست صفحه‌بندی‌شده غذاها با جستجو، تاریخ و مرتب‌سازی"""
+        def ids(**kwargs):
+            return [f.food_id for f in self.food_service.list_foods(**kwargs)]
+
+        self.assertEqual(ids(), ["f-1", "f-2", "f-3"])
+        self.assertEqual(ids(sort_by='selling_price'), ["f-3", "f-2", "f-1"])
+        self.assertEqual(ids(sort_by='selling_price', descending=True, limit=2, offset=1),
+                         ["f-2", "f-3"])
+        self.assertEqual(ids(query="پیتزا"), ["f-2", "f-1"])
+        self.assertEqual(ids(query="پیتزا", selected_date=self.today), ["f-1"])
+        self.assertEqual(ids(selected_date=self.today, sort_by='stock', descending=True),
+                         ["f-1", "f-3"])
+        self.assertEqual(self.food_service.count_foods(), 3)
+        self.assertEqual(self.food_service.count_foods(query="پیت", selected_date=self.today), 1)
+        with self.assertRaises(ValueError):
+            self.food_service.list_foods(sort_by='ingredients')
+
+
+class TestStockReservation(unittest.TestCase):
+    """تست‌های مربوط به رزرو گروهی و اتمیک موجودی"""
+
+    class CountingBackend(CSVBackend):
+        def __init__(self, data_dir):
+            super().__init__(data_dir)
+            self.writes = []
+
+        def write_table(self, table, df):
+            self.writes.append(table)
+            super().write_table(table, df)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.backend = self.CountingBackend(self.tmp_dir)
+        self.db = Database(backend=self.backend)
+        self.foods = [
+            Food(f"f-{i}", "r-1", f"غذا {i}", "فست‌فود", 10000, 5000, "", "", 5, [date.today()])
+            for i in range(10)
+        ]
+        for food in self.foods:
+            self.db.save_food(food)
+        self.backend.writes.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_reserve_many_items_in_one_write(self):
+        """تست رزرو ده قلم با یک بار نوشتن"""
+        new_stock = self.db.reserve_stock({food.food_id: 2 for food in self.foods})
+        self.assertEqual(set(new_stock.values()), {3})
+        self.assertEqual(self.backend.writes, ['foods'])
+        self.assertEqual(self.db.find_food_by_id("f-9")['stock'], 3)
+
+    def test_reserve_is_all_or_nothing(self):
+        """تست عدم کاهش موجودی در صورت کمبود یک قلم"""
+        with self.assertRaises(ValueError) as context:
+            self.db.reserve_stock({"f-0": 1, "f-1": 6})
+        self.assertIn("stock", str(context.exception).lower())
+        with self.assertRaises(ValueError):
+            self.db.reserve_stock({"f-0": 1, "missing": 1})
+
+        self.assertEqual(self.backend.writes, [])
+        self.assertEqual(self.db.find_food_by_id("f-0")['stock'], 5)
+
+    def test_release_skips_unknown_foods(self):
+        """تست بازگرداندن موجودی"""
+        self.db.release_stock({"f-0": 2, "deleted-food": 1})
+        self.assertEqual(self.db.find_food_by_id("f-0")['stock'], 7)
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """تست نوشتن همزمان چند پردازه روی یک داده بدون گم شدن به‌روزرسانی‌ها"""
+
+    processes = 6
+    rounds = 15
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _run(self, kind):
+        db = Database(backend=_stress_backend(kind, self.tmp_dir))
+        customer = Customer("c-1", "علی", "رضایی", "a@example.com",
+                            "Pass@123", "09121234567", "0012345678")
+        db.save_user(customer)
+        # fewer items than requests, some reservations must fail
+        stock = self.processes * self.rounds // 2
+        db.save_food(Food("f-1", "r-1", "پیتزا", "فست‌فود", 10000, 5000, "", "", stock, [date.today()]))
+        db.save_food(Food("f-2", "r-1", "برگر", "فست‌فود", 10000, 5000, "", "", 0, [date.today()]))
+        db.save_discount_code(DiscountCode("ONCE", 10.0, datetime.now() + timedelta(days=1)))
+
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_stress_worker,
+                        args=(kind, self.tmp_dir, customer.user_id, self.rounds, results))
+            for _ in range(self.processes)
+        ]
+        for w in workers:
+            w.start()
+        outcomes = [results.get(timeout=120) for _ in workers]
+        for w in workers:
+            w.join(timeout=30)
+            self.assertEqual(w.exitcode, 0)
+
+        db = Database(backend=_stress_backend(kind, self.tmp_dir))
+        reserved = sum(r for r, _ in outcomes)
+        self.assertEqual(int(db.find_user_by_email("a@example.com")['loyalty_points']),
+                         self.processes * self.rounds)
+        self.assertEqual(reserved, stock)
+        self.assertEqual(int(db.find_food_by_id("f-1")['stock']), 0)
+        self.assertEqual(sum(c for _, c in outcomes), 1)
+        self.assertEqual(len(db.load_foods()), 2)
+
+    def test_csv_concurrent_writers(self):
+        """تست عدم از دست رفتن به‌روزرسانی‌ها در CSV"""
+        self._run('csv')
+
+    def test_sqlite_concurrent_writers(self):
+        """تست عدم از دست رفتن به‌روزرسانی‌ها در SQLite"""
+        self._run('sqlite')
+
+
+class FakeDriver:
+    """Stand-in for a Selenium WebDriver used by the scraper tests"""
+
+    def __init__(self, pages=None, crash_on=()):
+        self.pages = pages or {}
+        self.crash_on = crash_on
+        self.current_url = None
+        self.cookies_cleared = 0
+        self.quit_called = False
+
+    def get(self, url):
+        if url in self.crash_on:
+            from selenium.common.exceptions import WebDriverException
+            raise WebDriverException("chrome not reachable")
+        self.current_url = url
+
+    @property
+    def page_source(self):
+        return self.pages.get(self.current_url, "<html></html>")
+
+    def execute_script(self, script, *args):
+        return 0
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakePageScraper(BaseRestaurantScraper):
+    """Scraper that returns the loaded URL, used with FakeDriver"""
+
+    def __init__(self, pool=None):
+        super().__init__("Fake", "http://fake", pool=pool)
+
+    def scrape_menu(self, restaurant_url):
+        try:
+            self._init_driver()
+            self.driver.get(restaurant_url)
+            return [{'food_name': restaurant_url, 'driver': id(self.driver)}]
+        except Exception as e:
+            self._mark_driver_error(e)
+            raise
+        finally:
+            self._close_driver()
+
+
+class TestWebDriverPool(unittest.TestCase):
+    """تست‌های مربوط به مخزن مرورگرهای اسکرپر"""
+
+    def test_reuse_and_reset(self):
+        """تست استفاده دوباره از مرورگر و پاک‌سازی وضعیت آن"""
+        pool = WebDriverPool(max_size=2, max_pages=10, factory=FakeDriver)
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        self.assertIs(first, second)
+        self.assertEqual(first.cookies_cleared, 1)
+        self.assertEqual(first.current_url, "about:blank")
+        pool.release(second)
+        pool.close()
+        self.assertTrue(first.quit_called)
+        self.assertEqual(pool.stats['created'], 1)
+
+    def test_bounded(self):
+        """تست محدود بودن تعداد مرورگرها"""
+        pool = WebDriverPool(max_size=1, factory=FakeDriver)
+        driver = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        pool.release(driver)
+        self.assertIs(pool.acquire(timeout=0.05), driver)
+
+    def test_recycle_after_pages_and_crash(self):
+        """تست جایگزینی مرورگر پس از چند صفحه یا خرابی"""
+        pool = WebDriverPool(max_size=1, max_pages=2, factory=FakeDriver)
+        driver = pool.acquire()
+        pool.release(driver)
+        pool.release(pool.acquire())
+        self.assertTrue(driver.quit_called)
+        self.assertEqual(pool.stats['recycled'], 1)
+
+        crashed = pool.acquire()
+        pool.release(crashed, broken=True)
+        self.assertTrue(crashed.quit_called)
+        self.assertIsNot(pool.acquire(), crashed)
+        self.assertEqual(pool.stats['discarded'], 1)
+
+    def test_failed_reset_frees_slot(self):
+        """تست آزاد شدن جای مرورگری که پاک‌سازی آن شکست خورد"""
+        class StuckDriver(FakeDriver):
+            def delete_all_cookies(self):
+                raise RuntimeError("session deleted")
+
+        class InterruptedDriver(FakeDriver):
+            def delete_all_cookies(self):
+                raise KeyboardInterrupt
+
+        pool = WebDriverPool(max_size=1, factory=StuckDriver)
+        for _ in range(3):
+            driver = pool.acquire(timeout=0.05)
+            pool.release(driver)
+            self.assertTrue(driver.quit_called)
+        self.assertEqual(pool.stats['discarded'], 3)
+        self.assertEqual(pool.stats['created'], 3)
+
+        pool = WebDriverPool(max_size=1, factory=InterruptedDriver)
+        with self.assertRaises(KeyboardInterrupt):
+            pool.release(pool.acquire())
+        pool.factory = FakeDriver
+        self.assertIsInstance(pool.acquire(timeout=0.05), FakeDriver)
+
+    def test_threaded_scraper_shares_drivers(self):
+        """تست اشتراک مرورگرها بین آدرس‌ها در اسکرپر چندنخی"""
+        drivers = []
+
+        def factory():
+            drivers.append(FakeDriver(crash_on={"http://fake/3"}))
+            return drivers[-1]
+
+        pool = WebDriverPool(max_size=2, factory=factory)
+        scraper = ThreadedRestaurantScraper(FakePageScraper, max_workers=2, verbose=False, pool=pool)
+        urls = [f"http://fake/{i}" for i in range(8)]
+        df = scraper.scrape_all(urls)
+
+        self.assertEqual(len(df) + len(scraper.errors), 8)
+        self.assertEqual(len(scraper.errors), 1)
+        # one crashed browser was replaced, the rest were reused
+        self.assertLessEqual(len(drivers), 2 + 1)
+        self.assertEqual(pool.stats['discarded'], 1)
+        pool.close()
+
+
+class SettlingDriver(FakeDriver):
+    """FakeDriver whose page keeps adding cards for settle_after seconds"""
+
+    def __init__(self, settle_after):
+        super().__init__()
+        self.settle_after = settle_after
+        self.loaded_at = None
+
+    def get(self, url):
+        super().get(url)
+        self.loaded_at = time.monotonic()
+
+    def execute_script(self, script, *args):
+        elapsed = time.monotonic() - self.loaded_at
+        changing = elapsed < self.settle_after
+        if "readyState" not in script:
+            return 1000
+        return {
+            'readyState': 'complete',
+            'idleMs': 0 if changing else (elapsed - self.settle_after) * 1000,
+            'resources': 10,
+            'cards': int(min(elapsed, self.settle_after) * 100),
+            'height': 1000
+        }
+
+
+class TestPageReadiness(unittest.TestCase):
+    """تست‌های مربوط به تشخیص آماده شدن صفحه به جای انتظار ثابت"""
+
+    def _scraper(self, settle_after):
+        scraper = FakePageScraper()
+        scraper.quiet_period = 0.1
+        scraper.poll_interval = 0.02
+        scraper.ready_timeout = 1.0
+        scraper.driver = SettlingDriver(settle_after)
+        return scraper
+
+    def test_returns_once_page_settles(self):
+        """تست پایان انتظار بلافاصله پس از ثابت شدن صفحه"""
+        scraper = self._scraper(settle_after=0.2)
+        start = time.monotonic()
+        html = scraper.fetch_page("http://fake/menu", wait_for_selector=None)
+        self.assertEqual(html, "<html></html>")
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(set(scraper.timings), {'navigate', 'ready', 'scroll'})
+        self.assertGreaterEqual(scraper.timings['ready'], 0.2)
+
+    def test_upper_bound(self):
+        """تست محدودیت زمانی برای صفحه‌ای که مدام تغییر می‌کند"""
+        scraper = self._scraper(settle_after=60)
+        scraper.driver.get("http://fake/menu")
+        start = time.monotonic()
+        self.assertFalse(scraper._wait_until_ready(timeout=0.3))
+        self.assertLess(time.monotonic() - start, 0.6)
+
+
+class StubMenuHandler(BaseHTTPRequestHandler):
+    """Serves the pages of StubMenuServer.routes"""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        path = self.path.split('?')[0]
+        failures = getattr(self.server, 'failures', {})
+        if failures.get(path):
+            failures[path] -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        route = self.server.routes.get(path)
+        if route is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content_type, body = route
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+STUB_CARDS_PAGE = """<html><body>
+<div data-testid="ProductCard-1"><h3>پیتزا مخصوص</h3>
+<p class="description">پنیر و قارچ</p><span>250,000</span></div>
+<div data-testid="ProductCard-2"><h3>برگر</h3><span>180,000</span></div>
+</body></html>"""
+
+STUB_NEXT_PAGE = """<html><body><div id="root"></div>
+<script id="__NEXT_DATA__" type="application/json">
+{"props": {"menu": [{"category": "پیتزا", "products": [
+  {"title": "پیتزا پپرونی", "price": 300000, "discount": 30000, "description": "تند"},
+  {"title": "نوشابه", "price": 20000, "available": false}
+]}]}}
+</script></body></html>"""
+
+STUB_VENDOR_JSON = """{"data": {"menus": [{"products": [
+  {"title": "کباب", "price": 400000, "discountRatio": 10, "priceAfterDiscount": 360000, "stock": 7}
+]}]}}"""
+
+
+class TestHttpFetchMode(unittest.TestCase):
+    """تست‌های مربوط به دریافت منو بدون مرورگر"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubMenuHandler)
+        self.server.routes = {
+            '/restaurant/menu/cards-r-aaa111/': ('text/html', STUB_CARDS_PAGE),
+            '/restaurant/menu/next-r-bbb222/': ('text/html', STUB_NEXT_PAGE),
+            '/restaurant/menu/vendor-r-ccc333/': ('text/html', "<html></html>"),
+            '/menu/ccc333': ('application/json', STUB_VENDOR_JSON),
+        }
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _scraper(self, fetch_mode='http'):
+        scraper = SnappFoodScraper(fetch_mode=fetch_mode, http_fetcher=HttpMenuFetcher(timeout=5))
+        scraper.menu_endpoint = self.base + "/menu/{vendor_code}"
+        return scraper
+
+    def test_vendor_endpoint(self):
+        """تست خواندن منو از JSON فروشنده"""
+        items = self._scraper().scrape_menu(self.base + "/restaurant/menu/vendor-r-ccc333/")
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]['food_name'], "کباب")
+        self.assertEqual(items[0]['price'], 360000)
+        self.assertEqual(items[0]['original_price'], 400000)
+        self.assertEqual(items[0]['discount'], "10%")
+        self.assertEqual(items[0]['stock'], "7")
+        # the page itself was not needed
+        self.assertEqual(self.server.requests, ["/menu/ccc333"])
+
+    def test_embedded_json(self):
+        """تست خواندن منو از JSON داخل صفحه"""
+        items = self._scraper().scrape_menu(self.base + "/restaurant/menu/next-r-bbb222/")
+        self.assertEqual([i['food_name'] for i in items], ["پیتزا پپرونی", "نوشابه"])
+        self.assertEqual(items[0]['price'], 270000)
+        self.assertEqual(items[0]['discount'], "10%")
+        self.assertEqual(items[1]['stock'], "0")
+
+    def test_product_cards(self):
+        """تست خواندن کارت‌های غذا از HTML دریافت‌شده"""
+        items = self._scraper().scrape_menu(self.base + "/restaurant/menu/cards-r-aaa111/")
+        self.assertEqual(len(items), 2)
+        self.assertEqual(items[0]['food_name'], "پیتزا مخصوص")
+        self.assertEqual(items[1]['price'], 180000)
+
+    def test_http_mode_never_starts_browser(self):
+        """تست عدم اجرای مرورگر در حالت HTTP"""
+        scraper = self._scraper()
+        scraper._init_driver = lambda: self.fail("browser started")
+        self.assertEqual(scraper.scrape_menu(self.base + "/missing-r-zzz999/"), [])
+        self.assertIsNone(scraper.driver)
+
+    def test_scrape_file(self):
+        """تست خواندن صفحه ذخیره‌شده"""
+        path = os.path.join(tempfile.mkdtemp(), "page.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(STUB_CARDS_PAGE)
+        items = SnappFoodScraper().scrape_file(path)
+        self.assertEqual([i['food_name'] for i in items], ["پیتزا مخصوص", "برگر"])
+        shutil.rmtree(os.path.dirname(path))
+
+
+class StubSnappFoodScraper(SnappFoodScraper):
+    """SnappFoodScraper reading vendor menus from TestAsyncScraper's server"""
+    menu_endpoint = None
+
+
+class TestAsyncScraper(unittest.TestCase):
+    """تست‌های مربوط به اسکرپر ناهمگام"""
+
+    setUp = TestHttpFetchMode.setUp
+    tearDown = TestHttpFetchMode.tearDown
+
+    def _scraper(self, **kwargs):
+        StubSnappFoodScraper.menu_endpoint = self.base + "/menu/{vendor_code}"
+        kwargs.setdefault('per_host_rate', None)
+        return AsyncRestaurantScraper(StubSnappFoodScraper, verbose=False, **kwargs)
+
+    def test_scrape_all(self):
+        """تست دریافت هم‌زمان منوها با همان خروجی اسکرپر چندنخی"""
+        urls = [self.base + path for path in (
+            "/restaurant/menu/cards-r-aaa111/",
+            "/restaurant/menu/next-r-bbb222/",
+            "/restaurant/menu/vendor-r-ccc333/",
+            "/restaurant/menu/missing-r-ddd444/"
+        )]
+        progress = []
+        scraper = self._scraper(concurrency=2, retries=0)
+        df = scraper.scrape_all(urls, lambda done, total, count: progress.append((done, total)))
+
+        self.assertEqual(sorted(df['food_name']), sorted(["پیتزا مخصوص", "برگر", "پیتزا پپرونی", "نوشابه", "کباب"]))
+        self.assertEqual(len(scraper.errors), 1)
+        self.assertIn("404", scraper.errors[0]['error'])
+        self.assertEqual([p[0] for p in progress], [1, 2, 3, 4])
+        self.assertEqual(scraper.get_statistics()['total_items'], 5)
+
+    def test_retry_with_backoff(self):
+        """تست تلاش دوباره پس از خطای موقت سرور"""
+        self.server.failures = {'/restaurant/menu/cards-r-aaa111/': 2}
+        scraper = self._scraper(retries=2, backoff=0.01)
+        df = scraper.scrape_all([self.base + "/restaurant/menu/cards-r-aaa111/"])
+        self.assertEqual(len(df), 2)
+        self.assertEqual(self.server.requests.count('/restaurant/menu/cards-r-aaa111/'), 3)
+
+        self.server.failures = {'/restaurant/menu/cards-r-aaa111/': 5}
+        scraper = self._scraper(retries=1, backoff=0.01)
+        scraper.scrape_all([self.base + "/restaurant/menu/cards-r-aaa111/"])
+        self.assertEqual(len(scraper.errors), 1)
+        self.assertIn("503", scraper.errors[0]['error'])
+
+    def test_stream(self):
+        """تست دریافت نتایج به محض آماده شدن"""
+        import asyncio
+
+        async def first_result():
+            stream = self._scraper().stream([self.base + "/restaurant/menu/vendor-r-ccc333/"] * 3)
+            result = await stream.__anext__()
+            await stream.aclose()
+            return result
+
+        result = asyncio.run(first_result())
+        self.assertTrue(result['success'])
+        self.assertEqual(result['items'][0]['food_name'], "کباب")
+
+    def test_body_size_limit_and_bounded_workers(self):
+        """تست سقف اندازه پاسخ و تعداد محدود درخواست‌های هم‌زمان"""
+        url = self.base + "/restaurant/menu/cards-r-aaa111/"
+        scraper = self._scraper(retries=0, client=AsyncHttpClient(max_body_size=100))
+        scraper.scrape_all([url])
+        self.assertEqual(len(scraper.errors), 1)
+        self.assertIn("ResponseTooLarge", scraper.errors[0]['error'])
+
+        import asyncio
+
+        async def first_result():
+            stream = self._scraper(concurrency=2).stream([url] * 50)
+            await stream.__anext__()
+            await stream.aclose()
+
+        self.server.requests.clear()
+        asyncio.run(first_result())
+        # at most 7 of the 50 URLs were taken (1 read, 2 queued, 2 waiting
+        # to be queued, 2 in flight), each with up to 2 requests
+        self.assertLessEqual(len(self.server.requests), 7 * 2)
+
+    def test_host_rate_limit(self):
+        """تست فاصله‌گذاری درخواست‌ها به یک میزبان"""
+        import asyncio
+
+        async def starts():
+            limiter = HostRateLimiter(rate=50)
+            times = []
+
+            async def request(host):
+                await limiter.wait(host)
+                times.append((host, time.monotonic()))
+
+            await asyncio.gather(*(request("a") for _ in range(5)), request("b"))
+            return times
+
+        times = asyncio.run(starts())
+        a_times = [t for host, t in times if host == "a"]
+        self.assertGreaterEqual(a_times[-1] - a_times[0], 4 * 0.02 * 0.9)
+        # other hosts are not held back
+        b_time = [t for host, t in times if host == "b"][0]
+        self.assertLess(b_time - a_times[0], 0.015)
+
+
+class CountingScraper:
+    """Scraper returning two items per URL and counting the URLs started"""
+    started = []
+
+    def scrape_menu(self, restaurant_url):
+        CountingScraper.started.append(restaurant_url)
+        if restaurant_url.endswith("/bad"):
+            raise RuntimeError("page broken")
+        return [{'restaurant': restaurant_url, 'food_name': f"غذا {i}", 'price': 1000 * (i + 1)}
+                for i in range(2)]
+
+
+class TestStreamingResults(unittest.TestCase):
+    """تست‌های مربوط به ذخیره تدریجی نتایج اسکرپ"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        CountingScraper.started = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _scraper(self, **kwargs):
+        return ThreadedRestaurantScraper(CountingScraper, max_workers=2, verbose=False,
+                                         use_pool=False, **kwargs)
+
+    def test_iter_results_is_lazy(self):
+        """تست محدود بودن تعداد آدرس‌های در حال پردازش"""
+        urls = [f"http://fake/{i}" for i in range(50)]
+        results = self._scraper().iter_results(urls)
+        first = next(results)
+        self.assertEqual(first['count'], 2)
+        self.assertLessEqual(len(CountingScraper.started), 2 * 2 + 2)
+        results.close()
+        self.assertLess(len(CountingScraper.started), 50)
+
+    def test_scrape_to_sinks(self):
+        """تست نوشتن نتایج در CSV و SQLite بدون نگه‌داشتن در حافظه"""
+        import sqlite3
+        urls = [f"http://fake/{i}" for i in range(10)] + ["http://fake/bad"]
+        csv_path = os.path.join(self.test_dir, "menus.csv")
+        db_path = os.path.join(self.test_dir, "menus.db")
+        scraper = self._scraper()
+        with CSVSink(csv_path) as csv_sink, SQLiteSink(db_path) as db_sink:
+            summary = scraper.scrape_to(urls, [csv_sink, db_sink])
+
+        self.assertEqual(summary, {'restaurants': 11, 'succeeded': 10, 'failed': 1, 'unchanged': 0, 'items': 20})
+        self.assertEqual(scraper.results, [])
+        df = pd.read_csv(csv_path, encoding='utf-8-sig')
+        self.assertEqual(list(df.columns), ['restaurant', 'food_name', 'price'])
+        self.assertEqual(len(df), 20)
+        with sqlite3.connect(db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM scraped_items").fetchone()[0], 20)
+
+    def test_scrape_all_counts_each_run(self):
+        """تست شمارش موفق‌ها و پاک شدن خطاهای اجرای قبلی"""
+        import contextlib
+        import io
+        urls = [f"http://fake/{i}" for i in range(4)] + ["http://fake/bad"]
+        scraper = self._scraper()
+        for _ in range(2):
+            df = scraper.scrape_all(urls)
+        self.assertEqual(len(df), 8)
+        self.assertEqual(len(scraper.errors), 1)
+        self.assertEqual(len(scraper.timings), 4)
+
+        # restaurants skipped after cancel() are not counted as successes
+        scraper.verbose = True
+        urls = [f"http://fake/{i}" for i in range(50)]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            scraper.scrape_all(urls, progress_callback=lambda *_: scraper.cancel())
+        self.assertEqual(scraper.errors, [])
+        succeeded = len(scraper.timings)
+        self.assertLess(succeeded, 50)
+        self.assertIn(f"Successful: {succeeded}/50", output.getvalue())
+
+    def test_csv_sink_append(self):
+        """تست ادامه نوشتن در فایل CSV موجود"""
+        path = os.path.join(self.test_dir, "menus.csv")
+        with CSVSink(path) as sink:
+            sink.write([{'food_name': "پیتزا", 'price': 1000}])
+        with CSVSink(path, append=True) as sink:
+            sink.write([{'price': 2000, 'food_name': "برگر", 'extra': 1}])
+        df = pd.read_csv(path, encoding='utf-8-sig')
+        self.assertEqual(list(df.columns), ['food_name', 'price'])
+        self.assertEqual(list(df['food_name']), ["پیتزا", "برگر"])
+
+        # a run without results keeps the previous file
+        with CSVSink(path) as sink:
+            sink.write([])
+        self.assertEqual(len(pd.read_csv(path, encoding='utf-8-sig')), 2)
+        with CSVSink(path) as sink:
+            sink.write([{'food_name': "سالاد", 'price': 500}])
+        self.assertEqual(list(pd.read_csv(path, encoding='utf-8-sig')['food_name']), ["سالاد"])
+
+    def test_scrape_all_writes_incrementally(self):
+        """تست ذخیره فایل خروجی در حین اسکرپ"""
+        path = os.path.join(self.test_dir, "all.csv")
+        sizes = []
+        scraper = self._scraper(output_file=path)
+        df = scraper.scrape_all([f"http://fake/{i}" for i in range(6)],
+                                lambda done, total, count: sizes.append(os.path.getsize(path)))
+        self.assertEqual(len(df), 12)
+        self.assertGreater(sizes[-2], 0)
+        self.assertEqual(len(pd.read_csv(path, encoding='utf-8-sig')), 12)
+
+        # with keep_items=False the items only go to the file
+        df = scraper.scrape_all([f"http://fake/{i}" for i in range(4)], keep_items=False)
+        self.assertTrue(df.empty)
+        self.assertEqual(scraper.results, [])
+        self.assertEqual(len(pd.read_csv(path, encoding='utf-8-sig')), 8)
+        with self.assertRaises(ValueError):
+            self._scraper().scrape_all(["http://fake/1"], keep_items=False)
+
+
+class TestScrapeJobs(unittest.TestCase):
+    """تست‌های مربوط به ادامه اسکرپ از نقطه ذخیره‌شده"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manifest = os.path.join(self.test_dir, "job.json")
+        self.urls = [f"http://fake/{i}" for i in range(12)] + ["http://fake/bad"]
+        CountingScraper.started = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _scraper(self):
+        return ThreadedRestaurantScraper(CountingScraper, max_workers=2, verbose=False, use_pool=False)
+
+    def test_run_and_manifest(self):
+        """تست ثبت وضعیت هر آدرس در فایل کار"""
+        job = ScrapeJob(self.manifest, self.urls, max_attempts=2)
+        summary = job.run(self._scraper())
+        self.assertEqual(summary['done'], 12)
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(summary['items'], 24)
+
+        reloaded = ScrapeJob(self.manifest, max_attempts=2)
+        entry = reloaded.entries["http://fake/3"]
+        self.assertEqual(entry['status'], 'done')
+        self.assertEqual(entry['attempts'], 1)
+        self.assertTrue(os.path.exists(entry['output']))
+        self.assertIn("page broken", reloaded.entries["http://fake/bad"]['error'])
+        self.assertEqual(len(reloaded.load_items()), 24)
+        self.assertEqual(list(reloaded.load_items()['restaurant'][:2]), ["http://fake/0"] * 2)
+
+        # only the failed URL is retried, until max_attempts
+        CountingScraper.started = []
+        reloaded.run(self._scraper())
+        self.assertEqual(CountingScraper.started, ["http://fake/bad"])
+        self.assertTrue(reloaded.finished)
+
+    def test_cancel_and_resume(self):
+        """تست توقف اسکرپ و ادامه فقط آدرس‌های باقی‌مانده"""
+        job = ScrapeJob(self.manifest, self.urls)
+        results = []
+
+        def on_result(result):
+            results.append(result['url'])
+            if len(results) == 3:
+                job.cancel()
+
+        summary = job.run(self._scraper(), on_result=on_result)
+        self.assertGreater(summary['remaining'], 0)
+        self.assertLess(len(CountingScraper.started), len(self.urls))
+        # every started restaurant was recorded
+        self.assertEqual(sorted(CountingScraper.started), sorted(results))
+
+        first_run = set(CountingScraper.started)
+        CountingScraper.started = []
+        summary = ScrapeJob(self.manifest).run(self._scraper())
+        self.assertFalse(first_run & set(CountingScraper.started) - {"http://fake/bad"})
+        self.assertEqual(summary['done'], 12)
+        self.assertEqual(summary['items'], 24)
+
+    def test_cancel_before_run(self):
+        """تست توقف کاری که هنوز اسکرپر آن شروع نشده"""
+        job = ScrapeJob(self.manifest, self.urls)
+        job.cancel()
+        scraper = self._scraper()
+        summary = job.run(scraper)
+        self.assertEqual(CountingScraper.started, [])
+        self.assertEqual(summary['remaining'], len(self.urls))
+
+        # the job and the scraper can still be run afterwards
+        summary = job.run(scraper)
+        self.assertEqual(summary['done'], 12)
+
+    def test_cancelled_scraper_is_reusable(self):
+        """تست استفاده دوباره از اسکرپر پس از توقف"""
+        scraper = self._scraper()
+        scraper.cancel()
+        self.assertEqual(list(scraper.iter_results(["http://fake/1"])), [])
+        self.assertEqual(len(list(scraper.iter_results(["http://fake/1"]))), 1)
+
+
+class CachedSnappFoodScraper(SnappFoodScraper):
+    """HTTP-only SnappFoodScraper for TestScrapeCache"""
+    menu_endpoint = None
+
+    def __init__(self, scrape_cache=None):
+        super().__init__(fetch_mode='http', http_fetcher=HttpMenuFetcher(timeout=5),
+                         scrape_cache=scrape_cache)
+
+
+class TestScrapeCache(unittest.TestCase):
+    """تست‌های مربوط به حافظه نهان اسکرپ و گزارش تغییرات منو"""
+
+    setUp = TestHttpFetchMode.setUp
+    tearDown = TestHttpFetchMode.tearDown
+
+    def _url(self):
+        return self.base + "/restaurant/menu/cards-r-aaa111/"
+
+    def _set_page(self, html):
+        self.server.routes['/restaurant/menu/cards-r-aaa111/'] = ('text/html', html)
+
+    def test_unchanged_menu_is_not_parsed(self):
+        """تست عدم پردازش دوباره منوی بدون تغییر"""
+        cache = ScrapeCache(":memory:", ttl=timedelta(0))
+        scraper = CachedSnappFoodScraper(scrape_cache=cache)
+        first = scraper.scrape_menu(self._url())
+        self.assertTrue(scraper.menu_changed)
+        self.assertEqual({c['change'] for c in scraper.menu_delta}, {'added'})
+
+        scraper._parse_food_card = lambda card, idx: self.fail("menu parsed again")
+        second = scraper.scrape_menu(self._url())
+        self.assertFalse(scraper.menu_changed)
+        self.assertEqual(scraper.menu_delta, [])
+        self.assertEqual([i['food_name'] for i in second], [i['food_name'] for i in first])
+        # served from the cache, but stamped with this scrape's time
+        self.assertGreater(second[0]['scraped_at'], first[0]['scraped_at'])
+
+    def test_delta(self):
+        """تست گزارش غذاهای اضافه‌شده، حذف‌شده و تغییر قیمت"""
+        cache = ScrapeCache(":memory:", ttl=timedelta(0))
+        CachedSnappFoodScraper(scrape_cache=cache).scrape_menu(self._url())
+        self._set_page(STUB_CARDS_PAGE
+                       .replace("250,000", "270,000")
+                       .replace("<h3>برگر</h3>", "<h3>سالاد</h3>"))
+
+        scraper = CachedSnappFoodScraper(scrape_cache=cache)
+        scraper.scrape_menu(self._url())
+        changes = {(c['change'], c['food_name']): c for c in scraper.menu_delta}
+        self.assertEqual(set(changes), {
+            ('price_changed', "پیتزا مخصوص"), ('added', "سالاد"), ('removed', "برگر")
+        })
+        self.assertEqual(changes[('price_changed', "پیتزا مخصوص")]['old_price'], 250000)
+        self.assertEqual(changes[('price_changed', "پیتزا مخصوص")]['price'], 270000)
+
+    def test_ttl_skips_fetch(self):
+        """تست استفاده از منوی ذخیره‌شده بدون درخواست در مدت اعتبار"""
+        cache = ScrapeCache(":memory:", ttl=timedelta(hours=1))
+        CachedSnappFoodScraper(scrape_cache=cache).scrape_menu(self._url())
+        requests_before = len(self.server.requests)
+        scraper = CachedSnappFoodScraper(scrape_cache=cache)
+        self.assertEqual(len(scraper.scrape_menu(self._url())), 2)
+        self.assertFalse(scraper.menu_changed)
+        self.assertEqual(len(self.server.requests), requests_before)
+
+    def test_quick_scrape_delta(self):
+        """تست گزارش فقط تغییرات در اسکرپ سریع"""
+        CachedSnappFoodScraper.menu_endpoint = self.base + "/menu/{vendor_code}"
+        cache = ScrapeCache(":memory:", ttl=timedelta(0))
+        urls = [self._url(), self.base + "/restaurant/menu/vendor-r-ccc333/"]
+        first = quick_scrape(CachedSnappFoodScraper, urls, verbose=False, scrape_cache=cache)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(set(first['change']), {'added'})
+
+        self.assertTrue(quick_scrape(CachedSnappFoodScraper, urls, verbose=False, scrape_cache=cache).empty)
+
+        self._set_page(STUB_CARDS_PAGE.replace("180,000", "190,000"))
+        delta = quick_scrape(CachedSnappFoodScraper, urls, verbose=False, scrape_cache=cache)
+        self.assertEqual(delta[['change', 'food_name', 'price', 'old_price']].values.tolist(),
+                         [['price_changed', "برگر", 190000, 180000]])
+
+
+STUB_RICH_CARDS_PAGE = """<html><head><script>var price = 999999;</script></head><body>
+<div data-testid="ProductCard-1"><div class="media"><span class="badge">15٪</span></div>
+  <h3> پیتزا <b>ویژه</b> </h3><p class="item-Description">خمیر   نازک<!-- 123456 --></p>
+  <div><s>۲۰۰,۰۰۰</s></div><div><span>170,000</span><span>تومان</span></div><div>موجودی 4</div></div>
+<div data-testid="ProductCard-2"><div class="card-Title">نوشابه</div>
+  <div><span>25,000</span><script>var old = 30000;</script></div><p>ناموجود</p></div>
+<div data-testid="ProductCard-3"><h4>بدون قیمت</h4><span>12</span></div>
+<div data-testid="ProductCard-4"><span>50,000</span></div>
+</body></html>"""
+
+
+class TestMenuParser(unittest.TestCase):
+    """تست‌های مربوط به تجزیه سریع کارت‌های غذا"""
+
+    def _parse(self, engine):
+        scraper = SnappFoodScraper(fetch_mode='browser')
+        scraper.html_parser = engine
+        items = scraper.parse_menu_html(STUB_RICH_CARDS_PAGE, fallback=False)
+        return [{k: v for k, v in item.items() if k != 'scraped_at'} for item in items]
+
+    @unittest.skipUnless(menu_parser.HAVE_LXML, "lxml is not installed")
+    def test_lxml_matches_beautifulsoup(self):
+        """تست یکسان بودن نتیجه lxml و BeautifulSoup"""
+        self.assertEqual(self._parse('lxml'), self._parse('bs4'))
+
+    def test_card_fields(self):
+        """تست استخراج نام، قیمت، تخفیف و موجودی"""
+        items = self._parse('bs4')
+        self.assertEqual([i['food_name'] for i in items], ["پیتزاویژه", "نوشابه"])
+        self.assertEqual(items[0]['price'], 170000)
+        self.assertEqual(items[0]['original_price'], 200000)
+        self.assertEqual(items[0]['discount'], "15%")
+        self.assertEqual(items[0]['stock'], "4")
+        self.assertEqual(items[0]['description'], "خمیر   نازک")
+        self.assertEqual(items[1]['price'], 25000)
+        self.assertEqual(items[1]['stock'], "0")
+
+    def test_page_without_cards(self):
+        """تست صفحه بدون کارت غذا"""
+        scraper = SnappFoodScraper(fetch_mode='browser')
+        from bs4 import BeautifulSoup
+        self.assertEqual(scraper._find_food_cards(BeautifulSoup("<html></html>", 'html.parser')), [])
+        for engine in ('bs4', 'lxml'):
+            scraper.html_parser = engine
+            self.assertEqual(scraper.parse_menu_html("<html><body></body></html>", fallback=False), [])
+            self.assertEqual(scraper.parse_menu_html("", fallback=False), [])
+
+    def test_parse_number(self):
+        """تست تبدیل اعداد فارسی و انگلیسی"""
+        self.assertEqual(menu_parser.parse_number("۱۲۵,۰۰۰ تومان"), 125000)
+        self.assertEqual(menu_parser.parse_number("12,500"), 12500)
+        self.assertEqual(menu_parser.parse_number("بدون عدد"), 0)
+
+
+class DevToolsDriver(FakeDriver):
+    """FakeDriver recording DevTools commands and reporting page metrics"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocked = None
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Network.setBlockedURLs':
+            self.blocked = params['urls']
+        return {}
+
+    def execute_script(self, script, *args):
+        if "transferSize" in script:
+            return {'transferBytes': 2048, 'resources': 3,
+                    'domContentLoadedMs': 300, 'loadMs': 500}
+        return super().execute_script(script, *args)
+
+
+class TestResourceBlocking(unittest.TestCase):
+    """تست‌های مربوط به مسدودسازی منابع غیرضروری در مرورگر"""
+
+    def test_profile_applied_per_scraper(self):
+        """تست اعمال پروفایل هر اسکرپر روی مرورگر مشترک"""
+        pool = WebDriverPool(max_size=1, factory=DevToolsDriver)
+        lean = FakePageScraper(pool=pool)
+        lean.resource_blocking = 'lean'
+        lean.scrape_menu("http://fake/1")
+        driver = pool.acquire()
+        self.assertEqual(driver.blocked, RESOURCE_BLOCKING_PROFILES['lean'])
+        self.assertIn("*.jpg", driver.blocked)
+        self.assertIn("*googletagmanager.com*", driver.blocked)
+        pool.release(driver)
+
+        # the next borrower gets its own profile
+        FakePageScraper(pool=pool).scrape_menu("http://fake/2")
+        driver = pool.acquire()
+        self.assertEqual(driver.blocked, [])
+        pool.release(driver)
+        pool.close()
+
+    def test_unknown_profile(self):
+        """تست خطا برای پروفایل نامعتبر"""
+        with self.assertRaises(ValueError):
+            SnappFoodScraper(resource_blocking='everything')
+        self.assertEqual(SnappFoodScraper(resource_blocking='media').resource_blocking, 'media')
+        self.assertEqual(SnappFoodScraper().resource_blocking, 'off')
+        self.assertEqual(SnappFoodScraper().fetch_mode, 'browser')
+
+    def test_page_metrics(self):
+        """تست ثبت زمان بارگذاری و حجم صفحه"""
+        scraper = FakePageScraper()
+        scraper.quiet_period = 0
+        scraper.driver = DevToolsDriver()
+        scraper.fetch_page("http://fake/menu")
+        self.assertEqual(scraper.page_metrics, {
+            'transfer_kb': 2.0, 'resources': 3, 'dom_ready_s': 0.3, 'load_s': 0.5
+        })
+
+
+class FakeTkRoot:
+    """root.after بدون Tk: فراخوانی‌ها با run_pending اجرا می‌شوند"""
+
+    def __init__(self):
+        self.callbacks = []
+        self.thread_ids = set()
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run_pending(self, timeout=5.0):
+        """poll until no callback is scheduled (like the Tk event loop)"""
+        deadline = time.time() + timeout
+        while self.callbacks and time.time() < deadline:
+            callback = self.callbacks.pop(0)
+            self.thread_ids.add(threading.get_ident())
+            callback()
+            time.sleep(0.005)
+
+
+class TestTaskRunner(unittest.TestCase):
+    """تست‌های اجرای پس‌زمینه بارگذاری‌های رابط کاربری"""
+
+    def setUp(self):
+        self.root = FakeTkRoot()
+        self.runner = TaskRunner(self.root, max_workers=2, poll_ms=1)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def test_results_delivered_on_main_thread(self):
+        """تست اجرای سرویس در ترد کارگر و تحویل نتیجه در ترد اصلی"""
+        worker_threads = []
+        results = []
+
+        def load(x):
+            worker_threads.append(threading.get_ident())
+            return x * 2
+
+        self.runner.submit("orders", load, 21, on_done=results.append)
+        self.assertTrue(self.runner.pending("orders"))
+        self.root.run_pending()
+
+        self.assertEqual(results, [42])
+        self.assertNotIn(threading.get_ident(), worker_threads)
+        self.assertEqual(self.root.thread_ids, {threading.get_ident()})
+        self.assertFalse(self.runner.pending())
+
+    def test_superseded_request_is_dropped(self):
+        """تست کنار گذاشتن نتیجه درخواست قدیمی‌تر با همان کلید"""
+        release = threading.Event()
+        results = []
+
+        def slow():
+            release.wait(5)
+            return "old"
+
+        self.runner.submit("menu", slow, on_done=results.append)
+        self.runner.submit("menu", lambda: "new", on_done=results.append)
+        release.set()
+        self.root.run_pending()
+        time.sleep(0.05)
+        self.runner._poll()
+
+        self.assertEqual(results, ["new"])
+
+    def test_errors_and_cancel_all(self):
+        """تست تحویل خطا، لغو همه و ادامه کار پس از خطای callback"""
+        errors, results = [], []
+
+        def fail():
+            raise ValueError("بد")
+
+        def broken_callback(result):
+            raise RuntimeError("callback")
+
+        self.runner.submit("report", fail, on_error=errors.append)
+        self.runner.submit("broken", lambda: 1, on_done=broken_callback)
+        self.runner.submit("history", lambda: 2, on_done=results.append)
+        deadline = time.time() + 5
+        while self.runner.pending() and time.time() < deadline:
+            try:
+                self.root.run_pending()
+            except RuntimeError:
+                pass
+        self.assertEqual([str(e) for e in errors], ["بد"])
+        self.assertEqual(results, [2])
+
+        release = threading.Event()
+        self.runner.submit("orders", release.wait, 5, on_done=results.append)
+        self.runner.cancel_all()
+        release.set()
+        self.root.run_pending()
+        self.assertEqual(results, [2])
+        self.assertFalse(self.runner.pending())
+
+    def test_writes_survive_cancel_all(self):
+        """تست اجرای کامل تغییر داده‌ها پس از لغو بارگذاری‌ها"""
+        release = threading.Event()
+        saved, results = [], []
+        runner = TaskRunner(self.root, max_workers=1, poll_ms=1)
+        try:
+            runner.submit("orders", release.wait, 5, on_done=results.append)
+            # queued behind the load on the only worker
+            runner.submit("checkout", saved.append, "order-1", write=True,
+                          on_done=results.append)
+            runner.cancel_all()
+            self.assertTrue(runner.pending("checkout"))
+            release.set()
+            deadline = time.time() + 5
+            while runner.pending() and time.time() < deadline:
+                self.root.run_pending()
+            self.assertEqual(saved, ["order-1"])
+            self.assertEqual(results, [None])
+        finally:
+            runner.shutdown()
+
+
+class CountingSource(FrameSource):
+    """FrameSource that records the pages asked of it"""
+
+    def __init__(self, df):
+        super().__init__(df, ['name'])
+        self.requests = []
+
+    def page(self, offset, limit, sort_by, descending):
+        self.requests.append((offset, limit, sort_by, descending))
+        return super().page(offset, limit, sort_by, descending)
+
+
+class TestVirtualTable(unittest.TestCase):
+    """تست‌های مدل جدول مجازی (بدون Tk)"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({'name': [f"غذا {i}" for i in range(250)],
+                                'price': [i % 7 for i in range(250)]})
+        self.source = CountingSource(self.df)
+        self.model = VirtualTableModel(self.source, page_size=100, max_pages=2)
+
+    def test_window_loads_only_needed_pages(self):
+        """تست بارگذاری فقط صفحه‌های ردیف‌های قابل مشاهده"""
+        self.assertEqual(self.model.pages_for(95, 10), [0, 1])
+        self.assertEqual(self.model.pages_for(0, 0), [])
+
+        self.assertTrue(self.model.store(*self.model.fetch([0], with_count=True)))
+        self.assertEqual(self.model.total, 250)
+        self.assertEqual(self.model.missing_pages(95, 10), [1])
+        self.assertEqual([i for i, _ in self.model.window(95, 10)], [95, 96, 97, 98, 99])
+
+        self.model.store(*self.model.fetch([1]))
+        window = self.model.window(95, 10)
+        self.assertEqual([row['name'] for _, row in window], [f"غذا {i}" for i in range(95, 105)])
+        self.assertEqual(self.source.requests, [(0, 100, None, False), (100, 100, None, False)])
+
+        # the least recently used page is dropped
+        self.model.store(*self.model.fetch([2]))
+        self.assertEqual(self.model.missing_pages(0, 250), [0])
+        self.assertEqual(len(self.model.window(240, 20)), 10)
+        self.assertIsNone(self.model.row(5))
+
+    def test_sort_and_stale_pages(self):
+        """تست مرتب‌سازی در منبع و نادیده گرفتن صفحه‌های قدیمی"""
+        stale = self.model.fetch([0], with_count=True)
+        self.model.set_sort('price')
+        self.assertFalse(self.model.store(*stale))
+        self.assertIsNone(self.model.total)
+
+        self.model.store(*self.model.fetch([0], with_count=True))
+        self.assertEqual(self.model.row(0)['price'], 0)
+        self.model.set_sort('price')
+        self.assertTrue(self.model.descending)
+        self.model.store(*self.model.fetch([0], with_count=True))
+        self.assertEqual(self.model.row(0)['price'], 6)
+        self.assertEqual(self.source.requests[-1], (0, 100, 'price', True))
+
+    def test_sources(self):
+        """تست فیلتر منبع دیتافریم و منبع سرویس"""
+        self.source.set_filters(search="غذا 12")
+        self.assertEqual(self.source.count(), 13)  # 12, 112, 120-129, 212
+        self.assertEqual([r['name'] for r in self.source.page(0, 3, 'name', True)],
+                         ["غذا 212", "غذا 129", "غذا 128"])
+        # count() between pages keeps the sorted frame
+        sorted_view = self.source._get_view('name', True)
+        self.source.count()
+        self.assertIs(self.source._get_view('name', True), sorted_view)
+        self.source.set_filters(search=None)
+        self.assertEqual(self.source.count(), 250)
+        with self.assertRaises(ValueError):
+            self.source.page(0, 10, 'missing', False)
+
+        calls = []
+
+        def list_rows(**kwargs):
+            calls.append(kwargs)
+            return []
+
+        service = ServiceSource(lambda **filters: len(filters), list_rows, status="Paid", search=None)
+        service.set_filters(search="علی", status="")
+        self.assertEqual(service.count(), 1)
+        service.page(200, 100, 'date', True)
+        self.assertEqual(calls, [{'limit': 100, 'offset': 200, 'sort_by': 'date',
+                                  'descending': True, 'search': "علی"}])
+
+        # pages fetched while another thread changes filters see one set of them
+        seen = []
+        service = ServiceSource(lambda **filters: 0, lambda **kwargs: seen.append(kwargs) or [])
+        stop = threading.Event()
+
+        def toggle():
+            while not stop.is_set():
+                service.set_filters(status="Paid", search="علی")
+                service.set_filters(status=None, search=None)
+
+        toggler = threading.Thread(target=toggle)
+        toggler.start()
+        try:
+            for _ in range(2000):
+                service.page(0, 10, None, False)
+        finally:
+            stop.set()
+            toggler.join()
+        for kwargs in seen:
+            self.assertEqual('status' in kwargs, 'search' in kwargs)
+
+
+class TestPersianText(unittest.TestCase):
+    """تست‌های ماژول یکسان‌سازی متن فارسی"""
+
+    def test_normalize_and_tokenize(self):
+        """تست یکسان‌سازی حروف، ارقام، نیم‌فاصله و اعراب"""
+        self.assertEqual(persian_text.normalize("كباب كوبيده"), "کباب کوبیده")
+        self.assertEqual(persian_text.normalize("سیب\u200cزمینی"), "سیب زمینی")
+        self.assertEqual(persian_text.normalize("مُرغِ\u200f سوخاری"), "مرغ سوخاری")
+        self.assertEqual(persian_text.normalize("PIZZA ۲ نفره"), "pizza 2 نفره")
+        self.assertEqual(persian_text.tokenize("پيتزا  مخصوص، ۲ نفره"), ["پیتزا", "مخصوص", "2", "نفره"])
+        self.assertEqual(persian_text.word_set("پیتزا پيتزا"), frozenset({"پیتزا"}))
+        self.assertEqual(persian_text.tokenize(None), ["none"])
+
+        # cached results are not shared between callers
+        tokens = persian_text.tokenize("پیتزا مخصوص")
+        tokens.append("x")
+        self.assertEqual(persian_text.tokenize("پیتزا مخصوص"), ["پیتزا", "مخصوص"])
+
+        long_text = "كباب " * 50
+        self.assertEqual(persian_text.tokenize(long_text), ["کباب"] * 50)
+
+    def test_digits(self):
+        """تست تبدیل ارقام و جداکننده‌ها و خواندن عدد"""
+        self.assertEqual(persian_text.normalize_digits("۱۲۰٬۰۰۰ تومان"), "120,000 تومان")
+        self.assertEqual(persian_text.normalize_digits("٣٫٥"), "3.5")
+        self.assertEqual(persian_text.parse_int("۱۲۰٬۰۰۰ تومان"), 120000)
+        self.assertEqual(persian_text.parse_int("120,000"), 120000)
+        self.assertEqual(persian_text.parse_int("بدون قیمت"), 0)
+        self.assertEqual(persian_text.parse_int(""), 0)
+
+    def test_shared_by_scraping_and_matching(self):
+        """تست استفاده در استخراج منو و تطبیق نام‌ها"""
+        self.assertEqual(menu_parser.parse_number("۸۵٬۰۰۰"), 85000)
+        self.assertEqual(menu_parser.find_discount("۸۵٬۰۰۰ ۲۰٪ تخفیف"), "20%")
+        self.assertEqual(menu_parser.find_stock("موجودي ۳"), "3")
+        self.assertEqual(menu_parser.find_stock("اين غذا ناموجود است"), "0")
+
+        matcher = NameMatcher(["پیتزا مخصوص ۲ نفره"])
+        self.assertEqual(matcher.best_match("پيتزا مخصوص 2 نفره"), (0, 1.0))
+
+
+class TestNameMatcher(unittest.TestCase):
+    """تست‌های تطبیق نام غذاها با ایندکس"""
+
+    @staticmethod
+    def scan_match(name, catalog):
+        """حلقه دوتایی قبلی compare_prices"""
+        words = word_set(name)
+        best, best_similarity = None, 0
+        for position, other in enumerate(catalog):
+            similarity = jaccard(words, word_set(other))
+            if similarity > best_similarity and similarity > 0.5:
+                best_similarity, best = similarity, position
+        return None if best is None else (best, best_similarity)
+
+    def test_same_matches_as_pairwise_scan(self):
+        """تست برابری نتایج با مقایسه همه جفت‌ها"""
+        import random
+        rng = random.Random(7)
+        words = ["پیتزا", "برگر", "ویژه", "مخصوص", "مرغ", "گوشت", "پنیر", "دوبل", "سالاد", "کباب"]
+        catalog = [" ".join(rng.sample(words, rng.randint(1, 5))) for _ in range(400)]
+        ours = [" ".join(rng.sample(words, rng.randint(1, 5))) for _ in range(200)]
+        matcher = NameMatcher(catalog)
+
+        self.assertEqual(matcher.match_all(ours), [self.scan_match(name, catalog) for name in ours])
+
+    def test_threshold_and_ties(self):
+        """تست آستانه ۵۰ درصد، اولویت اولین مورد و نام‌های خالی"""
+        matcher = NameMatcher(["پیتزا مخصوص", "Pizza  Special ", "پیتزا مخصوص", "پیتزا", float('nan'), ""])
+
+        # exactly 0.5 is not a match
+        self.assertIsNone(matcher.best_match("پیتزا مرغ"))
+        self.assertEqual(matcher.best_match("پیتزا مخصوص"), (0, 1.0))
+        self.assertEqual(matcher.best_match("pizza special"), (1, 1.0))
+        self.assertEqual(matcher.best_match("پیتزا مخصوص دوبل"), (0, 2 / 3))
+        self.assertIsNone(matcher.best_match(""))
+        self.assertEqual(len(matcher), 6)
+
+    def test_tfidf_merge(self):
+        """تست ادغام فازی دو فایل قیمت با n-gram حروف"""
+        ours = pd.DataFrame({
+            'name': ["پیتزا مخصوص", "سیب زمینی سرخ کرده", "چلو کباب", None],
+            'our_price': [100000, 40000, 150000, 1000]
+        })
+        theirs = pd.DataFrame({
+            'name': ["کباب کوبیده", "پيتزا مخصوص", "سیب‌زمینی سرخ‌کرده", "پیتزا مخصوص ویژه"],
+            'comp_price': [90000, 95000, 45000, 120000]
+        })
+
+        merged = tfidf_merge(ours, theirs)
+        self.assertEqual(list(merged.columns), ['name', 'our_price', 'matched_name', 'comp_price', 'score'])
+        # Arabic yeh and ZWNJ spellings still count as the same name
+        self.assertEqual(merged['matched_name'].tolist(), ["پيتزا مخصوص", "سیب‌زمینی سرخ‌کرده"])
+        self.assertEqual(merged['comp_price'].tolist(), [95000, 45000])
+        self.assertEqual(merged['score'].tolist(), [1.0, 1.0])
+
+        top2 = tfidf_merge(ours, theirs, top_k=2, min_score=0.5)
+        pizza = top2[top2['name'] == "پیتزا مخصوص"]
+        self.assertEqual(pizza['matched_name'].tolist(), ["پيتزا مخصوص", "پیتزا مخصوص ویژه"])
+        self.assertTrue(pizza['score'].is_monotonic_decreasing)
+
+        self.assertTrue(tfidf_merge(ours.iloc[:0], theirs).empty)
+
+
 class TestModels(unittest.TestCase):
     """تست‌های مربوط به مدل‌های داده"""
 
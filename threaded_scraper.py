@@ -2,16 +2,25 @@
 Multi-threaded Restaurant Scraper
 Scrapes multiple restaurants concurrently using ThreadPoolExecutor
 """
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Type, Callable, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import List, Dict, Type, Callable, Iterator, Optional
+import inspect
 import pandas as pd
-from datetime import datetime
+import threading
 import time
+from driver_pool import WebDriverPool
+from scrape_sinks import CSVSink, ResultSink
+from scrape_cache import ScrapeCache
+
+# columns of the change report of quick_scrape with a scrape cache
+DELTA_COLUMNS = ['change', 'restaurant', 'food_name', 'price', 'old_price']
 
 class ThreadedRestaurantScraper:
     """
     Multi-threaded scraper for parallel restaurant menu extraction.
-    Each thread creates its own scraper instance with its own WebDriver.
+    Each URL gets its own scraper instance; scrapers that accept a pool
+    borrow warm WebDrivers from a pool of max_workers browsers.
     """
     
     def __init__(
@@ -19,7 +28,11 @@ class ThreadedRestaurantScraper:
         scraper_class: Type,
         max_workers: int = 3,
         output_file: Optional[str] = None,
-        verbose: bool = True
+        verbose: bool = True,
+        use_pool: bool = True,
+        pages_per_driver: int = 50,
+        pool: Optional[WebDriverPool] = None,
+        scrape_cache: Optional[ScrapeCache] = None
     ):
         """
         Initialize threaded scraper
@@ -29,13 +42,60 @@ class ThreadedRestaurantScraper:
             max_workers: Maximum number of concurrent threads (default: 3)
             output_file: Optional CSV filename to save results
             verbose: Whether to print detailed logs (default: True)
+            use_pool: Reuse browsers across URLs through a WebDriverPool
+            pages_per_driver: Pages a pooled browser serves before it is restarted
+            pool: Existing pool to use (left open after scraping)
+            scrape_cache: ScrapeCache given to scrapers that support one;
+                          unchanged menus are then reported, not rewritten
         """
         self.scraper_class = scraper_class
         self.max_workers = max_workers
         self.output_file = output_file
         self.verbose = verbose
+        self.use_pool = use_pool
+        self.pages_per_driver = pages_per_driver
+        self.pool = pool
+        self.scrape_cache = scrape_cache
+        self.results = []
+        self.errors = []
+        # menu changes found with a scrape cache (see scrape_cache.menu_delta)
+        self.changes: List[Dict] = []
+        self.unchanged_count = 0
+        # per-URL phase timings of successful scrapes
+        self.timings: List[Dict[str, float]] = []
+        # per-URL load time and bandwidth of pages rendered in a browser
+        self.page_metrics: List[Dict[str, float]] = []
+        self._cancel = threading.Event()
+    
+    def _reset_run_state(self):
+        """Forget the results, errors and timings of the previous run"""
         self.results = []
         self.errors = []
+        self.changes = []
+        self.unchanged_count = 0
+        self.timings = []
+        self.page_metrics = []
+    
+    def cancel(self):
+        """
+        Stop the running scrape cooperatively: pages already loading are
+        finished, restaurants not started yet are skipped.
+        """
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def _create_scraper(self):
+        """New scraper instance, wired to the pool and cache if the class supports them"""
+        parameters = inspect.signature(self.scraper_class).parameters
+        kwargs = {}
+        if self.pool is not None and 'pool' in parameters:
+            kwargs['pool'] = self.pool
+        if self.scrape_cache is not None and 'scrape_cache' in parameters:
+            kwargs['scrape_cache'] = self.scrape_cache
+        return self.scraper_class(**kwargs)
     
     def _scrape_single_restaurant(
         self, 
@@ -52,8 +112,12 @@ class ThreadedRestaurantScraper:
             total: Total number of restaurants
             
         Returns:
-            Dictionary with 'url', 'items', and 'success' keys
+            Dictionary with 'url', 'items', 'success' and 'timings' keys,
+            None if the scrape was cancelled before this restaurant started
         """
+        if self._cancel.is_set():
+            return None
+        
         if self.verbose:
             print(f"\n{'='*70}")
             print(f"🍽️  Thread #{index}/{total}: Starting")
@@ -62,7 +126,7 @@ class ThreadedRestaurantScraper:
         
         try:
 
-            scraper = self.scraper_class()
+            scraper = self._create_scraper()
             
  
             start_time = time.time()
@@ -78,7 +142,14 @@ class ThreadedRestaurantScraper:
                 'success': True,
                 'error': None,
                 'count': len(items),
-                'elapsed_time': elapsed
+                'elapsed_time': elapsed,
+                # seconds per phase (navigate, ready, scroll, parse)
+                'timings': dict(getattr(scraper, 'timings', {})),
+                # load time and transferred kB of the page in the browser
+                'page_metrics': dict(getattr(scraper, 'page_metrics', {})),
+                # False when a scrape cache found the menu unchanged
+                'changed': getattr(scraper, 'menu_changed', True),
+                'delta': list(getattr(scraper, 'menu_delta', []))
             }
             
         except Exception as e:
@@ -92,13 +163,15 @@ class ThreadedRestaurantScraper:
                 'success': False,
                 'error': error_msg,
                 'count': 0,
-                'elapsed_time': 0
+                'elapsed_time': 0,
+                'timings': {}
             }
     
     def scrape_all(
         self,
         urls: List[str],
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        keep_items: bool = True
     ) -> pd.DataFrame:
         """
         Scrape multiple restaurant menus concurrently
@@ -106,16 +179,25 @@ class ThreadedRestaurantScraper:
         Args:
             urls: List of restaurant menu URLs
             progress_callback: Optional callback(current, total, items_count)
+            keep_items: Keep the items in memory and return them; False
+                        only writes them to output_file, so memory does not
+                        grow with the run (self.results then stays empty)
             
         Returns:
-            DataFrame containing all scraped menu items
+            DataFrame containing all scraped menu items (empty when
+            keep_items is False)
         """
+        if not keep_items and not self.output_file:
+            raise ValueError("keep_items=False needs an output_file (or use scrape_to)")
         if not urls:
             print("No URLs provided")
             return pd.DataFrame()
         
+        self._reset_run_state()
         start_time = time.time()
-        all_items = []
+        all_items = [] if keep_items else None
+        success_count = 0
+        item_count = 0
         
         if self.verbose:
             print(f"\n{' MULTI-THREADED SCRAPING STARTED ':=^80}")
@@ -123,69 +205,34 @@ class ThreadedRestaurantScraper:
             print(f" Concurrent workers: {self.max_workers}")
             print(f"{'='*80}\n")
         
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-
-            future_to_url = {
-                executor.submit(
-                    self._scrape_single_restaurant, 
-                    url, 
-                    idx, 
-                    len(urls)
-                ): url
-                for idx, url in enumerate(urls, 1)
-            }
-            
-
-            completed_count = 0
-            
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                completed_count += 1
-                
-                try:
-                    result = future.result()
-                    
-                    if result['success']:
-                        all_items.extend(result['items'])
-                    else:
-                        self.errors.append({
-                            'url': url,
-                            'error': result['error']
-                        })
-                    
-  
-                    if progress_callback:
-                        progress_callback(
-                            completed_count, 
-                            len(urls), 
-                            result['count']
-                        )
-                    
-                    if self.verbose:
-                        print(f"📈 Overall Progress: {completed_count}/{len(urls)} "
-                              f"({completed_count*100//len(urls)}%)")
-                
-                except Exception as e:
-                    if self.verbose:
-                        print(f"❌ Unexpected error for {url}: {e}")
-                    self.errors.append({
-                        'url': url,
-                        'error': str(e)
-                    })
+        # items reach output_file restaurant by restaurant, not only at the end
+        sink = CSVSink(self.output_file) if self.output_file else None
+        try:
+            for completed_count, result in enumerate(self.iter_results(urls), 1):
+                if sink:
+                    sink.write(result['items'])
+                if result['success']:
+                    success_count += 1
+                    item_count += result['count']
+                self._collect_result(result, all_items, completed_count, len(urls), progress_callback)
+        finally:
+            if sink:
+                sink.close()
         
-
-        df = pd.DataFrame(all_items)
+        df = pd.DataFrame(all_items or [])
         
 
         total_time = time.time() - start_time
-        success_count = len(urls) - len(self.errors)
+        # URLs skipped by cancel() are neither successes nor failures
+        skipped_count = len(urls) - success_count - len(self.errors)
         
         if self.verbose:
             print(f"\n{'🎉 SCRAPING COMPLETED ':=^80}")
             print(f"✅ Successful: {success_count}/{len(urls)}")
             print(f"❌ Failed: {len(self.errors)}/{len(urls)}")
-            print(f"📦 Total items: {len(all_items)}")
+            if skipped_count:
+                print(f"⏹️ Skipped (cancelled): {skipped_count}/{len(urls)}")
+            print(f"📦 Total items: {item_count}")
             print(f"⏱️  Total time: {total_time:.2f}s")
             if len(urls) > 0:
                 print(f"⚡ Average: {total_time/len(urls):.2f}s per restaurant")
@@ -196,33 +243,132 @@ class ThreadedRestaurantScraper:
                 for err in self.errors:
                     print(f"  - {err['url']}: {err['error']}")
         
-
-        if self.output_file and not df.empty:
-            self._save_results(df)
+            if sink and sink.rows:
+                print(f"Results saved to: {self.output_file}")
+                print(f"Columns: {', '.join(sink.columns)}")
         
-        self.results = all_items
+        self.results = all_items or []
         return df
     
-    def _save_results(self, df: pd.DataFrame):
-        """Save results to CSV file"""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-
-            if self.output_file:
-                filename = self.output_file
+    def scrape_to(
+        self,
+        urls: List[str],
+        sinks: List[ResultSink],
+        progress_callback: Optional[Callable] = None
+    ) -> Dict:
+        """
+        Scrape restaurants straight into sinks (see scrape_sinks), keeping
+        no items in memory; self.results stays empty.
+        
+        Menus a scrape cache found unchanged are not written again.
+        
+        Returns:
+            Dictionary with 'restaurants', 'succeeded', 'failed', 'unchanged'
+            and 'items' counts
+        """
+        self._reset_run_state()
+        summary = {'restaurants': len(urls), 'succeeded': 0, 'failed': 0, 'unchanged': 0, 'items': 0}
+        for completed_count, result in enumerate(self.iter_results(urls), 1):
+            if result['success'] and not result.get('changed', True):
+                summary['succeeded'] += 1
+                summary['unchanged'] += 1
+            elif result['success']:
+                summary['succeeded'] += 1
+                summary['items'] += result['count']
+                for sink in sinks:
+                    sink.write(result['items'])
             else:
-                filename = f"scraped_menus_{timestamp}.csv"
-            
-
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
-            
-            if self.verbose:
-                print(f"Results saved to: {filename}")
-                print(f"Columns: {', '.join(df.columns.tolist())}")
+                summary['failed'] += 1
+            self._collect_result(result, None, completed_count, len(urls), progress_callback)
+        return summary
+    
+    def iter_results(self, urls: List[str]) -> Iterator[Dict]:
+        """
+        Results of urls (dicts with 'url', 'items', 'success', 'error',
+        'count', 'elapsed_time' and 'timings'), yielded as each restaurant
+        finishes. At most 2 * max_workers restaurants are scraped or
+        waiting to be consumed at a time. After cancel() no new
+        restaurant is started and skipped URLs yield no result.
+        """
+        own_pool = self.use_pool and self.pool is None
+        if own_pool:
+            self.pool = WebDriverPool(max_size=self.max_workers, max_pages=self.pages_per_driver)
         
-        except Exception as e:
-            print(f"Error saving file: {e}")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = {}
+                queued = iter(enumerate(urls, 1))
+                
+                def submit(count):
+                    if self._cancel.is_set():
+                        return
+                    for idx, url in islice(queued, count):
+                        future = executor.submit(self._scrape_single_restaurant, url, idx, len(urls))
+                        pending[future] = url
+                
+                submit(2 * self.max_workers)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            if self.verbose:
+                                print(f"❌ Unexpected error for {url}: {e}")
+                            result = {
+                                'url': url,
+                                'items': [],
+                                'success': False,
+                                'error': str(e),
+                                'count': 0,
+                                'elapsed_time': 0,
+                                'timings': {}
+                            }
+                        if result is not None:
+                            yield result
+                    submit(len(done))
+        finally:
+            # the scraper can be used again after a cancelled run
+            self._cancel.clear()
+            if own_pool:
+                self.pool.close()
+                self.pool = None
+    
+    def _collect_result(
+        self,
+        result: Dict,
+        all_items: Optional[List[Dict]],
+        completed_count: int,
+        total: int,
+        progress_callback: Optional[Callable]
+    ):
+        """Record the result of one URL and report progress"""
+        if result['success']:
+            if all_items is not None:
+                all_items.extend(result['items'])
+            self.timings.append(result['timings'])
+            if result.get('page_metrics'):
+                self.page_metrics.append(result['page_metrics'])
+            self.changes.extend(result.get('delta', []))
+            if not result.get('changed', True):
+                self.unchanged_count += 1
+        else:
+            self.errors.append({
+                'url': result['url'],
+                'error': result['error']
+            })
+        
+        if progress_callback:
+            progress_callback(
+                completed_count, 
+                total, 
+                result['count']
+            )
+        
+        if self.verbose:
+            print(f"📈 Overall Progress: {completed_count}/{total} "
+                  f"({completed_count*100//total}%)")
     
     def get_statistics(self) -> Dict:
         """
@@ -266,6 +412,22 @@ class ThreadedRestaurantScraper:
             out_of_stock = df[df['stock'] == '0']
             stats['out_of_stock_items'] = len(out_of_stock)
         
+        # browser load time and bandwidth (see resource blocking)
+        if self.page_metrics:
+            metrics = pd.DataFrame(self.page_metrics).mean()
+            stats['avg_page_transfer'] = f"{metrics['transfer_kb']:.0f} kB"
+            stats['avg_page_load_time'] = f"{metrics['load_s']:.2f}s"
+        
+        if self.scrape_cache is not None:
+            stats['unchanged_menus'] = self.unchanged_count
+            stats['menu_changes'] = len(self.changes)
+        
+        # average seconds per page phase
+        if self.timings:
+            phases = pd.DataFrame(self.timings)
+            for phase, seconds in phases.mean().items():
+                stats[f'avg_{phase}_time'] = f"{seconds:.2f}s"
+        
         return stats
     
     def print_statistics(self):
@@ -284,7 +446,8 @@ def quick_scrape(
     urls: List[str],
     max_workers: int = 3,
     save_to: Optional[str] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    scrape_cache: Optional[ScrapeCache] = None
 ) -> pd.DataFrame:
     """
     Quick utility to scrape multiple restaurants
@@ -295,9 +458,13 @@ def quick_scrape(
         max_workers: Number of concurrent threads
         save_to: Optional CSV filename
         verbose: Print detailed logs
+        scrape_cache: Optional ScrapeCache; the result (and save_to) is
+                      then only what changed since the cached menus
         
     Returns:
-        DataFrame with all scraped data
+        DataFrame with all scraped data, or with a scrape cache the
+        changes: 'change' ('added', 'removed' or 'price_changed'),
+        'restaurant', 'food_name', 'price' and 'old_price'
     
     Example:
         >>> from snappfood_scraper import SnappFoodScraper
@@ -310,16 +477,36 @@ def quick_scrape(
     scraper = ThreadedRestaurantScraper(
         scraper_class=scraper_class,
         max_workers=max_workers,
-        output_file=save_to,
-        verbose=verbose
+        output_file=None if scrape_cache else save_to,
+        verbose=verbose,
+        scrape_cache=scrape_cache
     )
     
-    df = scraper.scrape_all(urls)
+    if scrape_cache is None:
+        df = scraper.scrape_all(urls)
+        
+        if verbose:
+            scraper.print_statistics()
+        
+        return df
+    
+    # unchanged menus are neither kept nor written
+    summary = scraper.scrape_to(urls, [])
+    delta = pd.DataFrame(scraper.changes, columns=DELTA_COLUMNS)
+    
+    if save_to and not delta.empty:
+        delta.to_csv(save_to, index=False, encoding='utf-8-sig')
     
     if verbose:
-        scraper.print_statistics()
+        counts = delta['change'].value_counts()
+        print(f"\n{'MENU CHANGES ':=^60}")
+        print(f"{'Unchanged Menus':.<40} {summary['unchanged']}/{summary['restaurants']}")
+        for change in ('added', 'removed', 'price_changed'):
+            label = change.replace('_', ' ').title()
+            print(f"{label:.<40} {counts.get(change, 0)}")
+        print("="*60 + "\n")
     
-    return df
+    return delta
 
 
 if __name__ == "__main__":
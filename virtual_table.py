@@ -0,0 +1,382 @@
+"""
+Virtual Treeview for large tables.
+
+A plain ttk.Treeview holds one item per row, so a page with tens of
+thousands of orders or foods takes seconds to build and keeps every row
+alive as a Tk item. VirtualTable only ever holds the rows that fit on
+screen: its scrollbar spans the whole result, and scrolling swaps the
+few visible items for the rows at the new offset. Rows come from a
+source one page (page_size rows) at a time, fetched on the GUI's
+TaskRunner and kept in a small LRU of pages, so a table over 100k
+orders loads as fast as one over 100.
+
+Sorting (clicking a heading) and filtering never happen in the widget:
+they are passed to the source, which asks the service (or pandas, for
+in-memory results) for the rows in that order.
+
+    table = VirtualTable(frame, [("نام", 150), ("قیمت", 100)],
+                         ServiceSource(food_service.count_foods, food_service.list_foods),
+                         lambda food: (food.name, f"{food.selling_price:,.0f}"),
+                         sort_keys={"نام": 'name', "قیمت": 'selling_price'},
+                         tasks=self.tasks)
+"""
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from persian_text import normalize, tokenize
+
+
+class ServiceSource:
+    """
+    Rows of a service listing that pages itself: count(**filters) and
+    page(limit=, offset=, sort_by=, descending=, **filters), such as
+    AdminService.count_orders / get_all_orders.
+    """
+
+    def __init__(self, count: Callable[..., int], page: Callable[..., list], **filters):
+        self._count = count
+        self._page = page
+        self.filters = {k: v for k, v in filters.items() if v is not None}
+        # count() and page() run on TaskRunner workers while the Tk thread sets filters
+        self._lock = threading.Lock()
+
+    def set_filters(self, **filters):
+        """Change filters (None removes one)"""
+        with self._lock:
+            for key, value in filters.items():
+                if value is None or value == "":
+                    self.filters.pop(key, None)
+                else:
+                    self.filters[key] = value
+
+    def _current_filters(self) -> Dict:
+        with self._lock:
+            return dict(self.filters)
+
+    def count(self) -> int:
+        return self._count(**self._current_filters())
+
+    def page(self, offset: int, limit: int, sort_by: Optional[str], descending: bool) -> list:
+        return self._page(limit=limit, offset=offset, sort_by=sort_by,
+                          descending=descending, **self._current_filters())
+
+
+class FrameSource:
+    """
+    Rows (dicts) of an in-memory DataFrame such as scrape results or a
+    comparison report. Sorting and the search filter run on the frame;
+    the filtered frame and its sorted copy are kept until they change,
+    so count() and the pages of one sort filter and sort once.
+    """
+
+    def __init__(self, df: pd.DataFrame, search_columns: Sequence[str] = ()):
+        self.df = df.reset_index(drop=True)
+        self.search_columns = [c for c in search_columns if c in self.df.columns]
+        self.filters: Dict[str, str] = {}
+        # pages are read on TaskRunner workers while the Tk thread sets filters
+        self._lock = threading.Lock()
+        self._filtered = (None, self.df)
+        self._sorted = (None, self.df)
+
+    def set_filters(self, search: Optional[str] = None):
+        with self._lock:
+            if search:
+                self.filters['search'] = search
+            else:
+                self.filters.pop('search', None)
+
+    def _filtered_view(self) -> Tuple[Optional[str], pd.DataFrame]:
+        # caller holds self._lock
+        search = self.filters.get('search')
+        if self._filtered[0] != search:
+            df = self.df
+            terms = tokenize(search) if search else []
+            if terms and self.search_columns:
+                text = df[self.search_columns].astype(str).agg(" ".join, axis=1).map(normalize)
+                found = pd.Series(True, index=df.index)
+                for term in terms:
+                    found &= text.str.contains(term, regex=False)
+                df = df[found]
+            self._filtered = (search, df)
+        return self._filtered
+
+    def _get_view(self, sort_by: Optional[str] = None, descending: bool = False) -> pd.DataFrame:
+        with self._lock:
+            search, df = self._filtered_view()
+            if sort_by is None:
+                return df
+            key = (search, sort_by, descending)
+            if self._sorted[0] != key:
+                if sort_by not in df.columns:
+                    raise ValueError(f"Cannot sort by {sort_by}")
+                self._sorted = (key, df.sort_values(sort_by, ascending=not descending,
+                                                    kind='stable'))
+            return self._sorted[1]
+
+    def count(self) -> int:
+        return len(self._get_view())
+
+    def page(self, offset: int, limit: int, sort_by: Optional[str], descending: bool) -> List[dict]:
+        return self._get_view(sort_by, descending).iloc[offset:offset + limit].to_dict('records')
+
+
+class VirtualTableModel:
+    """Row count, sort state and an LRU of fetched pages (no Tk)"""
+
+    def __init__(self, source, page_size: int = 100, max_pages: int = 20):
+        self.source = source
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.sort_by: Optional[str] = None
+        self.descending = False
+        self.total: Optional[int] = None
+        # bumped by reset(); pages fetched for an older generation are dropped
+        self.generation = 0
+        self._pages: "OrderedDict[int, list]" = OrderedDict()
+
+    def reset(self):
+        """Forget the count and pages (after a filter, sort or data change)"""
+        self.generation += 1
+        self.total = None
+        self._pages.clear()
+
+    def set_sort(self, sort_by: str):
+        """Sort by sort_by, or flip the direction if already sorted by it"""
+        if self.sort_by == sort_by:
+            self.descending = not self.descending
+        else:
+            self.sort_by, self.descending = sort_by, False
+        self.reset()
+
+    def pages_for(self, offset: int, count: int) -> List[int]:
+        """Pages covering rows [offset, offset + count)"""
+        if count <= 0:
+            return []
+        return list(range(offset // self.page_size, (offset + count - 1) // self.page_size + 1))
+
+    def missing_pages(self, offset: int, count: int) -> List[int]:
+        return [n for n in self.pages_for(offset, count) if n not in self._pages]
+
+    def fetch(self, pages: List[int], with_count: bool = False) -> Tuple[int, Optional[int], Dict[int, list]]:
+        """
+        Read pages (and the row count) from the source; safe to run on a
+        worker thread. Returns (generation, total, {page: rows}).
+        """
+        generation, sort_by, descending = self.generation, self.sort_by, self.descending
+        total = self.source.count() if with_count else None
+        fetched = {
+            n: self.source.page(n * self.page_size, self.page_size, sort_by, descending)
+            for n in pages
+        }
+        return generation, total, fetched
+
+    def store(self, generation: int, total: Optional[int], pages: Dict[int, list]) -> bool:
+        """Keep fetched pages; False if they belong to an older generation"""
+        if generation != self.generation:
+            return False
+        if total is not None:
+            self.total = total
+        for n, rows in pages.items():
+            self._pages[n] = rows
+            self._pages.move_to_end(n)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return True
+
+    def row(self, index: int):
+        """Row at index if its page is loaded, else None"""
+        rows = self._pages.get(index // self.page_size)
+        if rows is None:
+            return None
+        position = index % self.page_size
+        return rows[position] if position < len(rows) else None
+
+    def window(self, offset: int, count: int) -> List[Tuple[int, object]]:
+        """(index, row) of the loaded rows in [offset, offset + count)"""
+        end = min(offset + count, self.total or 0)
+        rows = []
+        for index in range(offset, end):
+            row = self.row(index)
+            if row is not None:
+                rows.append((index, row))
+        return rows
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview that materializes only the visible rows of a paged source"""
+
+    _WHEEL_ROWS = 3
+
+    def __init__(
+        self,
+        parent,
+        columns: Sequence[Tuple[str, int]],
+        source,
+        format_row: Callable[[object], tuple],
+        tasks=None,
+        sort_keys: Optional[Dict[str, str]] = None,
+        page_size: int = 100,
+        height: int = 15
+    ):
+        """
+        Args:
+            columns: (heading, width) of each column
+            source: ServiceSource, FrameSource or anything with count() and
+                    page(offset, limit, sort_by, descending)
+            format_row: Values shown for a row of the source
+            tasks: TaskRunner for the fetches (None fetches inline)
+            sort_keys: heading -> sort key of the source, for sortable columns
+            page_size: Rows per source page
+            height: Initial height in rows
+        """
+        super().__init__(parent)
+        self.model = VirtualTableModel(source, page_size)
+        self.format_row = format_row
+        self.tasks = tasks
+        self.sort_keys = sort_keys or {}
+        self.headings = [heading for heading, _ in columns]
+        self.offset = 0
+        self.visible = height
+        self._task_key = f"virtual-table-{id(self)}"
+
+        self.status_var = tk.StringVar(value="در حال بارگذاری...")
+        ttk.Label(self, textvariable=self.status_var).pack(side=tk.BOTTOM, anchor=tk.W)
+
+        self.tree = ttk.Treeview(self, columns=self.headings, show="headings",
+                                 height=height, selectmode='browse')
+        for heading, width in columns:
+            command = (lambda h=heading: self.sort(h)) if heading in self.sort_keys else ""
+            self.tree.heading(heading, text=heading, command=command)
+            self.tree.column(heading, width=width)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-self._WHEEL_ROWS if e.delta > 0 else self._WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-self._WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(self._WHEEL_ROWS))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+
+        self.reload()
+
+    # ---------------------------------------------------------------
+    # data
+    # ---------------------------------------------------------------
+    def reload(self):
+        """Fetch the row count and the visible rows again"""
+        self.model.reset()
+        self.status_var.set("در حال بارگذاری...")
+        self._request(with_count=True)
+
+    def set_filters(self, **filters):
+        """Filter the source and show its first rows"""
+        self.model.source.set_filters(**filters)
+        self.offset = 0
+        self.reload()
+
+    def set_source(self, source):
+        """Show the rows of another source (e.g. new scrape results)"""
+        self.model.source = source
+        self.offset = 0
+        self.reload()
+
+    def sort(self, heading: str):
+        """Sort by a column (again to reverse), done by the source"""
+        self.model.set_sort(self.sort_keys[heading])
+        for other in self.headings:
+            arrow = ""
+            if other == heading:
+                arrow = " ▼" if self.model.descending else " ▲"
+            self.tree.heading(other, text=other + arrow)
+        self.offset = 0
+        self._request(with_count=True)
+
+    def _request(self, with_count: bool = False):
+        pages = self.model.missing_pages(self.offset, self.visible)
+        if not pages and not with_count:
+            self._render()
+            return
+        if with_count and not pages:
+            pages = [0]
+        if self.tasks is None:
+            try:
+                fetched = self.model.fetch(pages, with_count)
+            except Exception as e:
+                self._failed(e)
+                return
+            self._loaded(fetched)
+        else:
+            # a newer scroll position supersedes the pages still loading
+            self.tasks.submit(self._task_key, self.model.fetch, pages, with_count,
+                              on_done=self._loaded, on_error=self._failed)
+
+    def _loaded(self, fetched):
+        if self.model.store(*fetched):
+            self._render()
+            if self.model.missing_pages(self.offset, self.visible):
+                self._request()
+
+    def _failed(self, error):
+        self.status_var.set(f"خطا در بارگذاری: {error}")
+
+    def selected_row(self):
+        """Source row of the selected item, None without a selection"""
+        selection = self.tree.selection()
+        return self.model.row(int(selection[0])) if selection else None
+
+    # ---------------------------------------------------------------
+    # view
+    # ---------------------------------------------------------------
+    def _render(self):
+        if not self.winfo_exists():
+            return
+        total = self.model.total or 0
+        self.offset = max(0, min(self.offset, total - self.visible))
+        selected = self.tree.selection()
+
+        self.tree.delete(*self.tree.get_children())
+        for index, row in self.model.window(self.offset, self.visible):
+            self.tree.insert("", tk.END, iid=str(index), values=self.format_row(row))
+        if selected and self.tree.exists(selected[0]):
+            self.tree.selection_set(selected[0])
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+            last = min(self.offset + self.visible, total)
+            self.status_var.set(f"ردیف {self.offset + 1:,} تا {last:,} از {total:,}")
+        else:
+            self.scrollbar.set(0.0, 1.0)
+            self.status_var.set("موردی یافت نشد")
+
+    def scroll(self, rows: int):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset: int):
+        total = self.model.total or 0
+        offset = max(0, min(offset, total - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self._request()
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * (self.model.total or 0)))
+        elif action == 'scroll':
+            step = self.visible if args[1] == 'pages' else 1
+            self.scroll(int(args[0]) * step)
+
+    def _on_resize(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._request()